@@ -48,21 +48,34 @@ def download_workflow(injector):
     if not download_type:
         return
     
+    location_ids = select_location(menu)
+    if not location_ids:
+        return
+    
+    # Ask for verbose mode
+    verbose = menu.select_verbose_mode()
+    
+    # Execute download
+    download_service.execute_download(location_ids, download_type, verbose)
+
+
+def select_location(menu):
+    """Ask for download mode and location, returns the spider's location IDs (None if cancelled)."""
     # Select download mode
     download_mode = menu.select_download_mode()
     if not download_mode:
-        return
+        return None
     
     # Select location
     province_result = menu.select_province()
     if not province_result:
-        return
+        return None
     
     province_id, province_name = province_result
     
     regency_result = menu.select_regency(province_id)
     if not regency_result:
-        return
+        return None
     
     regency_id, regency_name = regency_result
     
@@ -75,16 +88,21 @@ def download_workflow(injector):
     if download_mode == 'district':
         district_result = menu.select_district(regency_id)
         if not district_result:
-            return
+            return None
         
         district_id, district_name = district_result
         location_ids['district_id'] = district_id
     
-    # Ask for verbose mode
-    verbose = menu.select_verbose_mode()
+    return location_ids
+
+
+def retry_failed_workflow(injector):
+    """Re-run villages and images from the dead-letter file."""
+    menu = injector.get_menu_service()
+    download_service = injector.get_download_service()
     
-    # Execute download
-    download_service.execute_download(location_ids, download_type, verbose)
+    verbose = menu.select_verbose_mode()
+    download_service.execute_dead_letter_rerun(verbose)
 
 
 def autocrop_workflow(injector):
@@ -93,8 +111,45 @@ def autocrop_workflow(injector):
     autocrop_service.execute()
 
 
+def stream_workflow(injector):
+    """Download ROI photos and auto-crop them while the crawl runs."""
+    menu = injector.get_menu_service()
+    download_service = injector.get_download_service()
+    
+    location_ids = select_location(menu)
+    if not location_ids:
+        return
+    
+    verbose = menu.select_verbose_mode()
+    
+    autocrop_service = injector.get_autocrop_service()
+    autocrop_service.execute_streaming(download_service, location_ids, verbose)
+
+
+def parse_args(argv=None):
+    """Parse startup diagnostics flags (the CLI itself is interactive)."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Kawal Pemilu 2024 Scraper CLI")
+    parser.add_argument('--import-time', type=int, nargs='?', const=20, metavar='N',
+                        help="Show the N most expensive imports before the main menu, then exit")
+    parser.add_argument('--check-startup', type=float, nargs='?', const=0.5, metavar='SECONDS',
+                        help="Check that the main menu is ready within SECONDS (default 0.5), exit 1 if not")
+    return parser.parse_args(argv)
+
+
 def main():
     """Main CLI entry point."""
+    args = parse_args()
+    if args.import_time is not None or args.check_startup is not None:
+        from cli_core.utils.startup import print_import_report, check_startup_budget
+        
+        if args.import_time is not None:
+            print_import_report(top=args.import_time)
+        if args.check_startup is not None and not check_startup_budget(args.check_startup):
+            sys.exit(1)
+        return
+    
     # Create injector with default settings
     settings = CLISettings()
     injector = create_cli_injector(settings)
@@ -110,8 +165,12 @@ def main():
             
             if action == 'download':
                 download_workflow(injector)
+            elif action == 'retry_failed':
+                retry_failed_workflow(injector)
             elif action == 'autocrop':
                 autocrop_workflow(injector)
+            elif action == 'stream':
+                stream_workflow(injector)
             
             # Ask if continue
             if not menu.confirm_action('\nLanjut ke menu utama?', default=True):
@@ -1,6 +1,7 @@
 """CLI configuration settings."""
 
 from dataclasses import dataclass
+from typing import Optional
 import os
 
 
@@ -18,6 +19,8 @@ class CLISettings:
     # Scrapy settings
     spider_name: str = "kawal_spider"
     scrapy_project: str = "kawal_pemilu_scraper"
+    browser_profile_dir: Optional[str] = None  # persistent Playwright profile + asset cache
+    archive_images: bool = False  # store photos in per-district tar shards
     
     # Display settings
     clear_screen_enabled: bool = True
@@ -1,10 +1,13 @@
 """Dependency injection container for CLI."""
 
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from .config import CLISettings
 from .utils import LocationDataProvider
-from .services import MenuService, DownloadService, AutoCropService, ProgressService
+
+# Services are imported on demand, only MenuService is needed for the main menu
+if TYPE_CHECKING:
+    from .services import MenuService, DownloadService, AutoCropService, ProgressService
 
 
 class CLIInjector:
@@ -26,23 +29,30 @@ class CLIInjector:
             self._data_provider = LocationDataProvider(self.settings.context_path)
         return self._data_provider
     
-    def get_menu_service(self) -> MenuService:
+    def get_menu_service(self) -> 'MenuService':
         """Get menu service."""
+        from .services import MenuService
+        
         data = self.get_data_provider()
         return MenuService(data)
     
-    def get_progress_service(self) -> ProgressService:
+    def get_progress_service(self) -> 'ProgressService':
         """Get progress service."""
+        from .services import ProgressService
+        
         return ProgressService()
     
-    def get_download_service(self) -> DownloadService:
+    def get_download_service(self) -> 'DownloadService':
         """Get download service."""
+        from .services import DownloadService
+        
         progress = self.get_progress_service()
         return DownloadService(self.settings, progress)
     
-    def get_autocrop_service(self) -> AutoCropService:
+    def get_autocrop_service(self) -> 'AutoCropService':
         """Get auto-crop service."""
         from jumlah_suara_extractor import create_injector
+        from .services import AutoCropService
         
         extraction_injector = create_injector()
         menu = self.get_menu_service()
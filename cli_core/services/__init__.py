@@ -1,9 +1,15 @@
 """Services package."""
 
-from .menu_service import MenuService
-from .download_service import DownloadService
-from .autocrop_service import AutoCropService
-from .progress_service import ProgressService
+from jumlah_suara_extractor.utils.lazy import lazy_module
+
+# Services are imported when the injector first asks for them, so the
+# main menu does not wait for tqdm or the download/auto-crop modules.
+_LAZY_IMPORTS = {
+    'MenuService': '.menu_service',
+    'DownloadService': '.download_service',
+    'AutoCropService': '.autocrop_service',
+    'ProgressService': '.progress_service',
+}
 
 __all__ = [
     'MenuService',
@@ -11,3 +17,5 @@ __all__ = [
     'AutoCropService',
     'ProgressService',
 ]
+
+__getattr__, __dir__ = lazy_module(__name__, _LAZY_IMPORTS)
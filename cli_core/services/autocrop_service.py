@@ -1,5 +1,6 @@
 """Auto-crop service for extraction workflow orchestration."""
 
+import os
 import questionary
 from typing import Optional
 
@@ -24,12 +25,16 @@ class AutoCropService:
     
     def execute(self):
         """Execute full auto-crop workflow."""
-        from jumlah_suara_extractor.utils import scan_roi_images
+        from jumlah_suara_extractor.utils import scan_roi_images, group_by_tps, rank_tps_photos
         import random
         
         clear_screen()
         print_header("AUTO CROP JUMLAH SUARA - YOLOv11 SEGMENTATION")
         
+        # Load YOLO while the user answers the prompts below; it stays
+        # loaded for later auto-crop runs in this session
+        self.extraction_injector.preload_model()
+        
         # Get province service
         province_service = self.extraction_injector.get_province_service()
         
@@ -75,33 +80,10 @@ class AutoCropService:
         print(f"✅ Provinsi dipilih: {selected_province}")
         print(f"📊 Total gambar: {total_images}\n")
         
-        border_mode = questionary.select(
-            'Pilih Mode Border Processing',
-            choices=[
-                questionary.Choice('With Border (Recommended untuk digit dengan border tebal)', 
-                                 value='with_border'),
-                questionary.Choice('Without Border (Untuk digit tanpa border atau border tipis)', 
-                                 value='without_border')
-            ]
-        ).ask()
-        
-        if not border_mode:
-            return
-        
-        # Duplicate mode
-        clear_screen()
-        print(f"✅ Border Mode: {border_mode}\n")
-        
-        duplicate_mode = questionary.select(
-            'Pilih Mode Penamaan untuk Digit Duplikat',
-            choices=[
-                questionary.Choice('Double Notation (9.jpg, 99.jpg, 999.jpg)', value='double'),
-                questionary.Choice('Sequential (9_1.jpg, 9_2.jpg, 9_3.jpg)', value='sequential')
-            ]
-        ).ask()
-        
-        if not duplicate_mode:
+        modes = self._select_modes()
+        if not modes:
             return
+        border_mode, duplicate_mode = modes
         
         # Performance preview
         clear_screen()
@@ -118,9 +100,8 @@ class AutoCropService:
         sample_size = min(5, len(all_images))
         sample_images = random.sample(all_images, sample_size) if len(all_images) > sample_size else all_images
         
-        for img_info in sample_images:
-            image_path = img_info[0]
-            success, inference_time, digits = cropper.process_image(image_path)
+        results = cropper.process_images([img_info[0] for img_info in sample_images])
+        for success, inference_time, digits in results:
             tracker.record_image(success, inference_time, len(digits))
         
         tracker.display_preview_metrics(sample_size, total_images)
@@ -130,18 +111,181 @@ class AutoCropService:
         if not proceed:
             return
         
-        # Output structure
+        output = self._select_output()
+        if not output:
+            return
+        structure_type, output_format, output_base = output
+        
+        # Start processing
+        clear_screen()
+        print_header("MEMULAI AUTO-CROPPING")
+        self._print_run_config(output_base, structure_type, border_mode, duplicate_mode, output_format)
+        
+        # Get extraction service
+        extraction_service = self.extraction_injector.get_extraction_service(
+            border_mode=border_mode,
+            duplicate_mode=duplicate_mode,
+            structure_type=structure_type,
+            output_base=output_base,
+            output_format=output_format,
+            tracker=tracker
+        )
+        
+        # Reset tracker
+        tracker.reset()
+        tracker.start()
+        
+        # Several photos per TPS write the same outputs: only the best one
+        # (or the next, if it fails) goes through YOLO
+        settings = self.extraction_injector.settings
+        if settings.preselect_photos:
+            tps_groups = group_by_tps(all_images)
+            print(f"📸 {len(all_images)} foto dari {len(tps_groups)} TPS, foto terbaik per TPS diproses dulu")
+        else:
+            tps_groups = [[item] for item in all_images]
+        
+        # Process with progress
+        print("Processing images...")
+        for group, update_status in self.progress.track_with_status(tps_groups, "Cropping"):
+            candidates = rank_tps_photos(group, settings.yolo_imgsz) if len(group) > 1 else group
+            saved_count = extraction_service.process_tps_candidates(candidates, output_base)
+            inference_time = extraction_service.last_inference_time
+            
+            if saved_count > 0:
+                tracker.record_image(True, inference_time, saved_count)
+                update_status(f"✓ Extracted {saved_count} files")
+            else:
+                tracker.record_image(False, inference_time, 0)
+                update_status("✗ Failed")
+        
+        self._finish_run(extraction_service, tracker, output_base)
+    
+    def execute_streaming(self, download_service, location_ids, verbose: bool = False):
+        """
+        Download ROI photos and crop them while the crawl is still running.
+        
+        The scraper appends every stored photo to the stored-image log
+        (IMAGES_STORED_LOG) and a worker thread crops it right away, so
+        there is no separate auto-crop pass after the download.
+        
+        Args:
+            download_service: DownloadService running the crawl
+            location_ids: Dict with 'province_id', 'regency_id', optional 'district_id'
+            verbose: Enable verbose scraper logging
+        """
+        clear_screen()
+        print_header("DOWNLOAD ROI + AUTO CROP (STREAMING)")
+        
+        self.extraction_injector.preload_model()
+        
+        modes = self._select_modes()
+        if not modes:
+            return
+        border_mode, duplicate_mode = modes
+        
+        output = self._select_output()
+        if not output:
+            return
+        structure_type, output_format, output_base = output
+        
+        clear_screen()
+        print_header("MEMULAI DOWNLOAD + AUTO-CROPPING")
+        self._print_run_config(output_base, structure_type, border_mode, duplicate_mode, output_format)
+        
+        tracker = self.extraction_injector.get_performance_tracker()
+        extraction_service = self.extraction_injector.get_extraction_service(
+            border_mode=border_mode,
+            duplicate_mode=duplicate_mode,
+            structure_type=structure_type,
+            output_base=output_base,
+            output_format=output_format,
+            tracker=tracker
+        )
+        streaming = self.extraction_injector.get_streaming_service(extraction_service, output_base, tracker)
+        
+        # Only photos of this crawl: start from an empty log
+        settings = self.extraction_injector.settings
+        os.makedirs(settings.output_roi_path, exist_ok=True)
+        open(streaming.stored_log, 'w').close()
+        
+        tracker.start()
+        streaming.start()
+        download_service.execute_download(location_ids, 'roi', verbose, extra_settings={
+            'IMAGES_STORE': settings.output_roi_path,
+            'IMAGES_STORED_LOG': settings.stored_log_name,
+            'IMAGES_ARCHIVE_ENABLED': 'False',
+        })
+        
+        print("\n⏳ Menyelesaikan crop foto yang tersisa...")
+        stats = streaming.finish()
+        print(f"📸 {stats['processed']} foto di-crop ({stats['succeeded']} berhasil, {stats['failed']} gagal), "
+              f"{stats['skipped']} foto dilewati karena TPS-nya sudah lengkap")
+        print(f"⏱️  Rata-rata jeda download → crop: {stats['mean_lag_s']}s")
+        
+        self._finish_run(extraction_service, tracker, output_base)
+    
+    def _select_modes(self):
+        """Ask for border and duplicate naming mode, None if cancelled."""
+        border_mode = questionary.select(
+            'Pilih Mode Border Processing',
+            choices=[
+                questionary.Choice('With Border (Recommended untuk digit dengan border tebal)', 
+                                 value='with_border'),
+                questionary.Choice('Without Border (Untuk digit tanpa border atau border tipis)', 
+                                 value='without_border')
+            ]
+        ).ask()
+        
+        if not border_mode:
+            return None
+        
+        # Duplicate mode
+        clear_screen()
+        print(f"✅ Border Mode: {border_mode}\n")
+        
+        duplicate_mode = questionary.select(
+            'Pilih Mode Penamaan untuk Digit Duplikat',
+            choices=[
+                questionary.Choice('Double Notation (9.jpg, 99.jpg, 999.jpg)', value='double'),
+                questionary.Choice('Sequential (9_1.jpg, 9_2.jpg, 9_3.jpg)', value='sequential')
+            ]
+        ).ask()
+        
+        if not duplicate_mode:
+            return None
+        return border_mode, duplicate_mode
+    
+    def _select_output(self):
+        """Ask for output structure, format and folder, None if cancelled."""
         clear_screen()
         structure_type = questionary.select(
             'Pilih Struktur Folder Output',
             choices=[
                 questionary.Choice('Structured (Mirror struktur output_roi)', value='structured'),
-                questionary.Choice('Flat (Semua digit dalam satu folder)', value='flat')
+                questionary.Choice('Flat (Semua digit dalam satu folder)', value='flat'),
+                questionary.Choice('Dataset (Shard .tar ringkas untuk training)', value='dataset'),
+                questionary.Choice('Tensor (digits.npy ukuran tetap, memmap)', value='tensor')
             ]
         ).ask()
         
         if not structure_type:
-            return
+            return None
+        
+        # Output format (tensor mode stores raw pixels, no encoding)
+        output_format = None
+        if structure_type != 'tensor':
+            output_format = questionary.select(
+                'Pilih Format File Output',
+                choices=[
+                    questionary.Choice('JPG (kecil, lossy)', value='jpg'),
+                    questionary.Choice('PNG (lossless, encode cepat)', value='png'),
+                    questionary.Choice('WebP (paling kecil, lossy)', value='webp'),
+                    questionary.Choice('NPY (tanpa encode, paling besar)', value='npy')
+                ]
+            ).ask()
+            
+            if not output_format:
+                return None
         
         # Output folder
         output_base = questionary.text(
@@ -150,45 +294,49 @@ class AutoCropService:
         ).ask()
         
         if not output_base:
-            return
-        
-        # Start processing
-        clear_screen()
-        print_header("MEMULAI AUTO-CROPPING")
+            return None
+        return structure_type, output_format, output_base
+    
+    def _print_run_config(self, output_base, structure_type, border_mode, duplicate_mode, output_format):
         print(f"📂 Output: {output_base}/")
         print(f"📁 Struktur: {structure_type}")
         print(f"🎯 Border Mode: {border_mode}")
         print(f"🔢 Duplicate Mode: {duplicate_mode}")
+        if output_format:
+            print(f"🖼️  Format: {output_format}")
         print("="*60)
         print()
-        
-        # Get extraction service
-        extraction_service = self.extraction_injector.get_extraction_service(
-            border_mode=border_mode,
-            duplicate_mode=duplicate_mode,
-            structure_type=structure_type
-        )
-        
-        # Reset tracker
-        tracker.reset()
-        tracker.start()
-        
-        # Process with progress
-        print("Processing images...")
-        for item, update_status in self.progress.track_with_status(all_images, "Cropping"):
-            saved_count = extraction_service.process_tps_image(item, output_base)
-            
-            if saved_count > 0:
-                tracker.record_image(True, 0, saved_count)
-                update_status(f"✓ Saved {saved_count} files")
-            else:
-                tracker.record_image(False, 0, 0)
-                update_status("✗ Failed")
+    
+    def _finish_run(self, extraction_service, tracker, output_base):
+        """Flush the writers, show and export the metrics."""
+        # Wait for queued writes and finish the last dataset shard. Counts
+        # during the run are crops handed to the writer, not files on disk.
+        image_writer = extraction_service.image_writer
+        failed_writes = extraction_service.close()
+        if image_writer is not None:
+            print(f"\n💾 {image_writer.written} dari {image_writer.queued} file berhasil ditulis")
+        if failed_writes:
+            print(f"\n⚠️  {failed_writes} file gagal ditulis")
+            for error in extraction_service.image_writer.errors[:3]:
+                print(f"   - {error}")
         
         # Display final metrics
         print()
         tracker.display_metrics()
         
+        border_stats = getattr(extraction_service.cropper.border_processor, 'stats', None)
+        if border_stats:
+            stats = border_stats()
+            print(f"📏 Border projection: {stats['fallback']} dari {stats['profile'] + stats['fallback']} "
+                  f"digit pakai fallback contour ({stats['fallback_pct']}%)")
+        
+        # Stage timings for later analysis
+        os.makedirs(output_base, exist_ok=True)
+        metrics_json = os.path.join(output_base, 'extraction_metrics.json')
+        tracker.export_json(metrics_json)
+        tracker.export_csv(os.path.join(output_base, 'extraction_stages.csv'))
+        print(f"📄 Metrik per tahap: {metrics_json}")
+        
         print(f"\n✅ Auto-cropping selesai!")
         print(f"📂 Output disimpan di: {output_base}/\n")
         
@@ -26,7 +26,8 @@ class DownloadService:
         self,
         location_ids: Dict[str, str],
         download_type: str,
-        verbose: bool = False
+        verbose: bool = False,
+        extra_settings: Optional[Dict[str, str]] = None
     ):
         """
         Execute scrapy download.
@@ -35,6 +36,8 @@ class DownloadService:
             location_ids: Dict with 'province_id', 'regency_id', optional 'district_id'
             download_type: 'regular' or 'roi'
             verbose: Enable verbose logging
+            extra_settings: Scrapy settings passed with -s, they override
+                the CLI defaults (e.g. IMAGES_STORED_LOG for streaming mode)
         """
         # Prepare scrapy command
         cmd = [
@@ -47,19 +50,62 @@ class DownloadService:
         if 'district_id' in location_ids:
             cmd.extend(['-a', f"district_id={location_ids['district_id']}"])
         
+        self._add_common_options(cmd, verbose)
+        for name, value in (extra_settings or {}).items():
+            cmd.extend(['-s', f"{name}={value}"])
+        
+        print(f"\n🚀 Starting download...")
+        print(f"   Type: {download_type}")
+        print(f"   Location: {location_ids}")
+        print()
+        
+        self._run_scrapy(cmd)
+    
+    def dead_letter_path(self) -> str:
+        """Path of the dead-letter file written by the spider."""
+        return os.path.join(self.settings.output_dir, 'dead_letter.jsonl')
+    
+    def execute_dead_letter_rerun(self, verbose: bool = False):
+        """
+        Re-download only the villages and images that failed in earlier runs.
+        
+        Args:
+            verbose: Enable verbose logging
+        """
+        path = self.dead_letter_path()
+        if not os.path.exists(path):
+            print(f"\n✅ Tidak ada yang gagal ({path} tidak ditemukan)")
+            return
+        
+        cmd = [
+            'scrapy', 'crawl', self.settings.spider_name,
+            '-a', f"dead_letter_file={path}"
+        ]
+        self._add_common_options(cmd, verbose)
+        
+        print(f"\n🔁 Mengulang download yang gagal...")
+        print(f"   Dead-letter: {path}")
+        print()
+        
+        self._run_scrapy(cmd)
+    
+    def _add_common_options(self, cmd, verbose: bool):
+        # Reuse browser profile and cached SPA assets across runs
+        if self.settings.browser_profile_dir:
+            cmd.extend(['-s', f"PLAYWRIGHT_PROFILE_DIR={self.settings.browser_profile_dir}"])
+        
+        if self.settings.archive_images:
+            cmd.extend(['-s', 'IMAGES_ARCHIVE_ENABLED=True'])
+        
         # Log level
         if not verbose:
             cmd.extend(['--nolog'])
-        
+    
+    def _run_scrapy(self, cmd):
         # Set environment for unbuffered output
         env = os.environ.copy()
         env['PYTHONUNBUFFERED'] = '1'
         
-        print(f"\n🚀 Starting download...")
-        print(f"   Type: {download_type}")
-        print(f"   Location: {location_ids}")
-        print()
-        
         # Run scrapy subprocess
         try:
             process = subprocess.Popen(
@@ -20,10 +20,10 @@ class MenuService:
     
     def select_main_action(self) -> str:
         """
-        Main menu: download or auto-crop.
+        Main menu: download, retry failed downloads, auto-crop or both at once.
         
         Returns:
-            'download' or 'autocrop'
+            'download', 'retry_failed', 'autocrop' or 'stream'
         """
         clear_screen()
         print_header("KAWAL PEMILU 2024 SCRAPER CLI")
@@ -32,7 +32,9 @@ class MenuService:
             'Pilih Aksi',
             choices=[
                 questionary.Choice('📥 Download Foto C1 Plano', value='download'),
-                questionary.Choice('✂️  Auto Crop Jumlah Suara', value='autocrop')
+                questionary.Choice('🔁 Ulangi Download yang Gagal', value='retry_failed'),
+                questionary.Choice('✂️  Auto Crop Jumlah Suara', value='autocrop'),
+                questionary.Choice('⚡ Download ROI + Auto Crop (Streaming)', value='stream')
             ]
         ).ask()
         
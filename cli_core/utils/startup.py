@@ -0,0 +1,127 @@
+"""Startup cost checks: per-module import times and a main-menu time budget."""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Must never be imported before a workflow that needs them starts
+HEAVY_MODULES = ('torch', 'ultralytics', 'cv2', 'numpy', 'PIL', 'scrapy', 'twisted', 'playwright', 'tqdm')
+
+# Everything that happens before the main menu prompt is shown
+STARTUP_CODE = (
+    "import cli; "
+    "cli.create_cli_injector(cli.CLISettings()).get_menu_service()"
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _run_python(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True
+    )
+
+
+def import_times(code: str = STARTUP_CODE) -> List[Dict]:
+    """
+    Measure per-module import cost with ``python -X importtime``.
+
+    Args:
+        code: Python code to run in a fresh interpreter
+
+    Returns:
+        List of dicts with module, self_ms, cumulative_ms and depth (0 = imported
+        directly by the code), in import order
+    """
+    result = _run_python(['-X', 'importtime', '-c', code])
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules.append({
+            'module': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    return modules
+
+
+def print_import_report(top: int = 20, code: str = STARTUP_CODE):
+    """Print the most expensive imports of CLI startup."""
+    modules = import_times(code)
+    total_ms = sum(m['self_ms'] for m in modules)
+
+    print(f"\n⏱️  IMPORT TIME ({len(modules)} modules, {total_ms:.0f} ms total)")
+    print("=" * 60)
+    print(f"{'Module':<38}{'Self ms':>10}{'Cumul. ms':>12}")
+    for m in sorted(modules, key=lambda m: m['cumulative_ms'], reverse=True)[:top]:
+        name = '  ' * m['depth'] + m['module']
+        print(f"{name[:38]:<38}{m['self_ms']:>10.1f}{m['cumulative_ms']:>12.1f}")
+    print("=" * 60)
+
+    heavy = sorted({m['module'].split('.')[0] for m in modules} & set(HEAVY_MODULES))
+    if heavy:
+        print(f"⚠️  Heavy modules loaded at startup: {', '.join(heavy)}")
+    else:
+        print("✅ No heavy modules loaded at startup")
+
+
+def measure_startup(runs: int = 3) -> Tuple[float, List[str]]:
+    """
+    Time a fresh interpreter until the main menu is ready.
+
+    Args:
+        runs: Number of runs, the fastest is reported (less noisy)
+
+    Returns:
+        Tuple of (seconds incl. interpreter start, heavy modules that were loaded)
+    """
+    code = (
+        "import sys; " + STARTUP_CODE + "; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    best = float('inf')
+    heavy: List[str] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = _run_python(['-c', code])
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "startup failed")
+        best = min(best, elapsed)
+        heavy = [m for m in result.stdout.strip().split(',') if m]
+    return best, heavy
+
+
+def check_startup_budget(budget: float = 0.5, runs: int = 3) -> bool:
+    """
+    Check that the main menu is ready within ``budget`` seconds.
+
+    Fails as well when a heavy dependency (see HEAVY_MODULES) is imported
+    before a workflow needs it.
+
+    Args:
+        budget: Allowed seconds from interpreter start to main menu
+        runs: Number of runs, the fastest counts
+
+    Returns:
+        True if within budget and no heavy module was loaded
+    """
+    elapsed, heavy = measure_startup(runs)
+    ok = elapsed <= budget and not heavy
+
+    status = "✅" if elapsed <= budget else "❌"
+    print(f"{status} Startup sampai menu utama: {elapsed * 1000:.0f} ms (budget {budget * 1000:.0f} ms)")
+    if heavy:
+        print(f"❌ Modul berat ter-import saat startup: {', '.join(heavy)}")
+        print("   Jalankan `python cli.py --import-time` untuk melihat asalnya")
+    return ok
@@ -0,0 +1 @@
+"""Benchmarks for the extraction pipeline, run with ``python -m``."""
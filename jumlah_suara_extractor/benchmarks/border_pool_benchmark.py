@@ -0,0 +1,94 @@
+"""
+Border pool benchmark.
+
+Times border processing of synthetic digit crops with ``DigitCropper``'s
+border pool at several sizes (1 = inline, the previous behaviour):
+
+- ``per-tps``  the 9 digits of one TPS fanned out, collected before the next
+- ``batch``    the digits of all TPS submitted at once, as process_images does
+
+Speedup needs free cores; on a single-core host the pool only adds overhead.
+
+Usage:
+    python -m jumlah_suara_extractor.benchmarks.border_pool_benchmark
+    python -m jumlah_suara_extractor.benchmarks.border_pool_benchmark --tps 200 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from ..config import Settings
+from .synthetic import ground_truth_crops
+
+
+def run_case(cropper, tps_batches: List[List], batch: bool, repetitions: int) -> float:
+    """Best-of-repetitions TPS per second."""
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        if batch:
+            pending = [cropper.submit_borders(warps) for warps in tps_batches]
+            for futures in pending:
+                [f.result() for f in futures]
+        else:
+            for warps in tps_batches:
+                [f.result() for f in cropper.submit_borders(warps)]
+        best = min(best, time.perf_counter() - start)
+    return len(tps_batches) / best
+
+
+def run(tps_count: int, worker_counts: List[int], repetitions: int) -> Dict[str, Dict[int, Dict]]:
+    from ..core import DigitCropper, WithBorderProcessor, WithoutBorderProcessor
+
+    settings = Settings()
+    processors = {
+        'with_border': WithBorderProcessor(peel_pixels=settings.with_border_peel_pixels),
+        'without_border': WithoutBorderProcessor(peel_pixels=settings.without_border_peel_pixels),
+    }
+    results = {}
+    for mode, processor in processors.items():
+        crops = ground_truth_crops(tps_count * 9, seed=4, with_border=(mode == 'with_border'))
+        tps_batches = [crops[i:i + 9] for i in range(0, len(crops), 9)]
+        results[mode] = {}
+        for workers in worker_counts:
+            # Own pool per size, the shared get_border_pool() pools outlive the run
+            pool = ThreadPoolExecutor(workers) if workers > 1 else None
+            cropper = DigitCropper(None, processor, border_pool=pool)
+            run_case(cropper, tps_batches[:5], batch=True, repetitions=1)
+            results[mode][workers] = {
+                'per_tps': round(run_case(cropper, tps_batches, False, repetitions), 1),
+                'batch': round(run_case(cropper, tps_batches, True, repetitions), 1),
+            }
+            if pool:
+                pool.shutdown()
+    return results
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Benchmark parallel border processing")
+    parser.add_argument('--tps', type=int, default=100, help="TPS (9 digits each) per repetition")
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, cpus}),
+                        help="Pool sizes to compare (1 = inline)")
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.tps, args.workers, args.repetitions)
+
+    print("\n" + "=" * 66)
+    print(f"🧵 BORDER POOL BENCHMARK ({args.tps} TPS, {cpus} CPU, best of {args.repetitions})")
+    print("=" * 66)
+    print(f"{'Mode':<16}{'Workers':>8}{'Per-TPS/s':>12}{'Speedup':>9}{'Batch TPS/s':>13}{'Speedup':>9}")
+    for mode, by_workers in results.items():
+        inline = by_workers[min(by_workers)]
+        for workers, r in by_workers.items():
+            print(f"{mode:<16}{workers:>8}{r['per_tps']:>12.1f}{r['per_tps'] / inline['per_tps']:>8.2f}x"
+                  f"{r['batch']:>13.1f}{r['batch'] / inline['batch']:>8.2f}x")
+    print("=" * 66 + "\n")
+
+
+if __name__ == '__main__':
+    main()
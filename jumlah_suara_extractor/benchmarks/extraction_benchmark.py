@@ -0,0 +1,254 @@
+"""
+Extraction benchmark suite.
+
+Runs the extraction pipeline on synthetic ROIs (see ``synthetic.py``) and
+reports throughput plus p50/p95/p99 latency per case:
+
+- ``border:<mode>``      border processor on digit crops (no model needed)
+- ``projection:<mode>``  projection-profile processor on the same crops, with
+  its contour fallback rate
+- ``cropper:<mode>``     DigitCropper.process_image (decode, YOLO, warp, border)
+- ``extraction:<mode>``  ExtractionService.process_tps_image, including writes
+
+Results can be saved as a JSON baseline. With ``--baseline`` the run is
+compared against it and exits with status 1 when a case's throughput
+dropped by more than ``--max-regression``, so it can gate a CI job.
+Baselines are machine specific; compare runs from the same machine only.
+
+Usage:
+    python -m jumlah_suara_extractor.benchmarks.extraction_benchmark
+    python -m jumlah_suara_extractor.benchmarks.extraction_benchmark --save-baseline bench.json
+    python -m jumlah_suara_extractor.benchmarks.extraction_benchmark --baseline bench.json --max-regression 0.1
+    python -m jumlah_suara_extractor.benchmarks.extraction_benchmark --no-model --repetitions 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config import Settings
+from ..utils.metrics import PerformanceTracker, StageHistogram
+from .synthetic import generate_dataset, ground_truth_crops
+
+BORDER_MODES = ('with_border', 'without_border')
+
+
+def measure(setup: Callable[[], Tuple[Callable, Optional[Callable]]], items: List,
+            warmup: int, repetitions: int) -> Dict:
+    """
+    Time a callable over a list of items.
+
+    Args:
+        setup: Returns (per-item function, optional finish function) for one
+            repetition; finish is included in the repetition's wall time
+        items: Inputs, each repetition processes all of them
+        warmup: Items processed before timing starts (not recorded)
+        repetitions: Timed passes over all items
+
+    Returns:
+        Latency summary (ms) plus median/min items per second across repetitions
+    """
+    fn, finish = setup()
+    for item in items[:warmup]:
+        fn(item)
+    if finish:
+        finish()
+
+    hist = StageHistogram()
+    rates = []
+    for _ in range(repetitions):
+        fn, finish = setup()
+        start = time.perf_counter()
+        for item in items:
+            item_start = time.perf_counter()
+            fn(item)
+            hist.observe(time.perf_counter() - item_start)
+        if finish:
+            finish()
+        rates.append(len(items) / (time.perf_counter() - start))
+
+    summary = hist.summary()
+    summary['items_per_second'] = round(statistics.median(rates), 2)
+    summary['items_per_second_min'] = round(min(rates), 2)
+    return summary
+
+
+def bench_border(settings: Settings, crop_count: int, warmup: int, repetitions: int) -> Dict[str, Dict]:
+    """Benchmark both border processors, and their projection variants, on ground-truth digit crops."""
+    from ..core import WithBorderProcessor, WithoutBorderProcessor, ProjectionBorderProcessor
+
+    processors = {
+        'with_border': WithBorderProcessor(peel_pixels=settings.with_border_peel_pixels),
+        'without_border': WithoutBorderProcessor(peel_pixels=settings.without_border_peel_pixels),
+    }
+    results = {}
+    for mode in BORDER_MODES:
+        crops = ground_truth_crops(crop_count, seed=1, with_border=(mode == 'with_border'))
+        processor = processors[mode]
+        results[f"border:{mode}"] = measure(lambda: (processor.process, None), crops, warmup, repetitions)
+
+        projection = ProjectionBorderProcessor(fallback=processor, peel_pixels=processor.peel_pixels)
+        summary = measure(lambda: (projection.process, None), crops, warmup, repetitions)
+        summary['fallback_pct'] = projection.stats()['fallback_pct']
+        results[f"projection:{mode}"] = summary
+    return results
+
+
+def bench_model(settings: Settings, roi_count: int, warmup: int, repetitions: int,
+                workdir: str) -> Dict[str, Dict]:
+    """Benchmark DigitCropper and ExtractionService end to end (needs the YOLO model)."""
+    from ..injector import create_injector
+
+    injector = create_injector(settings)
+    results = {}
+    for mode in BORDER_MODES:
+        images = generate_dataset(os.path.join(workdir, 'roi', mode), roi_count, seed=2,
+                                  with_border=(mode == 'with_border'))
+        paths = [info[0] for info in images]
+
+        tracker = PerformanceTracker()
+        warm_cropper = injector.get_cropper(mode)
+        timed_cropper = injector.get_cropper(mode, tracker)
+        croppers = iter([warm_cropper] + [timed_cropper] * repetitions)
+
+        def cropper_setup():
+            return next(croppers).process_image, None
+
+        summary = measure(cropper_setup, paths, warmup, repetitions)
+        summary['stages'] = tracker.get_stage_metrics()
+        results[f"cropper:{mode}"] = summary
+
+        output_base = os.path.join(workdir, 'out', mode)
+
+        def extraction_setup():
+            service = injector.get_extraction_service(mode, 'double', 'structured', output_base)
+            return (lambda info: service.process_tps_image(info, output_base)), service.close
+
+        results[f"extraction:{mode}"] = measure(extraction_setup, images, warmup, repetitions)
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """
+    Compare throughput against a baseline.
+
+    Args:
+        results: Current results per case
+        baseline: Baseline results per case
+        max_regression: Allowed throughput drop as a fraction (0.1 = 10%)
+
+    Returns:
+        One message per regressed case (empty if none regressed)
+    """
+    regressions = []
+    for case, current in results.items():
+        reference = baseline.get(case)
+        if not reference or not reference.get('items_per_second'):
+            continue
+        change = current['items_per_second'] / reference['items_per_second'] - 1
+        current['change_pct'] = round(change * 100, 1)
+        if change < -max_regression:
+            regressions.append(
+                f"{case}: {current['items_per_second']:.1f}/s vs baseline "
+                f"{reference['items_per_second']:.1f}/s ({change * 100:+.1f}%)"
+            )
+    return regressions
+
+
+def environment() -> Dict[str, str]:
+    """Machine and library versions, stored with the baseline."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def print_report(results: Dict[str, Dict]):
+    print("\n" + "=" * 84)
+    print("⚡ EXTRACTION BENCHMARK")
+    print("=" * 84)
+    print(f"{'Case':<28}{'Items/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'Max ms':>10}{'Δ base':>8}")
+    for case, r in results.items():
+        change = f"{r['change_pct']:+.1f}%" if 'change_pct' in r else "-"
+        print(f"{case:<28}{r['items_per_second']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}{change:>8}")
+    print("=" * 84)
+
+    for case, r in results.items():
+        if 'fallback_pct' in r:
+            print(f"📏 {case}: {r['fallback_pct']:.1f}% digit pakai fallback contour")
+        if r.get('stages'):
+            print(f"\n🔬 Stages {case}: " + ", ".join(
+                f"{name} {s['mean_ms']:.2f}ms ({s['share_pct']:.0f}%)" for name, s in r['stages'].items()
+            ))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the digit extraction pipeline on synthetic ROIs")
+    parser.add_argument('--rois', type=int, default=20, help="Synthetic ROIs per border mode (model cases)")
+    parser.add_argument('--crops', type=int, default=500, help="Digit crops per border mode (border cases)")
+    parser.add_argument('--warmup', type=int, default=3, help="Untimed items before each case")
+    parser.add_argument('--repetitions', type=int, default=3, help="Timed passes per case")
+    parser.add_argument('--model', default=Settings.model_path, help="YOLO weights")
+    parser.add_argument('--no-model', action='store_true', help="Only run the border processor cases")
+    parser.add_argument('--baseline', help="Compare against this baseline JSON")
+    parser.add_argument('--max-regression', type=float, default=0.15,
+                        help="Allowed throughput drop vs baseline (fraction, default 0.15)")
+    parser.add_argument('--save-baseline', help="Write results as a baseline JSON")
+    args = parser.parse_args()
+
+    settings = Settings(model_path=args.model)
+    results = bench_border(settings, args.crops, args.warmup, args.repetitions)
+
+    if not args.no_model:
+        if not os.path.exists(args.model):
+            print(f"⚠️  Model tidak ditemukan di {args.model}, hanya benchmark border processor")
+        else:
+            try:
+                with tempfile.TemporaryDirectory(prefix='extraction-bench-') as workdir:
+                    results.update(bench_model(settings, args.rois, args.warmup, args.repetitions, workdir))
+            except ImportError as e:
+                print(f"⚠️  {e}\n   Hanya benchmark border processor")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline.get('results', {}), args.max_regression)
+
+    print_report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'environment': environment(),
+                'config': {k: getattr(args, k) for k in ('rois', 'crops', 'warmup', 'repetitions', 'model')},
+                'results': results,
+            }, f, indent=2)
+        print(f"📄 Baseline disimpan ke {args.save_baseline}")
+
+    if regressions:
+        print(f"❌ Throughput turun lebih dari {args.max_regression * 100:.0f}% dari baseline:")
+        for message in regressions:
+            print(f"   - {message}")
+        sys.exit(1)
+    elif args.baseline:
+        print("✅ Tidak ada regresi throughput")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Per-TPS geometry micro-benchmark.
+
+Compares the batched kernels in ``core/geometry.py`` with the previous
+one-quad-at-a-time implementation on the 9 digit quads of synthetic ROIs:
+
+- ``kernels``  order corners, output sizes, inset and perspective matrices
+- ``warp``     the above plus the actual cv2.warpPerspective calls
+
+Usage:
+    python -m jumlah_suara_extractor.benchmarks.geometry_benchmark
+    python -m jumlah_suara_extractor.benchmarks.geometry_benchmark --tps 500 --repetitions 5
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+from ..core.geometry import order_quads, target_sizes, inset_quads, perspective_matrices, warp_quads
+from .synthetic import generate_roi
+
+
+# Previous scalar implementation, kept as the benchmark reference
+def _scalar_order_points(pts):
+    rect = np.zeros((4, 2), dtype="float32")
+    s = pts.sum(axis=1)
+    rect[0] = pts[np.argmin(s)]
+    rect[2] = pts[np.argmax(s)]
+    diff = np.diff(pts, axis=1)
+    rect[1] = pts[np.argmin(diff)]
+    rect[3] = pts[np.argmax(diff)]
+    return rect
+
+
+def _scalar_transform(pts):
+    rect = _scalar_order_points(pts)
+    (tl, tr, br, bl) = rect
+    width_a = np.sqrt(((br[0] - bl[0]) ** 2) + ((br[1] - bl[1]) ** 2))
+    width_b = np.sqrt(((tr[0] - tl[0]) ** 2) + ((tr[1] - tl[1]) ** 2))
+    max_width = max(int(width_a), int(width_b))
+    height_a = np.sqrt(((tr[0] - br[0]) ** 2) + ((tr[1] - br[1]) ** 2))
+    height_b = np.sqrt(((tl[0] - bl[0]) ** 2) + ((tl[1] - bl[1]) ** 2))
+    max_height = max(int(height_a), int(height_b))
+    dst = np.array([[0, 0], [max_width - 1, 0], [max_width - 1, max_height - 1], [0, max_height - 1]],
+                   dtype="float32")
+    return cv2.getPerspectiveTransform(rect, dst), (max_width, max_height)
+
+
+def _scalar_inset(box, pixels=6):
+    rect = _scalar_order_points(box)
+    center = np.mean(rect, axis=0)
+    new_rect = np.zeros_like(rect)
+    for i, corner in enumerate(rect):
+        vector = center - corner
+        length = np.linalg.norm(vector)
+        if length == 0:
+            continue
+        new_rect[i] = corner + vector / length * (pixels * 1.414)
+    return new_rect
+
+
+def scalar_kernels(quads: np.ndarray):
+    for quad in quads:
+        _scalar_transform(quad)
+        _scalar_inset(quad)
+
+
+def batched_kernels(quads: np.ndarray):
+    rects = order_quads(quads)
+    perspective_matrices(rects, target_sizes(rects))
+    inset_quads(quads, 6)
+
+
+def scalar_warp(image: np.ndarray, quads: np.ndarray):
+    for quad in quads:
+        matrix, size = _scalar_transform(quad)
+        cv2.warpPerspective(image, matrix, size)
+
+
+def time_per_tps(fn: Callable, samples: List, repetitions: int) -> float:
+    """Best-of-repetitions mean time per TPS in microseconds."""
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        for args in samples:
+            fn(*args)
+        best = min(best, (time.perf_counter() - start) / len(samples))
+    return best * 1e6
+
+
+def run(tps_count: int, repetitions: int, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    rng = np.random.default_rng(seed)
+    rois = [generate_roi(rng) for _ in range(min(tps_count, 20))]
+    # Reuse a few rendered ROIs, the geometry cost doesn't depend on pixels
+    samples = [(img, np.int32(quads)) for img, quads, _ in rois]
+    samples = (samples * (tps_count // len(samples) + 1))[:tps_count]
+    quad_samples = [(quads,) for _, quads in samples]
+
+    results = {}
+    for name, scalar, batched, args in (
+        ('kernels', scalar_kernels, batched_kernels, quad_samples),
+        ('warp', scalar_warp, warp_quads, samples),
+    ):
+        scalar_us = time_per_tps(scalar, args, repetitions)
+        batched_us = time_per_tps(batched, args, repetitions)
+        results[name] = {
+            'scalar_us_per_tps': round(scalar_us, 1),
+            'batched_us_per_tps': round(batched_us, 1),
+            'speedup': round(scalar_us / batched_us, 2) if batched_us else None,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched quad geometry against the scalar version")
+    parser.add_argument('--tps', type=int, default=200, help="TPS (9 quads each) per repetition")
+    parser.add_argument('--repetitions', type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.tps, args.repetitions)
+
+    print("\n" + "=" * 60)
+    print(f"📐 GEOMETRY BENCHMARK ({args.tps} TPS x 9 quads, best of {args.repetitions})")
+    print("=" * 60)
+    print(f"{'Case':<12}{'Scalar µs':>14}{'Batched µs':>14}{'Speedup':>12}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['scalar_us_per_tps']:>14.1f}{r['batched_us_per_tps']:>14.1f}{r['speedup']:>11.2f}x")
+    print("=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
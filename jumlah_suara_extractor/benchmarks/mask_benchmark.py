@@ -0,0 +1,136 @@
+"""
+Mask path benchmark: polygon-only vs full-size masks.
+
+Runs the YOLO model on synthetic ROIs with both ``mask_mode`` settings of
+``DigitCropper`` and reports:
+
+- latency of inference + polygon extraction per ROI (p50/p95)
+- crop equivalence: how many ROIs both paths accept, the mean/max corner
+  distance between their digit quads, and the mean pixel difference of the
+  warped digits
+
+Usage:
+    python -m jumlah_suara_extractor.benchmarks.mask_benchmark
+    python -m jumlah_suara_extractor.benchmarks.mask_benchmark --rois 50 --repetitions 5
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from ..config import Settings
+from ..core.geometry import mask_quads, order_quads, warp_quads
+from ..utils.metrics import StageHistogram
+from .synthetic import generate_roi
+
+MASK_MODES = ('full', 'polygon')
+
+
+def build_croppers(settings: Settings) -> Dict:
+    from ..core import DigitCropper
+    from ..injector import create_injector
+
+    injector = create_injector(settings)
+    model = injector.get_model()
+    processor = injector.get_border_processor('with_border')
+    return {
+        mode: DigitCropper(model, processor, device=settings.model_device, mask_mode=mode)
+        for mode in MASK_MODES
+    }
+
+
+def digit_quads(cropper, image: np.ndarray):
+    """Digit quads (9, 4, 2) of one image, or None if the grid was rejected."""
+    polygons = cropper._digit_polygons(cropper._predict(image)[0])
+    return None if polygons is None else mask_quads(polygons)
+
+
+def time_modes(croppers: Dict, images: List[np.ndarray], repetitions: int) -> Dict[str, Dict]:
+    results = {}
+    for mode, cropper in croppers.items():
+        for image in images[:2]:
+            digit_quads(cropper, image)
+        hist = StageHistogram()
+        for _ in range(repetitions):
+            for image in images:
+                start = time.perf_counter()
+                digit_quads(cropper, image)
+                hist.observe(time.perf_counter() - start)
+        results[mode] = hist.summary()
+    return results
+
+
+def compare_crops(croppers: Dict, images: List[np.ndarray]) -> Dict:
+    """Compare the digit quads and warped digits of both modes per image."""
+    both = only_full = only_polygon = 0
+    corner_errors, pixel_diffs = [], []
+    for image in images:
+        full = digit_quads(croppers['full'], image)
+        polygon = digit_quads(croppers['polygon'], image)
+        if full is None or polygon is None:
+            only_full += full is not None
+            only_polygon += polygon is not None
+            continue
+        both += 1
+        corner_errors.extend(np.linalg.norm(order_quads(full) - order_quads(polygon), axis=2).mean(axis=1))
+        for a, b in zip(warp_quads(image, full), warp_quads(image, polygon)):
+            if a is None or b is None:
+                continue
+            b = cv2.resize(b, (a.shape[1], a.shape[0]), interpolation=cv2.INTER_LINEAR)
+            pixel_diffs.append(np.abs(a.astype(np.int16) - b.astype(np.int16)).mean() / 255)
+
+    return {
+        'images': len(images),
+        'accepted_both': both,
+        'accepted_full_only': only_full,
+        'accepted_polygon_only': only_polygon,
+        'corner_error_mean_px': round(float(np.mean(corner_errors)), 2) if corner_errors else None,
+        'corner_error_max_px': round(float(np.max(corner_errors)), 2) if corner_errors else None,
+        'pixel_diff_mean_pct': round(float(np.mean(pixel_diffs)) * 100, 2) if pixel_diffs else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the polygon-only mask path with full-size masks")
+    parser.add_argument('--rois', type=int, default=20, help="Synthetic ROIs (half with border)")
+    parser.add_argument('--repetitions', type=int, default=3)
+    parser.add_argument('--model', default=Settings.model_path, help="YOLO weights")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"❌ Model tidak ditemukan di {args.model}")
+        return
+
+    rng = np.random.default_rng(3)
+    images = [generate_roi(rng, with_border=(i % 2 == 0))[0] for i in range(args.rois)]
+    croppers = build_croppers(Settings(model_path=args.model))
+
+    latency = time_modes(croppers, images, args.repetitions)
+    equivalence = compare_crops(croppers, images)
+    if croppers['polygon'].mask_mode != 'polygon':
+        print("⚠️  Versi ultralytics ini tidak mendukung polygon mode, dibandingkan dengan dirinya sendiri")
+
+    print("\n" + "=" * 60)
+    print(f"🎭 MASK PATH BENCHMARK ({args.rois} ROI, {args.repetitions} repetitions)")
+    print("=" * 60)
+    print(f"{'Mode':<12}{'p50 ms':>12}{'p95 ms':>12}{'Mean ms':>12}")
+    for mode, r in latency.items():
+        print(f"{mode:<12}{r['p50_ms']:>12.2f}{r['p95_ms']:>12.2f}{r['mean_ms']:>12.2f}")
+    if latency['polygon']['p50_ms']:
+        print(f"Speedup p50: {latency['full']['p50_ms'] / latency['polygon']['p50_ms']:.2f}x")
+    print("-" * 60)
+    print(f"Diterima keduanya: {equivalence['accepted_both']}/{equivalence['images']} "
+          f"(full saja: {equivalence['accepted_full_only']}, "
+          f"polygon saja: {equivalence['accepted_polygon_only']})")
+    print(f"Selisih sudut quad: rata-rata {equivalence['corner_error_mean_px']} px, "
+          f"maks {equivalence['corner_error_max_px']} px")
+    print(f"Selisih piksel digit: {equivalence['pixel_diff_mean_pct']}%")
+    print("=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
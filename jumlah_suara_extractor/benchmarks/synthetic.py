@@ -0,0 +1,157 @@
+"""
+Synthetic ROI generator for benchmarks.
+
+Renders a vote-count ROI like the ones downloaded from kawalpemilu: three
+paslon rows of three boxed handwritten-ish digits. Noise, blur, rotation
+and perspective distortion are added so the cropper and border processors
+do realistic work. No downloaded data is needed.
+"""
+
+import os
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+ROI_WIDTH = 640
+ROI_HEIGHT = 640
+BOX_WIDTH = 110
+BOX_HEIGHT = 140
+BOX_GAP_X = 30
+BOX_GAP_Y = 50
+
+
+def _box_corners() -> np.ndarray:
+    """Undistorted corners of the 9 boxes, shape (9, 4, 2), paslon-major order."""
+    grid_width = 3 * BOX_WIDTH + 2 * BOX_GAP_X
+    grid_height = 3 * BOX_HEIGHT + 2 * BOX_GAP_Y
+    x0 = ROI_WIDTH - grid_width - 60
+    y0 = (ROI_HEIGHT - grid_height) // 2
+
+    corners = []
+    for row in range(3):
+        for col in range(3):
+            x = x0 + col * (BOX_WIDTH + BOX_GAP_X)
+            y = y0 + row * (BOX_HEIGHT + BOX_GAP_Y)
+            corners.append([[x, y], [x + BOX_WIDTH, y], [x + BOX_WIDTH, y + BOX_HEIGHT], [x, y + BOX_HEIGHT]])
+    return np.array(corners, dtype=np.float32)
+
+
+def generate_roi(rng: np.random.Generator, with_border: bool = True,
+                 max_rotation: float = 4.0, max_perspective: float = 0.03,
+                 noise_sigma: float = 6.0) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+    """
+    Render one synthetic ROI.
+
+    Args:
+        rng: Random generator
+        with_border: Thick box borders (True) or thin ones (False)
+        max_rotation: Maximum rotation in degrees
+        max_perspective: Maximum corner jitter as a fraction of the image size
+        noise_sigma: Gaussian pixel noise
+
+    Returns:
+        Tuple of (BGR image, box quads (9, 4, 2) after distortion, 9 digit values)
+    """
+    paper = rng.normal(232, 6, size=(ROI_HEIGHT, ROI_WIDTH)).clip(0, 255).astype(np.uint8)
+    img = cv2.cvtColor(paper, cv2.COLOR_GRAY2BGR)
+
+    corners = _box_corners()
+    digits = [int(d) for d in rng.integers(0, 10, size=9)]
+    thickness = int(rng.integers(4, 8)) if with_border else 1
+
+    for idx, quad in enumerate(corners):
+        (x1, y1), (x2, y2) = quad[0].astype(int), quad[2].astype(int)
+        cv2.rectangle(img, (x1, y1), (x2, y2), (20, 20, 20), thickness)
+
+        # Handwriting-like digit in blue ink, slightly off-center
+        scale = float(rng.uniform(3.2, 4.2))
+        ink = (int(rng.integers(90, 150)), int(rng.integers(30, 60)), int(rng.integers(10, 40)))
+        origin = (x1 + int(rng.integers(15, 30)), y2 - int(rng.integers(20, 35)))
+        cv2.putText(img, str(digits[idx]), origin, cv2.FONT_HERSHEY_SCRIPT_SIMPLEX,
+                    scale, ink, int(rng.integers(4, 8)), cv2.LINE_AA)
+
+    # Paslon number labels left of each row, as on the real form
+    for row in range(3):
+        y = int(corners[row * 3][3][1]) - 40
+        cv2.putText(img, f"0{row + 1}", (30, y), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (30, 30, 30), 3, cv2.LINE_AA)
+
+    # Rotation + perspective as one homography
+    center = (ROI_WIDTH / 2, ROI_HEIGHT / 2)
+    rotation = np.vstack([cv2.getRotationMatrix2D(center, float(rng.uniform(-max_rotation, max_rotation)), 1.0),
+                          [0, 0, 1]])
+    src = np.float32([[0, 0], [ROI_WIDTH, 0], [ROI_WIDTH, ROI_HEIGHT], [0, ROI_HEIGHT]])
+    jitter = rng.uniform(-max_perspective, max_perspective, size=(4, 2)) * [ROI_WIDTH, ROI_HEIGHT]
+    perspective = cv2.getPerspectiveTransform(src, (src + jitter).astype(np.float32))
+    homography = perspective @ rotation
+
+    img = cv2.warpPerspective(img, homography, (ROI_WIDTH, ROI_HEIGHT),
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=(232, 232, 232))
+    quads = cv2.perspectiveTransform(corners.reshape(-1, 1, 2), homography).reshape(9, 4, 2)
+
+    # Camera noise and slight blur
+    noise = rng.normal(0, noise_sigma, size=img.shape)
+    img = (img.astype(np.float32) + noise).clip(0, 255).astype(np.uint8)
+    if rng.random() < 0.5:
+        img = cv2.GaussianBlur(img, (3, 3), 0)
+
+    return img, quads, digits
+
+
+def generate_dataset(output_dir: str, count: int, seed: int = 0, with_border: bool = True,
+                     province: str = "SYNTHETIC") -> List[Tuple]:
+    """
+    Write synthetic ROIs like the scraper would, and return scan tuples.
+
+    Args:
+        output_dir: Folder to write ROI images into
+        count: Number of ROIs
+        seed: Random seed
+        with_border: Thick box borders (True) or thin ones (False)
+        province: Province name used in the tuples
+
+    Returns:
+        List of (image_path, province, regency, district, village, kode_kelurahan, nomor_tps),
+        the same shape as scan_roi_images()
+    """
+    rng = np.random.default_rng(seed)
+    village_dir = os.path.join(output_dir, province, "REGENCY", "DISTRICT", "VILLAGE")
+    os.makedirs(village_dir, exist_ok=True)
+
+    images = []
+    for i in range(count):
+        img, _, _ = generate_roi(rng, with_border=with_border)
+        kode_kelurahan = f"{9900000000 + i // 20}"
+        nomor_tps = f"{i % 20 + 1:03d}"
+        path = os.path.join(village_dir, f"raw_{kode_kelurahan}_{nomor_tps}_{i:05x}.jpg")
+        cv2.imwrite(path, img)
+        images.append((path, province, "REGENCY", "DISTRICT", "VILLAGE", kode_kelurahan, nomor_tps))
+    return images
+
+
+def ground_truth_crops(count: int, seed: int = 0, with_border: bool = True) -> List[np.ndarray]:
+    """
+    Cut digit boxes out of synthetic ROIs by their true quads.
+
+    These stand in for the cropper's initial warp, so the border processors
+    can be benchmarked without a YOLO model.
+
+    Args:
+        count: Number of crops (9 per ROI)
+        seed: Random seed
+        with_border: Thick box borders (True) or thin ones (False)
+
+    Returns:
+        List of BGR digit crops
+    """
+    from ..core.processors import four_point_transform
+
+    rng = np.random.default_rng(seed)
+    crops: List[np.ndarray] = []
+    while len(crops) < count:
+        img, quads, _ = generate_roi(rng, with_border=with_border)
+        for quad in quads:
+            # Loosen the quad a little, like a segmentation mask would
+            center = quad.mean(axis=0)
+            crops.append(four_point_transform(img, center + (quad - center) * 1.06))
+    return crops[:count]
@@ -2,6 +2,7 @@
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 
 @dataclass
@@ -13,17 +14,49 @@ class Settings:
     yolo_conf: float = 0.25
     yolo_iou: float = 0.5
     yolo_imgsz: int = 1280
+    model_backend: str = "ultralytics"
+    model_device: Optional[str] = None  # "cpu", "cuda:0", ... (None = auto)
+    model_warmup: bool = True  # blank prediction after loading, off the critical path
+    decode_reduction: int = 1  # 1/2/4/8 = decode at 1/n size, 0 = auto (longer side >= yolo_imgsz)
+    mask_mode: str = "polygon"  # "polygon" (low-res contours) or "full" (full-size masks)
+    
+    # Shared inference server (python -m jumlah_suara_extractor.server)
+    inference_server: Optional[str] = None  # "http://127.0.0.1:8765" or "unix:///path.sock" = crop via the server
+    inference_server_listen: str = "http://127.0.0.1:8765"  # server's default --listen
+    server_max_batch: int = 8
+    server_batch_window_ms: float = 10.0  # wait after the first request for more to batch
+    server_max_queue: int = 256  # queued requests before new ones are rejected (503)
     
     # Path configuration
     output_roi_path: str = "output_roi"
     default_output_path: str = "output_digits"
+    dataset_shard_max_mb: int = 512
+    stored_log_name: str = "stored_images.jsonl"  # scraper's IMAGES_STORED_LOG for streaming mode
+    
+    # Crop encoding: "jpg", "png", "webp" or "npy"
+    output_format: str = "jpg"
+    jpeg_quality: int = 95
+    png_compression: int = 1  # zlib level 0-9, low = fast encode
+    webp_quality: int = 90
+    
+    # Tensor export (fixed-shape digits in digits.npy)
+    tensor_height: int = 64
+    tensor_width: int = 64
+    tensor_batch_size: int = 256
     
     # Processing configuration
     with_border_peel_pixels: int = 6
     without_border_peel_pixels: int = 7
+    preselect_photos: bool = True  # per TPS, run YOLO on the best photo first, skip near-duplicates
+    border_method: str = "contour"  # "projection" = profile slicing, contour fallback
     
     # Performance configuration
     benchmark_sample_size: int = 5
+    border_threads: int = 4  # digits border-processed in parallel (0/1 = inline)
+    writer_threads: int = 4
+    writer_max_pending: int = 256  # queued crops before the extraction loop waits
+    atomic_writes: bool = True
+    stream_poll_interval: float = 0.2  # seconds between checks of the stored-image log
     
     @classmethod
     def from_dict(cls, config_dict: dict) -> 'Settings':
@@ -1,13 +1,17 @@
 """Core package for digit cropping functionality."""
 
-from .cropper import DigitCropper
-from .processors import WithBorderProcessor, WithoutBorderProcessor
+from .cropper import DigitCropper, get_border_pool
+from .processors import WithBorderProcessor, WithoutBorderProcessor, ProjectionBorderProcessor
 from .interfaces import BorderProcessor, ICropper
+from .remote_cropper import RemoteCropper
 
 __all__ = [
     'DigitCropper',
+    'get_border_pool',
     'WithBorderProcessor',
     'WithoutBorderProcessor',
+    'ProjectionBorderProcessor',
     'BorderProcessor',
     'ICropper',
+    'RemoteCropper',
 ]
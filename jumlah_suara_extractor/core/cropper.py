@@ -2,12 +2,48 @@
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import nullcontext
+import threading
 import time
+import weakref
 
 from .interfaces import BorderProcessor
-from .processors import warp_from_mask_initial
+from .geometry import group_grid, mask_quads, warp_quads
+from .polygon_masks import create_polygon_predictor
+from ..utils.image_io import REDUCED_FLAGS, load_bgr_reduced
+from ..utils.metrics import PerformanceTracker
+
+# ultralytics imports torch; the model instance is created by Injector.get_model()
+if TYPE_CHECKING:
+    from ultralytics import YOLO
+
+_border_pools = {}
+_border_pools_lock = threading.Lock()
+
+
+def get_border_pool(workers: int) -> Optional[Executor]:
+    """
+    Get the process-wide border processing pool of the given size.
+    
+    OpenCV releases the GIL in threshold, findContours and warpPerspective,
+    so threads process digits in parallel. Croppers share one pool per size
+    instead of each starting its own threads.
+    
+    Args:
+        workers: Number of threads (0 or 1 = process inline, returns None)
+        
+    Returns:
+        Shared ThreadPoolExecutor, or None for inline processing
+    """
+    if workers <= 1:
+        return None
+    with _border_pools_lock:
+        pool = _border_pools.get(workers)
+        if pool is None:
+            pool = _border_pools[workers] = ThreadPoolExecutor(workers, thread_name_prefix='border')
+        return pool
 
 
 class DigitCropper:
@@ -16,175 +52,293 @@ class DigitCropper:
     Uses dependency injection for border processing strategy.
     """
     
-    def __init__(self, model: YOLO, border_processor: BorderProcessor):
+    def __init__(self, model: 'YOLO', border_processor: BorderProcessor,
+                 tracker: Optional[PerformanceTracker] = None, device: Optional[str] = None,
+                 mask_mode: str = "polygon", border_pool: Optional[Executor] = None,
+                 decode_reduction: int = 1):
         """
         Initialize DigitCropper with injected dependencies.
         
         Args:
             model: YOLO model instance
             border_processor: Border processing strategy
+            tracker: Receives per-stage timings (optional)
+            device: Inference device, e.g. "cpu" or "cuda:0" (None = auto)
+            mask_mode: "polygon" traces digit polygons on the low-resolution
+                prototype masks, "full" uses ultralytics' full-size masks
+            border_pool: Executor for border processing (see get_border_pool;
+                None = process digits inline)
+            decode_reduction: Decode images at 1/1, 1/2, 1/4 or 1/8 size;
+                0 = the largest reduction that keeps them >= imgsz
         """
+        if decode_reduction != 0 and decode_reduction not in REDUCED_FLAGS:
+            raise ValueError(f"decode_reduction must be 0, 1, 2, 4 or 8, got {decode_reduction}")
         self.model = model
         self.border_processor = border_processor
+        self.tracker = tracker
+        self.predict_kwargs = {'conf': 0.25, 'iou': 0.5, 'imgsz': 1280, 'verbose': False}
+        if device:
+            self.predict_kwargs['device'] = device
+        self.mask_mode = mask_mode
+        self._polygon_predictor = None
+        self.border_pool = border_pool
+        self.decode_reduction = decode_reduction
+        # id of a reduced image from load_image -> its reduction, so warps
+        # are scaled back up and the absolute border peel stays right
+        self._reductions = {}
+    
+    def _stage(self, name: str):
+        """Time a block as pipeline stage ``name`` when a tracker is set."""
+        return self.tracker.stage(name) if self.tracker else nullcontext()
+    
+    def load_image(self, source) -> Optional[np.ndarray]:
+        """
+        Decode cropper input once, with the configured decode reduction.
+        
+        Args:
+            source: File path, ShardMember, encoded bytes or a decoded BGR array
+            
+        Returns:
+            BGR image, or None if it could not be decoded
+        """
+        if isinstance(source, np.ndarray) and source.ndim >= 2:
+            return source
+        try:
+            with self._stage('decode'):
+                image, reduction = load_bgr_reduced(source, self.decode_reduction, self.predict_kwargs['imgsz'])
+        except (OSError, cv2.error):
+            return None
+        if image is not None and reduction > 1:
+            key = id(image)
+            self._reductions[key] = reduction
+            weakref.finalize(image, self._reductions.pop, key, None)
+        return image
+    
+    def _predict(self, image):
+        """Run YOLO on a decoded image (or a list of them), polygon-only when mask_mode is "polygon"."""
+        if self.mask_mode == "polygon" and self._polygon_predictor is None:
+            try:
+                self._polygon_predictor = create_polygon_predictor(self.model, self.predict_kwargs)
+            except (AttributeError, TypeError):
+                # Model or ultralytics version without the segmentation
+                # predictor internals we build on; use the standard path
+                self.mask_mode = "full"
+        if self.mask_mode == "polygon":
+            return self._polygon_predictor(image)
+        return self.model.predict(image, **self.predict_kwargs)
+    
+    def _digit_polygons(self, result) -> Optional[List[np.ndarray]]:
+        """
+        Mask polygons of the 9 digits in 3x3 grid order.
+        
+        Args:
+            result: YOLO result of one image
+            
+        Returns:
+            9 polygons, or None if the detections don't form the digit grid
+        """
+        # Polygon mode results carry polygons instead of masks
+        traced = getattr(result, 'polygons', None)
+        if traced is None and result.masks is None:
+            return None
+        
+        # Reject wrong detection counts before touching the masks
+        grid = group_grid(result.boxes.xyxy.cpu().numpy())
+        if grid is None:
+            return None
+        
+        # masks.xy is computed lazily from the mask tensors
+        with self._stage('mask_to_polygon'):
+            source = traced if traced is not None else result.masks.xy
+            return [source[i] for i in grid.ravel()]
     
     def process_image(self, image_path: str) -> Tuple[bool, float, List[np.ndarray]]:
         """
         Process single ROI image and extract all 9 digits.
         
         Args:
-            image_path: Path to ROI image
+            image_path: Path to ROI image, ShardMember, encoded bytes or BGR array
             
         Returns:
             Tuple of (success, inference_time, list of cropped digit images)
         """
+        return self.process_images([image_path])[0]
+    
+    def process_images(self, image_paths: List) -> List[Tuple[bool, float, List[np.ndarray]]]:
+        """
+        Process a batch of ROI images.
+        
+        Border processing of an image runs on the border pool while the next
+        image is decoded and inferred, so digits of all images in the batch
+        share the pool.
+        
+        Args:
+            image_paths: ROI images, anything process_image accepts
+            
+        Returns:
+            One (success, inference_time, digits) tuple per image, as process_image
+        """
+        pending = [self.submit_image(image_path) for image_path in image_paths]
+        return [(success, inference_time, [f.result() for f in futures])
+                for success, inference_time, futures in pending]
+    
+    def submit_image(self, image_path) -> Tuple[bool, float, List[Future]]:
+        """
+        Decode, infer and warp one image, and queue its digits on the border pool.
+        
+        Returns without waiting for border processing, so the caller can
+        go on with the next image; ExtractionService hands the futures to
+        the image writer.
+        
+        Args:
+            image_path: Anything process_image accepts
+            
+        Returns:
+            Tuple of (success, inference_time, one future per digit image)
+        """
+        success, inference_time, warps = self._warp_digits(image_path)
+        return success, inference_time, self.submit_borders(warps)
+    
+    def _warp_digits(self, image_path) -> Tuple[bool, float, List[Optional[np.ndarray]]]:
+        """
+        Decode, detect and deskew the 9 digits of one image (before border processing).
+        
+        Returns:
+            Tuple of (success, inference_time, 9 initial warps in 3x3 grid
+            order, None for degenerate masks)
+        """
         try:
             # Load image
-            img_bgr = cv2.imread(image_path)
+            img_bgr = self.load_image(image_path)
             if img_bgr is None:
                 return False, 0.0, []
             
-            # YOLO inference
+            # YOLO inference on the decoded image, avoids reading the file twice
             start_time = time.time()
-            results = self.model.predict(image_path, conf=0.25, iou=0.5, imgsz=1280, verbose=False)
+            with self._stage('inference'):
+                results = self._predict(img_bgr)
             inference_time = time.time() - start_time
             
-            result = results[0]
-            
-            if result.masks is None:
-                return False, inference_time, []
-            
-            # Extract digits
-            digits = self._extract_digits(img_bgr, result.masks.xy, result.boxes.xyxy.cpu().numpy())
-            
-            return True, inference_time, digits
+            success, initial_warps = self.warp_result(img_bgr, results[0])
+            return success, inference_time, initial_warps
             
         except Exception as e:
             return False, 0.0, []
     
+    def predict_batch(self, images: List[np.ndarray]) -> Tuple[list, float]:
+        """
+        Run YOLO once on several decoded images (micro-batching, see server.py).
+        
+        Args:
+            images: BGR images
+            
+        Returns:
+            Tuple of (one result per image, inference time of the whole batch)
+        """
+        start_time = time.time()
+        with self._stage('inference'):
+            results = self._predict(list(images))
+        return list(results), time.time() - start_time
+    
+    def warp_result(self, img_bgr: np.ndarray, result) -> Tuple[bool, List[Optional[np.ndarray]]]:
+        """
+        Deskew the 9 digits found in a YOLO result (before border processing).
+        
+        Args:
+            img_bgr: Image the result was predicted on
+            result: YOLO result of that image
+            
+        Returns:
+            Tuple of (success, 9 initial warps in 3x3 grid order, None for
+            degenerate masks); pass the warps to submit_borders()
+        """
+        polygons = self._digit_polygons(result)
+        if polygons is None:
+            return False, []
+        
+        # Initial warp of all digits at once, quads as one (N, 4, 2) array.
+        # Warps of a reduced decode get their full-resolution size, the
+        # border processors peel a fixed number of pixels.
+        scale = self._reductions.get(id(img_bgr), 1)
+        with self._stage('warp'):
+            return True, warp_quads(img_bgr, mask_quads(polygons), scale)
+    
     def extract_paslon_rows(self, image_path: str) -> Tuple[bool, List[np.ndarray]]:
         """
         Extract paslon rows (3 digits combined per paslon).
         
         Args:
-            image_path: Path to ROI image
+            image_path: Path to ROI image, ShardMember, encoded bytes or BGR array
             
         Returns:
             Tuple of (success, list of 3 paslon row images)
         """
         try:
             # Load image
-            img_bgr = cv2.imread(image_path)
+            img_bgr = self.load_image(image_path)
             if img_bgr is None:
                 return False, []
             
             # YOLO inference
-            results = self.model.predict(image_path, conf=0.25, iou=0.5, imgsz=1280, verbose=False)
-            result = results[0]
-            
-            if result.masks is None:
-                return False, []
-            
-            boxes = result.boxes.xyxy.cpu().numpy()
-            
-            # Organize detected objects with bounding boxes
-            detected_objects = []
-            for i, box in enumerate(boxes):
-                x1, y1, x2, y2 = map(int, box)
-                detected_objects.append({
-                    'box': box,
-                    'center_y': (y1+y2)/2,
-                    'center_x': (x1+x2)/2
-                })
-            
-            # Sort by Y position (top to bottom)
-            detected_objects.sort(key=lambda k: k['center_y'])
-            
-            # Group into 3 rows (paslon 1, 2, 3)
-            rows = []
-            for i in range(0, 9, 3):
-                chunk = detected_objects[i:i+3]
-                if chunk:
-                    # Sort each row by X position (left to right)
-                    chunk.sort(key=lambda k: k['center_x'])
-                    rows.append(chunk)
-            
-            # Extract each paslon row
-            paslon_rows = []
-            for row in rows:
-                if len(row) < 3:
-                    # Not enough digits, skip
-                    paslon_rows.append(np.zeros((64, 200, 3), dtype=np.uint8))
-                    continue
-                
-                # Get bounding box from leftmost to rightmost digit
-                leftmost_box = row[0]['box']
-                rightmost_box = row[2]['box']
-                
-                # Combined bounding box
-                x1 = int(leftmost_box[0])
-                y1 = int(min(leftmost_box[1], rightmost_box[1]))
-                x2 = int(rightmost_box[2])
-                y2 = int(max(leftmost_box[3], rightmost_box[3]))
-                
-                # Crop the row
-                row_img = img_bgr[y1:y2, x1:x2]
-                
-                paslon_rows.append(row_img)
-            
-            return True, paslon_rows
+            # Rows only need the boxes
+            with self._stage('inference'):
+                results = self._predict(img_bgr)
+            return self.paslon_rows_from_result(img_bgr, results[0])
             
         except Exception as e:
             return False, []
     
-    def _extract_digits(self, image: np.ndarray, masks, boxes) -> List[np.ndarray]:
+    def paslon_rows_from_result(self, img_bgr: np.ndarray, result) -> Tuple[bool, List[np.ndarray]]:
         """
-        Extract all 9 digits from image in 3x3 grid order.
+        Cut the 3 paslon rows out of an image using its YOLO result.
         
         Args:
-            image: Source image
-            masks: YOLO masks
-            boxes: YOLO bounding boxes
+            img_bgr: Image the result was predicted on
+            result: YOLO result of that image
             
         Returns:
-            List of 9 cropped digit images
-        """
-        # Organize detected objects
-        detected_objects = []
-        for i, box in enumerate(boxes):
-            x1, y1, x2, y2 = map(int, box)
-            detected_objects.append({
-                'mask': masks[i],
-                'center_y': (y1+y2)/2,
-                'center_x': (x1+x2)/2
-            })
-        
-        # Sort by Y position (top to bottom)
-        detected_objects.sort(key=lambda k: k['center_y'])
-        
-        # Group into 3 rows (paslon 1, 2, 3)
-        rows = []
-        for i in range(0, 9, 3):
-            chunk = detected_objects[i:i+3]
-            if chunk:
-                # Sort each row by X position (left to right)
-                chunk.sort(key=lambda k: k['center_x'])
-                rows.append(chunk)
-        
-        # Process each digit
-        cropped_digits = []
-        for row_idx, row in enumerate(rows):
-            for digit_idx, obj in enumerate(row):
-                try:
-                    # Initial warp from mask
-                    initial_warp = warp_from_mask_initial(image, obj['mask'])
-                    
-                    # Apply border processing using injected processor
-                    final_img = self.border_processor.process(initial_warp)
-                    
-                    cropped_digits.append(final_img)
-                    
-                except Exception as e:
-                    # Add empty image on failure
-                    cropped_digits.append(np.zeros((64, 64, 3), dtype=np.uint8))
-        
-        return cropped_digits
+            Tuple of (success, list of 3 paslon row images)
+        """
+        boxes = result.boxes.xyxy.cpu().numpy()
+        grid = group_grid(boxes)
+        if grid is None:
+            return False, []
+        
+        # Each paslon row spans from its leftmost to its rightmost digit
+        left, right = boxes[grid[:, 0]], boxes[grid[:, -1]]
+        spans = np.stack([
+            left[:, 0],
+            np.minimum(left[:, 1], right[:, 1]),
+            right[:, 2],
+            np.maximum(left[:, 3], right[:, 3]),
+        ], axis=1).astype(int)
+        return True, [img_bgr[y1:y2, x1:x2] for x1, y1, x2, y2 in spans]
+    
+    def _border_one(self, initial_warp: Optional[np.ndarray]) -> np.ndarray:
+        """Apply the injected border processor to one digit (empty image on failure)."""
+        try:
+            if initial_warp is None:
+                raise ValueError("degenerate mask")
+            
+            with self._stage('border'):
+                return self.border_processor.process(initial_warp)
+            
+        except Exception as e:
+            return np.zeros((64, 64, 3), dtype=np.uint8)
+    
+    def submit_borders(self, initial_warps: List[Optional[np.ndarray]]) -> List[Future]:
+        """
+        Border-process digits on the border pool (inline without a pool).
+        
+        Returns:
+            One future per digit, same order as initial_warps
+        """
+        if self.border_pool is not None:
+            return [self.border_pool.submit(self._border_one, warp) for warp in initial_warps]
+        
+        futures = []
+        for warp in initial_warps:
+            future = Future()
+            future.set_result(self._border_one(warp))
+            futures.append(future)
+        return futures
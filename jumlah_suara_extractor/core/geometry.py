@@ -0,0 +1,199 @@
+"""
+Batched quad geometry for digit warping.
+
+All functions take quads as one ``(N, 4, 2)`` array, e.g. the 9 digit
+boxes of a TPS, and work on the whole batch with NumPy array operations
+instead of a Python loop per quad. Only the final ``cv2.warpPerspective``
+calls run per quad.
+"""
+
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+
+def order_quads(quads: np.ndarray) -> np.ndarray:
+    """
+    Order the corners of each quad as top-left, top-right, bottom-right, bottom-left.
+
+    Args:
+        quads: (N, 4, 2) corner points in any order
+
+    Returns:
+        (N, 4, 2) float32 ordered corners
+    """
+    quads = np.asarray(quads, dtype=np.float32).reshape(-1, 4, 2)
+    s = quads.sum(axis=2)
+    d = quads[:, :, 1] - quads[:, :, 0]
+    idx = np.stack([s.argmin(axis=1), d.argmin(axis=1), s.argmax(axis=1), d.argmax(axis=1)], axis=1)
+    return np.take_along_axis(quads, idx[:, :, None], axis=1)
+
+
+def target_sizes(rects: np.ndarray) -> np.ndarray:
+    """
+    Output (width, height) of each warp: the longer of opposite edges, truncated.
+
+    Args:
+        rects: (N, 4, 2) ordered corners (see order_quads)
+
+    Returns:
+        (N, 2) int array of (width, height)
+    """
+    tl, tr, br, bl = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+    widths = np.maximum(np.linalg.norm(br - bl, axis=1), np.linalg.norm(tr - tl, axis=1))
+    heights = np.maximum(np.linalg.norm(tr - br, axis=1), np.linalg.norm(tl - bl, axis=1))
+    return np.stack([widths, heights], axis=1).astype(np.int64)
+
+
+def inset_quads(quads: np.ndarray, pixels: float) -> np.ndarray:
+    """
+    Move every corner ``pixels`` towards its quad's center (diagonal step of pixels * 1.414).
+
+    Args:
+        quads: (N, 4, 2) corner points
+        pixels: Inset distance per side
+
+    Returns:
+        (N, 4, 2) float32 ordered, inset corners
+    """
+    rects = order_quads(quads)
+    vectors = rects.mean(axis=1, keepdims=True) - rects
+    lengths = np.linalg.norm(vectors, axis=2, keepdims=True)
+    # Degenerate quads (corner == center) stay where they are
+    step = np.divide(vectors, lengths, out=np.zeros_like(vectors), where=lengths > 0)
+    return rects + step * (pixels * 1.414)
+
+
+def perspective_matrices(rects: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """
+    Perspective transforms mapping each quad onto its (width, height) rectangle.
+
+    Equivalent to cv2.getPerspectiveTransform per quad, solved as one batched
+    8x8 linear system.
+
+    Args:
+        rects: (N, 4, 2) ordered corners
+        sizes: (N, 2) output (width, height)
+
+    Returns:
+        (N, 3, 3) float64 matrices (identity for degenerate quads)
+    """
+    n = len(rects)
+    src = rects.astype(np.float64)
+    w = sizes[:, 0].astype(np.float64) - 1
+    h = sizes[:, 1].astype(np.float64) - 1
+    zeros = np.zeros(n)
+    dst = np.stack([
+        np.stack([zeros, zeros], axis=1),
+        np.stack([w, zeros], axis=1),
+        np.stack([w, h], axis=1),
+        np.stack([zeros, h], axis=1),
+    ], axis=1)
+
+    x, y = src[:, :, 0], src[:, :, 1]
+    u, v = dst[:, :, 0], dst[:, :, 1]
+    one, zero = np.ones_like(x), np.zeros_like(x)
+    rows_u = np.stack([x, y, one, zero, zero, zero, -x * u, -y * u], axis=2)
+    rows_v = np.stack([zero, zero, zero, x, y, one, -x * v, -y * v], axis=2)
+    a = np.stack([rows_u, rows_v], axis=2).reshape(n, 8, 8)
+    b = np.stack([u, v], axis=2).reshape(n, 8)
+
+    # Collinear corners make the system singular; solve those as identity
+    valid = np.abs(np.linalg.det(a)) > 1e-9
+    a[~valid] = np.eye(8)
+    b[~valid] = 0
+
+    coeffs = np.linalg.solve(a, b[:, :, None])[:, :, 0]
+    matrices = np.concatenate([coeffs, np.ones((n, 1))], axis=1).reshape(n, 3, 3)
+    matrices[~valid] = np.eye(3)
+    return matrices
+
+
+def warp_quads(image: np.ndarray, quads: np.ndarray, scale: float = 1.0) -> List[Optional[np.ndarray]]:
+    """
+    Warp every quad of an image to an upright rectangle.
+
+    Args:
+        image: Source image
+        quads: (N, 4, 2) corner points in any order
+        scale: Output size factor, e.g. the decode reduction of a reduced
+            image, so warps get the size they would have at full resolution
+
+    Returns:
+        N warped images; None where the quad is degenerate (zero width or height)
+    """
+    quads = np.asarray(quads).reshape(-1, 4, 2)
+    if len(quads) == 0:
+        return []
+    rects = order_quads(quads)
+    sizes = target_sizes(rects)
+    if scale != 1:
+        sizes = (sizes * scale).astype(np.int64)
+    matrices = perspective_matrices(rects, sizes)
+
+    warped = []
+    for matrix, (width, height) in zip(matrices, sizes):
+        if width <= 0 or height <= 0:
+            warped.append(None)
+            continue
+        warped.append(cv2.warpPerspective(image, matrix, (int(width), int(height))))
+    return warped
+
+
+def mask_quads(polygons) -> np.ndarray:
+    """
+    Minimum-area rotated box of each mask polygon, as integer corners.
+
+    Args:
+        polygons: Sequence of (K, 2) mask polygons (e.g. YOLO ``masks.xy``)
+
+    Returns:
+        (N, 4, 2) int32 corners (all zero for empty polygons)
+    """
+    quads = np.zeros((len(polygons), 4, 2), dtype=np.int32)
+    for i, polygon in enumerate(polygons):
+        contour = np.asarray(polygon, dtype=np.int32)
+        if len(contour):
+            quads[i] = np.int32(cv2.boxPoints(cv2.minAreaRect(contour)))
+    return quads
+
+
+def group_grid(boxes: np.ndarray, rows: int = 3, cols: int = 3) -> Optional[np.ndarray]:
+    """
+    Arrange detections into a rows x cols grid (paslon rows, digit positions).
+
+    Rows are split at the ``rows - 1`` largest vertical gaps between box
+    centers, then each row is ordered left to right. Unlike chunking the
+    y-sorted list by 3, a slightly rotated form can't move a digit into the
+    wrong row.
+
+    Args:
+        boxes: (N, 4) xyxy boxes
+        rows: Expected number of rows
+        cols: Expected detections per row
+
+    Returns:
+        (rows, cols) detection indices, or None if the detections don't form
+        exactly that grid (wrong count, or a row with too many/few boxes)
+    """
+    boxes = np.asarray(boxes).reshape(-1, 4)
+    if len(boxes) != rows * cols:
+        return None
+
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+
+    by_y = np.argsort(cy, kind='stable')
+    row_of_sorted = np.zeros(len(boxes), dtype=np.int64)
+    if rows > 1:
+        gaps = np.diff(cy[by_y])
+        breaks = np.argpartition(gaps, -(rows - 1))[-(rows - 1):] + 1
+        row_of_sorted[breaks] = 1
+        row_of_sorted = np.cumsum(row_of_sorted)
+    if np.any(np.bincount(row_of_sorted, minlength=rows) != cols):
+        return None
+
+    row_of = np.empty_like(row_of_sorted)
+    row_of[by_y] = row_of_sorted
+    return np.lexsort((cx, row_of)).reshape(rows, cols)
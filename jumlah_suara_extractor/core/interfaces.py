@@ -1,6 +1,7 @@
 """Core interfaces and protocols for jumlah_suara_extractor."""
 
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from typing import Protocol, Tuple, List
 import numpy as np
 
@@ -24,26 +25,58 @@ class BorderProcessor(Protocol):
 class ICropper(ABC):
     """Abstract interface for digit cropping."""
     
+    @abstractmethod
+    def load_image(self, source):
+        """
+        Read cropper input once, to pass to process_image and extract_paslon_rows.
+        
+        Args:
+            source: File path, ShardMember, encoded bytes or a decoded BGR array
+            
+        Returns:
+            Input the other methods accept, or None if it can't be read
+        """
+        pass
+    
     @abstractmethod
     def process_image(self, image_path: str) -> Tuple[bool, float, List[np.ndarray]]:
         """
         Process single ROI image and extract all 9 digits.
         
         Args:
-            image_path: Path to ROI image
+            image_path: Path to ROI image, ShardMember, encoded bytes or BGR array
             
         Returns:
             Tuple of (success, inference_time, list of cropped digit images)
         """
         pass
     
+    def submit_image(self, image_path) -> Tuple[bool, float, List[Future]]:
+        """
+        Like process_image, but return the digits as futures.
+        
+        Croppers that finish digits in the background return before that
+        work is done. This default runs process_image and returns
+        completed futures.
+        
+        Returns:
+            Tuple of (success, inference_time, one future per digit image)
+        """
+        success, inference_time, digits = self.process_image(image_path)
+        futures = []
+        for digit in digits:
+            future = Future()
+            future.set_result(digit)
+            futures.append(future)
+        return success, inference_time, futures
+    
     @abstractmethod
     def extract_paslon_rows(self, image_path: str) -> Tuple[bool, List[np.ndarray]]:
         """
         Extract paslon rows (3 digits combined per paslon).
         
         Args:
-            image_path: Path to ROI image
+            image_path: Path to ROI image, ShardMember, encoded bytes or BGR array
             
         Returns:
             Tuple of (success, list of 3 paslon row images)
@@ -0,0 +1,91 @@
+"""
+Polygon-only segmentation output.
+
+The cropper only needs one polygon per digit (for ``minAreaRect``), but the
+standard ultralytics segmentation predictor upsamples every instance mask to
+the full inference size (1280x1280 floats per digit) before ``masks.xy``
+turns them back into polygons. ``PolygonSegmentationPredictor`` keeps the
+masks at prototype resolution (1/4 of the inference size), traces the
+contour there and scales only the contour points to the original image.
+
+ultralytics is imported lazily, like everywhere else in the extractor.
+"""
+
+from typing import List
+
+import cv2
+import numpy as np
+
+
+def lowres_mask_polygons(masks: np.ndarray, input_shape, orig_shape, scale_coords) -> List[np.ndarray]:
+    """
+    Trace the outer contour of each prototype-resolution mask.
+
+    Args:
+        masks: (N, mh, mw) binary masks at prototype resolution
+        input_shape: (height, width) of the letterboxed inference input
+        orig_shape: Shape of the original image
+        scale_coords: ultralytics ``ops.scale_coords`` (removes letterbox padding)
+
+    Returns:
+        N float32 (K, 2) polygons in original image pixels (empty for empty masks)
+    """
+    polygons = []
+    if len(masks) == 0:
+        return polygons
+    mh, mw = masks.shape[1:]
+    # Contour points are pixel centers of the low-res grid
+    scale = np.array([input_shape[1] / mw, input_shape[0] / mh], dtype=np.float32)
+    for mask in masks.astype(np.uint8):
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            polygons.append(np.zeros((0, 2), dtype=np.float32))
+            continue
+        contour = max(contours, key=cv2.contourArea).reshape(-1, 2).astype(np.float32)
+        points = (contour + 0.5) * scale
+        polygons.append(np.asarray(scale_coords(input_shape, points, orig_shape), dtype=np.float32))
+    return polygons
+
+
+def _predictor_class():
+    from ultralytics.models.yolo.segment import SegmentationPredictor
+    from ultralytics.engine.results import Results
+    from ultralytics.utils import ops
+
+    class PolygonSegmentationPredictor(SegmentationPredictor):
+        """Segmentation predictor whose results carry ``polygons`` instead of full-size masks."""
+
+        def construct_result(self, pred, img, orig_img, img_path, proto):
+            input_shape = img.shape[2:]
+            polygons = []
+            if len(pred):
+                masks = ops.process_mask(proto, pred[:, 6:], pred[:, :4], input_shape, upsample=False)
+                polygons = lowres_mask_polygons(masks.cpu().numpy(), input_shape, orig_img.shape,
+                                                ops.scale_coords)
+                pred[:, :4] = ops.scale_boxes(input_shape, pred[:, :4], orig_img.shape)
+            result = Results(orig_img, path=img_path, names=self.model.names, boxes=pred[:, :6])
+            result.polygons = polygons
+            return result
+
+    return PolygonSegmentationPredictor
+
+
+def create_polygon_predictor(model, predict_kwargs: dict):
+    """
+    Build a polygon-only predictor sharing the weights of a loaded YOLO model.
+
+    Args:
+        model: Loaded ultralytics YOLO segmentation model
+        predict_kwargs: Arguments normally passed to ``model.predict``
+
+    Returns:
+        Callable predictor; ``predictor(image)`` returns a list of Results
+        with ``polygons`` set (``masks`` is None)
+
+    Raises:
+        ImportError: If ultralytics is not installed
+    """
+    overrides = {**model.overrides, **predict_kwargs, 'mode': 'predict', 'save': False}
+    predictor = _predictor_class()(overrides=overrides, _callbacks=model.callbacks)
+    predictor.setup_model(model=model.model, verbose=False)
+    return predictor
@@ -1,38 +1,30 @@
 """Border processing implementations."""
 
+import threading
+
 import cv2
 import numpy as np
-from typing import Tuple
+from typing import Dict, Optional, Tuple
+
+from .interfaces import BorderProcessor
+from .geometry import order_quads, inset_quads, warp_quads
 
 
 # ==========================================
 # COMMON HELPER FUNCTIONS
 # ==========================================
+# Single-quad wrappers around the batched kernels in geometry.py
 def order_points(pts):
     """Order points in clockwise order starting from top-left."""
-    rect = np.zeros((4, 2), dtype="float32")
-    s = pts.sum(axis=1)
-    rect[0] = pts[np.argmin(s)]
-    rect[2] = pts[np.argmax(s)]
-    diff = np.diff(pts, axis=1)
-    rect[1] = pts[np.argmin(diff)]
-    rect[3] = pts[np.argmax(diff)]
-    return rect
+    return order_quads(np.asarray(pts)[None])[0]
 
 
 def four_point_transform(image, pts):
     """Apply perspective transform to image."""
-    rect = order_points(pts)
-    (tl, tr, br, bl) = rect
-    widthA = np.sqrt(((br[0] - bl[0]) ** 2) + ((br[1] - bl[1]) ** 2))
-    widthB = np.sqrt(((tr[0] - tl[0]) ** 2) + ((tr[1] - tl[1]) ** 2))
-    maxWidth = max(int(widthA), int(widthB))
-    heightA = np.sqrt(((tr[0] - br[0]) ** 2) + ((tr[1] - br[1]) ** 2))
-    heightB = np.sqrt(((tl[0] - bl[0]) ** 2) + ((tl[1] - bl[1]) ** 2))
-    maxHeight = max(int(heightA), int(heightB))
-    dst = np.array([[0, 0], [maxWidth - 1, 0], [maxWidth - 1, maxHeight - 1], [0, maxHeight - 1]], dtype="float32")
-    M = cv2.getPerspectiveTransform(rect, dst)
-    return cv2.warpPerspective(image, M, (maxWidth, maxHeight))
+    warped = warp_quads(image, np.asarray(pts)[None])[0]
+    if warped is None:
+        raise ValueError("degenerate quad, nothing to warp")
+    return warped
 
 
 def clean_border_fallback(img):
@@ -51,22 +43,7 @@ def inset_box_pixels(box, pixels_x=6, pixels_y=6):
     """
     Inset (shrink) box by N pixels from all sides.
     """
-    rect = order_points(box)
-    (tl, tr, br, bl) = rect
-    
-    center = np.mean(rect, axis=0)
-    new_rect = np.zeros_like(rect)
-    
-    for i, corner in enumerate(rect):
-        vector = center - corner
-        length = np.linalg.norm(vector)
-        if length == 0:
-            continue
-        
-        move_vector = vector / length * (pixels_x * 1.414)
-        new_rect[i] = corner + move_vector
-    
-    return new_rect
+    return inset_quads(np.asarray(box)[None], pixels_x)[0]
 
 
 class WithBorderProcessor:
@@ -191,6 +168,114 @@ class WithoutBorderProcessor:
         return warped
 
 
+# ==========================================
+# PROJECTION PROFILE PROCESSOR
+# ==========================================
+class ProjectionBorderProcessor:
+    """
+    Border processor that slices the crop along row/column darkness profiles.
+    
+    The initial warp already deskewed the digit, so its border lines run
+    along the image rows and columns. A row (column) belongs to the border
+    when at least ``line_fraction`` of it is dark. The outermost border line
+    near each edge plus ``peel_pixels`` gives the slice, without contours or
+    a second warp. When the profile is ambiguous the crop goes to the
+    contour-based ``fallback`` processor; stats() tells how often.
+    """
+    
+    def __init__(self, fallback: BorderProcessor, peel_pixels: int = 6,
+                 line_fraction: float = 0.5, edge_band: float = 0.3):
+        """
+        Initialize processor.
+        
+        Args:
+            fallback: Contour-based processor for ambiguous crops
+            peel_pixels: Number of pixels to peel inside the outer border line
+            line_fraction: Dark share of a row/column that makes it a border line
+            edge_band: Share of the crop size, from each edge, searched for
+                the border
+        """
+        self.fallback = fallback
+        self.peel_pixels = peel_pixels
+        self.line_fraction = line_fraction
+        self.edge_band = edge_band
+        self._lock = threading.Lock()
+        self.profile_count = 0
+        self.fallback_count = 0
+    
+    def _edges(self, profile: np.ndarray) -> Optional[Tuple[int, int]]:
+        """First and last border line (exclusive end), None if not both near an edge."""
+        n = len(profile)
+        band = max(1, int(n * self.edge_band))
+        lines = np.flatnonzero(profile >= self.line_fraction)
+        if lines.size == 0 or lines[0] >= band or lines[-1] < n - band:
+            return None
+        # A border thicker than the search band is a dark blob, not a frame
+        if profile[lines[0]:lines[0] + band].min() >= self.line_fraction:
+            return None
+        if profile[lines[-1] - band + 1:lines[-1] + 1].min() >= self.line_fraction:
+            return None
+        return int(lines[0]), int(lines[-1]) + 1
+    
+    def find_bounds(self, img: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Locate the peeled digit area.
+        
+        Args:
+            img: Initially warped digit crop
+            
+        Returns:
+            (top, bottom, left, right) slice bounds, or None if ambiguous
+        """
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        _, dark = cv2.threshold(gray, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        rows = self._edges(dark.mean(axis=1))
+        cols = self._edges(dark.mean(axis=0))
+        if rows is None or cols is None:
+            return None
+        
+        (top, bottom), (left, right) = rows, cols
+        h, w = gray.shape
+        # Same validation as the contour method: the frame must cover the crop
+        if (bottom - top) * (right - left) < h * w * 0.3:
+            return None
+        
+        peel = self.peel_pixels
+        top, bottom, left, right = top + peel, bottom - peel, left + peel, right - peel
+        if bottom - top < 10 or right - left < 10:
+            return None
+        return top, bottom, left, right
+    
+    def process(self, img: np.ndarray) -> np.ndarray:
+        """
+        Process digit by slicing inside its border, contour fallback if ambiguous.
+        """
+        if img is None or img.size == 0:
+            return img
+        
+        bounds = self.find_bounds(img)
+        with self._lock:
+            if bounds is None:
+                self.fallback_count += 1
+            else:
+                self.profile_count += 1
+        
+        if bounds is None:
+            return self.fallback.process(img)
+        top, bottom, left, right = bounds
+        return img[top:bottom, left:right]
+    
+    def stats(self) -> Dict[str, float]:
+        """Digits sliced by profile vs sent to the fallback, with the fallback share."""
+        with self._lock:
+            total = self.profile_count + self.fallback_count
+            return {
+                'profile': self.profile_count,
+                'fallback': self.fallback_count,
+                'fallback_pct': round(self.fallback_count / total * 100, 1) if total else 0.0,
+            }
+
+
 def warp_from_mask_initial(image, mask_points):
     """Initial warp from YOLO mask."""
     contour = np.array(mask_points, dtype=np.int32)
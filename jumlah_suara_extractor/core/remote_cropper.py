@@ -0,0 +1,236 @@
+"""
+ICropper client for the local inference server (see ``server.py``).
+
+Requests go over HTTP, on localhost TCP or a Unix socket:
+
+- ``POST /process_image``, ``/extract_paslon_rows`` and ``/extract`` (both
+  in one inference), with ``?border_mode=with_border|without_border``
+- body: encoded image bytes (``application/octet-stream``), a BGR array as
+  ``.npy`` (``application/x-npy``) or ``{"path": ...}`` (``application/json``)
+  for a file the server reads itself
+- response: ``.npz`` with ``success``, ``inference_time``, ``digit_<i>``,
+  ``paslon_success`` and ``row_<i>`` arrays
+- ``GET /status``: batch and queue metrics as JSON
+"""
+
+import http.client
+import io
+import json
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from .interfaces import ICropper
+from ..utils.archive import ShardMember
+from ..utils.metrics import PerformanceTracker
+
+
+def parse_address(address: str) -> Tuple[str, str, int]:
+    """
+    Parse a server address.
+
+    Args:
+        address: "http://127.0.0.1:8765" or "unix:///path/to/server.sock"
+
+    Returns:
+        ("tcp", host, port) or ("unix", socket path, 0)
+    """
+    parsed = urlparse(address)
+    if parsed.scheme == 'unix':
+        return 'unix', parsed.path, 0
+    if parsed.scheme == 'http':
+        return 'tcp', parsed.hostname or '127.0.0.1', parsed.port or 8765
+    raise ValueError(f"Unsupported inference server address '{address}', "
+                     "expected http://host:port or unix:///path")
+
+
+def pack_arrays(arrays: Dict[str, np.ndarray]) -> bytes:
+    """Serialize named arrays as an uncompressed .npz."""
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def unpack_arrays(data: bytes) -> Dict[str, np.ndarray]:
+    """Read arrays written by pack_arrays."""
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        return {name: npz[name] for name in npz.files}
+
+
+def _indexed(arrays: Dict[str, np.ndarray], prefix: str) -> List[np.ndarray]:
+    names = sorted((n for n in arrays if n.startswith(prefix)), key=lambda n: int(n[len(prefix):]))
+    return [arrays[n] for n in names]
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class RemoteCropper(ICropper):
+    """
+    DigitCropper stand-in that sends images to a running inference server.
+
+    The server keeps one warm model for all clients and batches concurrent
+    requests into one YOLO call. ``process_image`` fetches the paslon rows
+    in the same request, so the following ``extract_paslon_rows`` call on
+    the same input (as ExtractionService does) needs no second round trip.
+    """
+
+    # No local border processor (ProjectionBorderProcessor stats live on the server)
+    border_processor = None
+
+    def __init__(self, address: str, border_mode: str = "with_border", timeout: float = 120.0,
+                 tracker: Optional[PerformanceTracker] = None, concurrency: int = 8):
+        """
+        Initialize remote cropper.
+
+        Args:
+            address: Server address, "http://127.0.0.1:8765" or "unix:///path.sock"
+            border_mode: "with_border" or "without_border"
+            timeout: Socket timeout per request in seconds
+            tracker: Receives request round-trip times as the "inference" stage (optional)
+            concurrency: Requests in flight in process_images
+        """
+        self.kind, self.host, self.port = parse_address(address)
+        self.address = address
+        self.border_mode = border_mode
+        self.timeout = timeout
+        self.tracker = tracker
+        self.concurrency = concurrency
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self.kind == 'unix':
+                conn = UnixHTTPConnection(self.host, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None,
+                 content_type: Optional[str] = None) -> bytes:
+        headers = {'Content-Type': content_type} if content_type else {}
+        # One retry on a fresh connection: the server may have closed an idle one
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (ConnectionError, http.client.HTTPException, socket.timeout):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                raise RuntimeError(f"Inference server {self.address} returned {response.status}: "
+                                   f"{data[:200].decode('utf-8', 'replace')}")
+            return data
+
+    def load_image(self, source):
+        """
+        Prepare cropper input for sending; decoding happens on the server.
+
+        Args:
+            source: File path, ShardMember, encoded bytes or a decoded BGR array
+
+        Returns:
+            Absolute path, bytes or array, or None for a missing file
+        """
+        if isinstance(source, ShardMember):
+            return source.read_bytes()
+        if isinstance(source, (str, os.PathLike)):
+            path = os.path.abspath(source)
+            return path if os.path.exists(path) else None
+        return source
+
+    def _post(self, endpoint: str, source) -> Dict[str, np.ndarray]:
+        source = self.load_image(source)
+        if source is None:
+            return {'success': np.bool_(False), 'inference_time': np.float64(0.0),
+                    'paslon_success': np.bool_(False)}
+        if isinstance(source, str):
+            body, content_type = json.dumps({'path': source}).encode('utf-8'), 'application/json'
+        elif isinstance(source, np.ndarray) and source.ndim >= 2:
+            buffer = io.BytesIO()
+            np.save(buffer, source, allow_pickle=False)
+            body, content_type = buffer.getvalue(), 'application/x-npy'
+        else:
+            body, content_type = bytes(source), 'application/octet-stream'
+
+        stage = self.tracker.stage('inference') if self.tracker else nullcontext()
+        with stage:
+            data = self._request('POST', f"/{endpoint}?border_mode={self.border_mode}", body, content_type)
+        return unpack_arrays(data)
+
+    def process_image(self, image_path) -> Tuple[bool, float, List[np.ndarray]]:
+        """
+        Process single ROI image and extract all 9 digits.
+
+        Args:
+            image_path: Path to ROI image, ShardMember, encoded bytes or BGR array
+
+        Returns:
+            Tuple of (success, inference_time, list of cropped digit images);
+            inference_time is this image's share of its server batch
+        """
+        arrays = self._post('extract', image_path)
+        rows = (bool(arrays['paslon_success']), _indexed(arrays, 'row_'))
+        self._local.last_rows = (image_path, rows)
+        return bool(arrays['success']), float(arrays['inference_time']), _indexed(arrays, 'digit_')
+
+    def process_images(self, image_paths: List) -> List[Tuple[bool, float, List[np.ndarray]]]:
+        """
+        Process several ROI images with concurrent requests, so the server batches them.
+
+        Returns:
+            One (success, inference_time, digits) tuple per image, in order
+        """
+        with ThreadPoolExecutor(max(1, min(self.concurrency, len(image_paths)))) as pool:
+            return list(pool.map(self.process_image, image_paths))
+
+    def extract_paslon_rows(self, image_path) -> Tuple[bool, List[np.ndarray]]:
+        """
+        Extract paslon rows (3 digits combined per paslon).
+
+        Args:
+            image_path: Path to ROI image, ShardMember, encoded bytes or BGR array
+
+        Returns:
+            Tuple of (success, list of 3 paslon row images)
+        """
+        last = getattr(self._local, 'last_rows', None)
+        if last is not None and last[0] is image_path:
+            self._local.last_rows = None
+            return last[1]
+        arrays = self._post('extract_paslon_rows', image_path)
+        return bool(arrays['paslon_success']), _indexed(arrays, 'row_')
+
+    def status(self) -> Dict:
+        """Batch, queue and stage metrics of the server (GET /status)."""
+        return json.loads(self._request('GET', '/status'))
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -1,11 +1,16 @@
 """Dependency injection container for jumlah_suara_extractor."""
 
-from typing import Optional
+import os
+from typing import TYPE_CHECKING, Optional
 
 from .config import Settings
-from .core import DigitCropper, WithBorderProcessor, WithoutBorderProcessor
-from .services import ProvinceService, ExtractionService
-from .utils import PerformanceTracker
+
+# Everything below pulls in OpenCV/NumPy; it is imported inside the
+# factory methods so that importing the package stays cheap.
+if TYPE_CHECKING:
+    from .core import DigitCropper
+    from .services import ProvinceService, ExtractionService, ImageWriterService, StreamingExtractionService
+    from .utils import PerformanceTracker, ImageEncoder
 
 
 def _lazy_import_yolo():
@@ -34,11 +39,33 @@ class Injector:
             settings: Application settings (creates default if None)
         """
         self.settings = settings or Settings()
-        self._model_cache: Optional[object] = None  # YOLO instance (lazy loaded)
+    
+    def _model_args(self):
+        return (
+            self.settings.model_path,
+            self.settings.model_backend,
+            self.settings.model_device,
+            self.settings.yolo_imgsz if self.settings.model_warmup else 0
+        )
+    
+    def preload_model(self):
+        """
+        Start loading the YOLO model in a background thread.
+        
+        Call this when a workflow that needs the model starts, so loading
+        overlaps with the user's prompts. Errors surface from get_model().
+        No-op with Settings.inference_server, the server holds the model.
+        """
+        if self.settings.inference_server:
+            return
+        from .model_registry import get_model_registry
+        
+        get_model_registry().preload(*self._model_args())
     
     def get_model(self):
         """
-        Get YOLO model instance (singleton).
+        Get YOLO model instance, shared by all injectors in the process
+        (see model_registry.py).
         
         Returns:
             YOLO model instance
@@ -46,10 +73,9 @@ class Injector:
         Raises:
             ImportError: If ultralytics is not installed
         """
-        if self._model_cache is None:
-            YOLO = _lazy_import_yolo()
-            self._model_cache = YOLO(self.settings.model_path)
-        return self._model_cache
+        from .model_registry import get_model_registry
+        
+        return get_model_registry().get(*self._model_args())
     
     def get_border_processor(self, mode: str):
         """
@@ -59,67 +85,180 @@ class Injector:
             mode: "with_border" or "without_border"
             
         Returns:
-            Border processor instance
+            Border processor instance (wrapped in ProjectionBorderProcessor
+            when Settings.border_method is "projection")
         """
+        from .core import WithBorderProcessor, WithoutBorderProcessor, ProjectionBorderProcessor
+        
         if mode == "with_border":
-            return WithBorderProcessor(peel_pixels=self.settings.with_border_peel_pixels)
+            processor = WithBorderProcessor(peel_pixels=self.settings.with_border_peel_pixels)
         else:
-            return WithoutBorderProcessor(peel_pixels=self.settings.without_border_peel_pixels)
+            processor = WithoutBorderProcessor(peel_pixels=self.settings.without_border_peel_pixels)
+        
+        if self.settings.border_method == "projection":
+            return ProjectionBorderProcessor(fallback=processor, peel_pixels=processor.peel_pixels)
+        return processor
     
-    def get_cropper(self, border_mode: str) -> DigitCropper:
+    def get_cropper(self, border_mode: str,
+                    tracker: Optional['PerformanceTracker'] = None) -> 'DigitCropper':
         """
         Get DigitCropper with injected dependencies.
         
         Args:
             border_mode: "with_border" or "without_border"
+            tracker: Receives per-stage timings (optional)
             
         Returns:
-            DigitCropper instance
+            DigitCropper instance, or RemoteCropper when Settings.inference_server is set
         """
+        from .core import DigitCropper, get_border_pool
+        
+        if self.settings.inference_server:
+            from .core import RemoteCropper
+            
+            return RemoteCropper(self.settings.inference_server, border_mode, tracker=tracker)
+        
         model = self.get_model()
         processor = self.get_border_processor(border_mode)
-        return DigitCropper(model, processor)
+        return DigitCropper(model, processor, tracker, device=self.settings.model_device,
+                            mask_mode=self.settings.mask_mode,
+                            border_pool=get_border_pool(self.settings.border_threads),
+                            decode_reduction=self.settings.decode_reduction)
     
-    def get_province_service(self) -> ProvinceService:
+    def get_province_service(self) -> 'ProvinceService':
         """
         Get ProvinceService.
         
         Returns:
             ProvinceService instance
         """
+        from .services import ProvinceService
+        
         return ProvinceService(self.settings.output_roi_path)
     
     def get_extraction_service(
         self,
         border_mode: str,
         duplicate_mode: str,
-        structure_type: str = "structured"
-    ) -> ExtractionService:
+        structure_type: str = "structured",
+        output_base: Optional[str] = None,
+        output_format: Optional[str] = None,
+        tracker: Optional['PerformanceTracker'] = None
+    ) -> 'ExtractionService':
         """
         Get ExtractionService with all dependencies.
         
         Args:
             border_mode: "with_border" or "without_border"
             duplicate_mode: "double" or "sequential"
-            structure_type: "structured" or "flat"
+            structure_type: "structured", "flat", "dataset" (tar shards)
+                or "tensor" (fixed-shape digits.npy)
+            output_base: Output folder for "dataset" and "tensor"
+            output_format: Overrides Settings.output_format ("jpg", "png", "webp", "npy")
+            tracker: Receives per-stage timings (optional)
             
         Returns:
             ExtractionService instance
         """
-        cropper = self.get_cropper(border_mode)
+        from .services import ExtractionService
+        from .utils import DigitDatasetWriter, DigitTensorWriter
+        
+        cropper = self.get_cropper(border_mode, tracker)
+        dataset_writer = None
+        if structure_type == "dataset":
+            dataset_writer = DigitDatasetWriter(
+                output_base or self.settings.default_output_path,
+                max_shard_mb=self.settings.dataset_shard_max_mb,
+                encoder=self.get_encoder(output_format)
+            )
+        elif structure_type == "tensor":
+            dataset_writer = DigitTensorWriter(
+                output_base or self.settings.default_output_path,
+                height=self.settings.tensor_height,
+                width=self.settings.tensor_width,
+                batch_size=self.settings.tensor_batch_size
+            )
         return ExtractionService(
             cropper=cropper,
             duplicate_mode=duplicate_mode,
-            structure_type=structure_type
+            structure_type=structure_type,
+            dataset_writer=dataset_writer,
+            image_writer=None if dataset_writer else self.get_image_writer(output_format, tracker)
+        )
+    
+    def get_streaming_service(
+        self,
+        extraction_service: 'ExtractionService',
+        output_base: str,
+        tracker: Optional['PerformanceTracker'] = None
+    ) -> 'StreamingExtractionService':
+        """
+        Get StreamingExtractionService following the scraper's stored-image log.
+        
+        Args:
+            extraction_service: From get_extraction_service()
+            output_base: Base output directory
+            tracker: Receives one record per photo (optional)
+            
+        Returns:
+            StreamingExtractionService instance (call start())
+        """
+        from .services import StreamingExtractionService
+        
+        return StreamingExtractionService(
+            extraction_service,
+            stored_log=os.path.join(self.settings.output_roi_path, self.settings.stored_log_name),
+            roi_base=self.settings.output_roi_path,
+            output_base=output_base,
+            tracker=tracker,
+            poll_interval=self.settings.stream_poll_interval
+        )
+    
+    def get_encoder(self, output_format: Optional[str] = None) -> 'ImageEncoder':
+        """
+        Get ImageEncoder for the configured output format.
+        
+        Args:
+            output_format: Overrides Settings.output_format
+            
+        Returns:
+            ImageEncoder instance
+        """
+        from .utils import ImageEncoder
+        
+        return ImageEncoder.from_settings(self.settings, output_format)
+    
+    def get_image_writer(self, output_format: Optional[str] = None,
+                         tracker: Optional['PerformanceTracker'] = None) -> 'ImageWriterService':
+        """
+        Get write-behind ImageWriterService (one per extraction run).
+        
+        Args:
+            output_format: Overrides Settings.output_format
+            tracker: Receives encode/write stage timings (optional)
+            
+        Returns:
+            ImageWriterService instance
+        """
+        from .services import ImageWriterService
+        
+        return ImageWriterService(
+            max_workers=self.settings.writer_threads,
+            max_pending=self.settings.writer_max_pending,
+            atomic=self.settings.atomic_writes,
+            encoder=self.get_encoder(output_format),
+            tracker=tracker
         )
     
-    def get_performance_tracker(self) -> PerformanceTracker:
+    def get_performance_tracker(self) -> 'PerformanceTracker':
         """
         Get PerformanceTracker.
         
         Returns:
             PerformanceTracker instance
         """
+        from .utils import PerformanceTracker
+        
         return PerformanceTracker()
 
 
@@ -0,0 +1,118 @@
+"""
+Process-wide registry of loaded detection models.
+
+Every ``Injector`` used to hold its own model cache, so each auto-crop run
+in the same CLI session reloaded the YOLO weights. The registry keeps one
+model per (weights path, backend, device) for the whole process. It can
+also start loading in a background thread while the user is still
+answering prompts.
+"""
+
+import os
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+BACKENDS = ('ultralytics',)
+
+ModelKey = Tuple[str, str, Optional[str]]
+
+
+def _load_ultralytics(weights_path: str, device: Optional[str], warmup_imgsz: int):
+    from .injector import _lazy_import_yolo
+
+    YOLO = _lazy_import_yolo()
+    model = YOLO(weights_path)
+    if warmup_imgsz:
+        import numpy as np
+
+        # First predict builds the predictor, fuses layers and initializes
+        # the device; do it here instead of on the first real image
+        blank = np.zeros((warmup_imgsz, warmup_imgsz, 3), dtype=np.uint8)
+        kwargs = {'device': device} if device else {}
+        model.predict(blank, imgsz=warmup_imgsz, verbose=False, **kwargs)
+    return model
+
+
+class ModelRegistry:
+    """Loads each model once per process, optionally in the background."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[ModelKey, Future] = {}
+
+    @staticmethod
+    def key(weights_path: str, backend: str = 'ultralytics', device: Optional[str] = None) -> ModelKey:
+        return os.path.abspath(weights_path), backend, device
+
+    def preload(self, weights_path: str, backend: str = 'ultralytics', device: Optional[str] = None,
+                warmup_imgsz: int = 0) -> Future:
+        """
+        Start loading a model in a background thread (no-op if already loaded or loading).
+
+        Args:
+            weights_path: Model weights file
+            backend: Inference backend (see BACKENDS)
+            device: Torch device, e.g. "cpu" or "cuda:0" (None = auto)
+            warmup_imgsz: Run one blank prediction at this size after loading (0 = skip)
+
+        Returns:
+            Future resolving to the model. Load errors surface from get().
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown model backend '{backend}', expected one of {BACKENDS}")
+
+        key = self.key(weights_path, backend, device)
+        with self._lock:
+            future = self._models.get(key)
+            if future is not None:
+                return future
+            future = self._models[key] = Future()
+
+        def load():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(_load_ultralytics(key[0], device, warmup_imgsz))
+            except BaseException as e:
+                future.set_exception(e)
+
+        # Daemon thread, quitting the CLI must not wait for a load nobody needs
+        threading.Thread(target=load, name='model-preload', daemon=True).start()
+        return future
+
+    def get(self, weights_path: str, backend: str = 'ultralytics', device: Optional[str] = None,
+            warmup_imgsz: int = 0):
+        """
+        Get a loaded model, loading it (or waiting for the preload) if needed.
+
+        Raises:
+            ImportError: If the backend's package is not installed
+        """
+        key = self.key(weights_path, backend, device)
+        future = self.preload(weights_path, backend, device, warmup_imgsz)
+        try:
+            return future.result()
+        except BaseException:
+            # Don't cache failures, a later call may succeed (e.g. after installing)
+            with self._lock:
+                if self._models.get(key) is future:
+                    del self._models[key]
+            raise
+
+    def is_loaded(self, weights_path: str, backend: str = 'ultralytics', device: Optional[str] = None) -> bool:
+        with self._lock:
+            future = self._models.get(self.key(weights_path, backend, device))
+        return future is not None and future.done() and future.exception() is None
+
+    def clear(self):
+        """Forget all models (they are freed once no cropper references them)."""
+        with self._lock:
+            self._models.clear()
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry."""
+    return _registry
@@ -0,0 +1,406 @@
+"""
+Local inference server: one warm YOLO model shared by many clients.
+
+Every CLI process or script that wants crops otherwise loads the model
+itself. The server loads it once and serves the ``ICropper`` calls over HTTP
+on localhost or a Unix socket (wire format in ``core/remote_cropper.py``).
+
+Requests that arrive within ``window_ms`` of each other, up to
+``max_batch``, go through YOLO as one batch (``DigitCropper.predict_batch``).
+Decoding, warping and border processing stay in the request threads, so
+they overlap with the next batch's inference. ``GET /status`` reports the
+queue depth, batch sizes, queue wait and per-stage latencies.
+
+Usage:
+    python -m jumlah_suara_extractor.server
+    python -m jumlah_suara_extractor.server --listen unix:///tmp/jumlah_suara.sock --max-batch 16
+    python -m jumlah_suara_extractor.server --listen http://127.0.0.1:8765 --window-ms 5
+
+Clients set ``Settings.inference_server`` to the same address, or use
+``RemoteCropper`` directly.
+"""
+
+import argparse
+import io
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from .config import Settings
+from .core.remote_cropper import pack_arrays, parse_address
+from .injector import Injector
+from .utils.metrics import StageHistogram
+
+BORDER_MODES = ('with_border', 'without_border')
+ENDPOINTS = ('process_image', 'extract_paslon_rows', 'extract')
+
+
+class QueueFullError(Exception):
+    """The batcher already holds max_queue requests."""
+
+
+class MicroBatcher:
+    """
+    Collects concurrent inference requests into batches.
+
+    A single worker thread takes the first queued image, waits up to
+    ``window`` seconds for more (at most ``max_batch``), and runs them
+    through ``predict_batch`` in one call. Each request's Future resolves
+    to (result, share of the batch inference time).
+    """
+
+    def __init__(self, predict_batch: Callable[[List[np.ndarray]], Tuple[list, float]],
+                 max_batch: int = 8, window: float = 0.01, max_queue: int = 256):
+        """
+        Args:
+            predict_batch: DigitCropper.predict_batch of the serving cropper
+            max_batch: Largest batch sent to the model
+            window: Seconds to wait for more requests after the first one
+            max_queue: Queued requests before new ones are rejected
+        """
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.window = window
+        self.max_queue = max_queue
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.batch_sizes: Counter = Counter()
+        self.failed_batches = 0
+        self.in_flight = 0
+        self.last_batch_at: Optional[float] = None
+        self.queue_wait = StageHistogram()
+        self.batch_inference = StageHistogram()
+
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, image: np.ndarray) -> Future:
+        """
+        Queue one decoded image for inference.
+
+        Raises:
+            QueueFullError: If max_queue requests are already waiting
+        """
+        if self._queue.qsize() >= self.max_queue:
+            raise QueueFullError(f"{self.max_queue} requests already queued")
+        future = Future()
+        self._queue.put((image, future, time.perf_counter()))
+        return future
+
+    def close(self):
+        """Stop the worker after the queued requests."""
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self) -> Optional[list]:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                # Finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            started = time.perf_counter()
+            with self._lock:
+                self.in_flight = len(batch)
+                for _, _, queued_at in batch:
+                    self.queue_wait.observe(started - queued_at)
+            try:
+                results, inference_time = self.predict_batch([image for image, _, _ in batch])
+            except Exception as e:
+                with self._lock:
+                    self.failed_batches += 1
+                    self.in_flight = 0
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            with self._lock:
+                self.batches += 1
+                self.batch_sizes[len(batch)] += 1
+                self.batch_inference.observe(inference_time)
+                self.in_flight = 0
+                self.last_batch_at = time.time()
+            share = inference_time / len(batch)
+            for (_, future, _), result in zip(batch, results):
+                future.set_result((result, share))
+
+    def stats(self) -> Dict:
+        """Queue depth, batch size distribution and queue wait / inference latencies."""
+        with self._lock:
+            requests = sum(size * count for size, count in self.batch_sizes.items())
+            return {
+                'queue_depth': self._queue.qsize(),
+                'in_flight': self.in_flight,
+                'max_queue': self.max_queue,
+                'max_batch': self.max_batch,
+                'window_ms': round(self.window * 1000, 3),
+                'batches': self.batches,
+                'failed_batches': self.failed_batches,
+                'mean_batch_size': round(requests / self.batches, 2) if self.batches else 0.0,
+                'batch_sizes': {str(size): count for size, count in sorted(self.batch_sizes.items())},
+                'last_batch_ago_s': round(time.time() - self.last_batch_at, 3) if self.last_batch_at else None,
+                'queue_wait': self.queue_wait.summary(),
+                'batch_inference': self.batch_inference.summary(),
+            }
+
+
+class InferenceServer:
+    """Croppers per border mode around one model and one MicroBatcher."""
+
+    def __init__(self, settings: Settings, default_border_mode: str = "with_border"):
+        """
+        Args:
+            settings: Extractor settings (inference_server is ignored, the
+                server always runs the model locally)
+            default_border_mode: Border mode for requests without ?border_mode=
+        """
+        self.settings = replace(settings, inference_server=None)
+        self.injector = Injector(self.settings)
+        self.tracker = self.injector.get_performance_tracker()
+        self.tracker.start()
+        self.default_border_mode = default_border_mode
+        self.started_at = time.time()
+
+        self._croppers = {}
+        self._croppers_lock = threading.Lock()
+        # All modes share the model; inference always goes through this cropper
+        serving = self.cropper(default_border_mode)
+        self.batcher = MicroBatcher(
+            serving.predict_batch,
+            max_batch=self.settings.server_max_batch,
+            window=self.settings.server_batch_window_ms / 1000,
+            max_queue=self.settings.server_max_queue
+        )
+
+        self._lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.errors = 0
+        self.rejected = 0
+
+    def cropper(self, border_mode: str):
+        """DigitCropper for a border mode, created on first use."""
+        with self._croppers_lock:
+            cropper = self._croppers.get(border_mode)
+            if cropper is None:
+                cropper = self._croppers[border_mode] = self.injector.get_cropper(border_mode, self.tracker)
+            return cropper
+
+    def handle(self, endpoint: str, border_mode: str, source) -> Dict[str, np.ndarray]:
+        """
+        Run one request through the batcher and post-process it.
+
+        Args:
+            endpoint: One of ENDPOINTS
+            border_mode: One of BORDER_MODES
+            source: Path, encoded bytes or decoded BGR array
+
+        Returns:
+            Arrays for the .npz response
+        """
+        cropper = self.cropper(border_mode)
+        arrays = {'success': np.bool_(False), 'inference_time': np.float64(0.0),
+                  'paslon_success': np.bool_(False)}
+
+        image = cropper.load_image(source)
+        if image is None:
+            return arrays
+        result, inference_time = self.batcher.submit(image).result()
+        arrays['inference_time'] = np.float64(inference_time)
+
+        futures = []
+        if endpoint in ('process_image', 'extract'):
+            success, warps = cropper.warp_result(image, result)
+            arrays['success'] = np.bool_(success)
+            futures = cropper.submit_borders(warps) if success else []
+        if endpoint in ('extract_paslon_rows', 'extract'):
+            paslon_success, rows = cropper.paslon_rows_from_result(image, result)
+            arrays['paslon_success'] = np.bool_(paslon_success)
+            for i, row in enumerate(rows):
+                arrays[f'row_{i}'] = row
+        for i, future in enumerate(futures):
+            arrays[f'digit_{i}'] = future.result()
+        return arrays
+
+    def status(self) -> Dict:
+        """Everything GET /status returns."""
+        with self._lock:
+            requests = dict(self.requests)
+            errors, rejected = self.errors, self.rejected
+        return {
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'model': self.settings.model_path,
+            'device': self.settings.model_device,
+            'border_modes': sorted(self._croppers),
+            'requests': requests,
+            'errors': errors,
+            'rejected': rejected,
+            'batching': self.batcher.stats(),
+            'stages': self.tracker.get_stage_metrics(),
+        }
+
+    def close(self):
+        self.batcher.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'JumlahSuaraInference/1.0'
+
+    @property
+    def app(self) -> InferenceServer:
+        return self.server.app
+
+    def log_message(self, format, *args):
+        # One line per request is too much at batch rates; see /status
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict):
+        self._send(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/status':
+            self._send_json(200, self.app.status())
+        else:
+            self._send_json(404, {'error': f"unknown path {self.path}"})
+
+    def _read_source(self, body: bytes):
+        content_type = self.headers.get('Content-Type', 'application/octet-stream')
+        if content_type == 'application/json':
+            return json.loads(body)['path']
+        if content_type == 'application/x-npy':
+            return np.load(io.BytesIO(body), allow_pickle=False)
+        return body
+
+    def do_POST(self):
+        # Read the body even for rejected requests, the connection is kept alive
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        url = urlparse(self.path)
+        endpoint = url.path.strip('/')
+        if endpoint not in ENDPOINTS:
+            self._send_json(404, {'error': f"unknown endpoint {url.path}"})
+            return
+        border_mode = parse_qs(url.query).get('border_mode', [self.app.default_border_mode])[0]
+        if border_mode not in BORDER_MODES:
+            self._send_json(400, {'error': f"border_mode must be one of {BORDER_MODES}"})
+            return
+
+        app = self.app
+        try:
+            source = self._read_source(body)
+            arrays = app.handle(endpoint, border_mode, source)
+        except QueueFullError as e:
+            with app._lock:
+                app.rejected += 1
+            self._send_json(503, {'error': str(e)})
+            return
+        except (ValueError, KeyError) as e:
+            with app._lock:
+                app.errors += 1
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            with app._lock:
+                app.errors += 1
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+
+        with app._lock:
+            app.requests[endpoint] += 1
+        self._send(200, pack_arrays(arrays), 'application/x-npz')
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_http_server(address: str, app: InferenceServer):
+    """
+    Bind the HTTP server for an address (see parse_address).
+
+    Returns:
+        Server with serve_forever()/shutdown(); a stale Unix socket file is replaced
+    """
+    kind, host, port = parse_address(address)
+    if kind == 'unix':
+        if os.path.exists(host):
+            os.unlink(host)
+        server = _UnixHTTPServer(host, _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+    server.app = app
+    return server
+
+
+def main(argv=None):
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="Local YOLO inference server with micro-batching")
+    parser.add_argument('--listen', default=settings.inference_server_listen,
+                        help="http://host:port or unix:///path.sock (default %(default)s)")
+    parser.add_argument('--border-mode', choices=BORDER_MODES, default='with_border',
+                        help="Border mode for requests that don't pass one")
+    parser.add_argument('--max-batch', type=int, default=settings.server_max_batch)
+    parser.add_argument('--window-ms', type=float, default=settings.server_batch_window_ms,
+                        help="Wait after the first request for more to batch")
+    parser.add_argument('--max-queue', type=int, default=settings.server_max_queue,
+                        help="Queued requests before new ones get 503")
+    parser.add_argument('--model', default=settings.model_path)
+    parser.add_argument('--device', default=settings.model_device)
+    args = parser.parse_args(argv)
+
+    settings = replace(settings, model_path=args.model, model_device=args.device,
+                       server_max_batch=args.max_batch, server_batch_window_ms=args.window_ms,
+                       server_max_queue=args.max_queue)
+    print(f"Loading model {settings.model_path}...")
+    app = InferenceServer(settings, args.border_mode)
+    server = create_http_server(args.listen, app)
+    print(f"Serving on {args.listen} (max batch {args.max_batch}, window {args.window_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        app.close()
+
+
+if __name__ == '__main__':
+    main()
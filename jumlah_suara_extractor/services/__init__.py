@@ -1,9 +1,20 @@
 """Services package."""
 
-from .province_service import ProvinceService
-from .extraction_service import ExtractionService
+from ..utils.lazy import lazy_module
+
+# Lazy like utils/__init__.py: the services pull in the cropper and OpenCV
+_LAZY_IMPORTS = {
+    'ProvinceService': '.province_service',
+    'ExtractionService': '.extraction_service',
+    'ImageWriterService': '.writer_service',
+    'StreamingExtractionService': '.stream_service',
+}
 
 __all__ = [
     'ProvinceService',
     'ExtractionService',
+    'ImageWriterService',
+    'StreamingExtractionService',
 ]
+
+__getattr__, __dir__ = lazy_module(__name__, _LAZY_IMPORTS)
@@ -1,16 +1,18 @@
 """Main extraction service for orchestrating digit cropping workflow."""
 
 import os
-import cv2
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Union
 
 from ..core import DigitCropper
 from ..utils import (
     DigitNamingTracker,
     format_tps_number,
     create_output_structure,
-    PerformanceTracker
+    PerformanceTracker,
+    DigitDatasetWriter,
+    DigitTensorWriter
 )
+from .writer_service import ImageWriterService
 
 
 class ExtractionService:
@@ -23,7 +25,9 @@ class ExtractionService:
         self,
         cropper: DigitCropper,
         duplicate_mode: str = "double",
-        structure_type: str = "structured"
+        structure_type: str = "structured",
+        dataset_writer: Optional[Union[DigitDatasetWriter, DigitTensorWriter]] = None,
+        image_writer: Optional[ImageWriterService] = None
     ):
         """
         Initialize extraction service.
@@ -32,10 +36,18 @@ class ExtractionService:
             cropper: DigitCropper instance
             duplicate_mode: "double" or "sequential"
             structure_type: "structured" or "flat"
+            dataset_writer: Write TPS samples into dataset shards or the
+                digit tensor instead of separate image files (optional)
+            image_writer: Write-behind writer for image files (created if None)
         """
         self.cropper = cropper
         self.duplicate_mode = duplicate_mode
         self.structure_type = structure_type
+        self.dataset_writer = dataset_writer
+        if dataset_writer is None and image_writer is None:
+            image_writer = ImageWriterService()
+        self.image_writer = image_writer
+        self.last_inference_time = 0.0
     
     def process_tps_image(
         self,
@@ -50,27 +62,53 @@ class ExtractionService:
             output_base: Base output directory
             
         Returns:
-            Number of files saved
+            Number of files saved (queued on the image writer in file mode)
         """
         image_path, province, regency, district, village, kode_kelurahan, nomor_tps = img_info
         
-        # Process image for individual digits
-        success, inference_time, digits = self.cropper.process_image(image_path)
+        # Decode once, both passes below get the array
+        image = self.cropper.load_image(image_path)
+        if image is None:
+            self.last_inference_time = 0.0
+            return 0
         
-        # Also extract paslon rows
-        paslon_success, paslon_rows = self.cropper.extract_paslon_rows(image_path)
+        # Digits come back as futures: their border processing runs on the
+        # border pool while this loop moves on to the next image
+        success, inference_time, digits = self.cropper.submit_image(image)
+        
+        # Also extract paslon rows (not worth another inference if the digits failed)
+        paslon_success, paslon_rows = False, []
+        if success:
+            paslon_success, paslon_rows = self.cropper.extract_paslon_rows(image)
+        self.last_inference_time = inference_time
         
         saved_count = 0
         
+        if success and len(digits) == 9 and self.dataset_writer is not None:
+            metadata = {
+                'kode_kelurahan': kode_kelurahan,
+                'nomor_tps': format_tps_number(nomor_tps),
+                'province': province,
+                'regency': regency,
+                'district': district,
+                'village': village,
+                'source': str(image_path)
+            }
+            rows = paslon_rows if paslon_success and len(paslon_rows) == 3 else None
+            # The dataset writers write inline, so wait for the borders here
+            return self.dataset_writer.write_tps(metadata, [f.result() for f in digits], rows)
+        
         if success and len(digits) == 9:
-            # Create output directory
+            # Output directory is created by the image writer, once
             output_dir = create_output_structure(
                 output_base, self.structure_type,
-                province, regency, district, village
+                province, regency, district, village,
+                create=False
             )
             
             # Create naming tracker for this TPS
-            naming_tracker = DigitNamingTracker(self.duplicate_mode)
+            extension = self.image_writer.encoder.extension
+            naming_tracker = DigitNamingTracker(self.duplicate_mode, extension)
             
             # Generate output paths for all 9 digits
             output_paths = []
@@ -89,26 +127,59 @@ class ExtractionService:
                     output_path = os.path.join(output_dir, filename)
                     output_paths.append(output_path)
             
-            # Save all individual digits
-            for digit_img, output_path in zip(digits, output_paths):
-                try:
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    cv2.imwrite(output_path, digit_img)
-                    saved_count += 1
-                except:
-                    pass
+            # Save all individual digits (border-processed, encoded and
+            # written in the background; the writer waits for each future)
+            for digit_future, output_path in zip(digits, output_paths):
+                self.image_writer.write(output_path, digit_future)
+                saved_count += 1
             
             # Save paslon rows (3 digits combined per paslon)
             if paslon_success and len(paslon_rows) == 3:
                 for paslon_idx, paslon_img in enumerate(paslon_rows):
                     paslon_num = paslon_idx + 1
-                    paslon_filename = f"raw_{kode_kelurahan}_{format_tps_number(nomor_tps)}_{paslon_num}.jpg"
+                    paslon_filename = f"raw_{kode_kelurahan}_{format_tps_number(nomor_tps)}_{paslon_num}{extension}"
                     paslon_output_path = os.path.join(output_dir, paslon_filename)
                     
-                    try:
-                        cv2.imwrite(paslon_output_path, paslon_img)
-                        saved_count += 1
-                    except:
-                        pass
+                    self.image_writer.write(paslon_output_path, paslon_img)
+                    saved_count += 1
         
         return saved_count
+    
+    def process_tps_candidates(
+        self,
+        candidates: List[Tuple[str, str, str, str, str, str, str]],
+        output_base: str
+    ) -> int:
+        """
+        Process the photos of one TPS best first, stopping at the first success.
+        
+        Args:
+            candidates: Image tuples of one TPS, ranked (see rank_tps_photos)
+            output_base: Base output directory
+            
+        Returns:
+            Number of files saved for the TPS (0 if no photo yielded 9 digits)
+        """
+        total_inference_time = 0.0
+        for img_info in candidates:
+            saved_count = self.process_tps_image(img_info, output_base)
+            total_inference_time += self.last_inference_time
+            if saved_count > 0:
+                break
+        else:
+            saved_count = 0
+        self.last_inference_time = total_inference_time
+        return saved_count
+    
+    def close(self) -> int:
+        """
+        Wait for pending writes and close the output writers.
+        
+        Returns:
+            Number of image files that failed to write
+        """
+        if self.dataset_writer is not None:
+            self.dataset_writer.close()
+        if self.image_writer is not None:
+            return self.image_writer.close()
+        return 0
@@ -3,6 +3,8 @@
 import os
 from typing import List, Tuple
 
+from ..utils.archive import iter_shard_members
+
 
 class ProvinceService:
     """Service for detecting and managing provinces in output_roi folder."""
@@ -38,22 +40,25 @@ class ProvinceService:
             total_images = 0
             tps_set = set()
             
-            # Recursively scan all subdirectories
-            for root, dirs, files in os.walk(province_path):
-                for file in files:
-                    if file.lower().endswith('.jpg'):
-                        total_images += 1
-                        
-                        # Extract TPS from filename
-                        try:
-                            parts = file.split('_')
-                            if len(parts) >= 3 and parts[0] == 'raw':
-                                kode_kelurahan = parts[1]
-                                tps = parts[2]
-                                tps_identifier = f"{kode_kelurahan}_{tps}"
-                                tps_set.add(tps_identifier)
-                        except:
-                            pass
+            # Recursively scan all subdirectories, plus images inside tar shards
+            filenames = [file for _, _, files in os.walk(province_path) for file in files]
+            filenames.extend(member.name.rsplit('/', 1)[-1]
+                             for _, member in iter_shard_members(province_path))
+            
+            for file in filenames:
+                if file.lower().endswith('.jpg'):
+                    total_images += 1
+                    
+                    # Extract TPS from filename
+                    try:
+                        parts = file.split('_')
+                        if len(parts) >= 3 and parts[0] == 'raw':
+                            kode_kelurahan = parts[1]
+                            tps = parts[2]
+                            tps_identifier = f"{kode_kelurahan}_{tps}"
+                            tps_set.add(tps_identifier)
+                    except:
+                        pass
             
             if total_images > 0:
                 provinces.append((province_name, total_images, len(tps_set)))
@@ -0,0 +1,173 @@
+"""
+Streaming extraction: crop ROI photos while the scraper is still downloading.
+
+With ``IMAGES_STORED_LOG`` set, the scraper's image pipeline appends one JSON
+line per photo of the crawl, including photos already on disk from an
+earlier run. ``StreamingExtractionService`` follows that
+file from a worker thread and hands every photo to the ExtractionService as
+soon as it lands, so YOLO runs during the crawl instead of after it.
+
+A TPS often has several photos. The first one that yields the 9 digits
+wins and later photos of the same TPS are skipped, like
+``ExtractionService.process_tps_candidates`` in batch mode.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from ..utils import roi_image_info, PerformanceTracker
+from .extraction_service import ExtractionService
+
+
+def follow_stored_log(path: str, stop: threading.Event,
+                      poll_interval: float = 0.2) -> Iterator[Dict]:
+    """
+    Yield entries appended to a JSON lines file, like ``tail -f``.
+
+    The file may not exist yet, and its last line may be half written;
+    both are waited for.
+
+    Args:
+        path: File written by the scraper (IMAGES_STORED_LOG)
+        stop: Once set, the rest of the file is read and iteration ends
+        poll_interval: Seconds to wait for new lines
+
+    Yields:
+        Parsed entries ({"path": ..., "stored_at": ...})
+    """
+    position = 0
+    pending = ''
+    while True:
+        stopping = stop.is_set()
+        chunk = ''
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                f.seek(position)
+                chunk = f.read()
+                position = f.tell()
+
+        if chunk:
+            lines = (pending + chunk).split('\n')
+            pending = lines.pop()
+            for line in lines:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+        elif stopping:
+            return
+        else:
+            stop.wait(poll_interval)
+
+
+class StreamingExtractionService:
+    """Extract digits from photos listed in the scraper's stored-image log."""
+
+    def __init__(
+        self,
+        extraction_service: ExtractionService,
+        stored_log: str,
+        roi_base: str,
+        output_base: str,
+        tracker: Optional[PerformanceTracker] = None,
+        poll_interval: float = 0.2
+    ):
+        """
+        Initialize streaming service.
+
+        Args:
+            extraction_service: Does the cropping and writing
+            stored_log: JSON lines file appended by the scraper
+            roi_base: The scraper's IMAGES_STORE (paths in the log are relative to it)
+            output_base: Base output directory
+            tracker: Receives one record per photo (optional)
+            poll_interval: Seconds between checks for new lines
+        """
+        self.extraction_service = extraction_service
+        self.stored_log = stored_log
+        self.roi_base = roi_base
+        self.output_base = output_base
+        self.tracker = tracker
+        self.poll_interval = poll_interval
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._done_tps: Set[Tuple[str, str]] = set()
+        self.error: Optional[BaseException] = None
+
+        self.processed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.saved_files = 0
+        self.total_lag = 0.0
+
+    def start(self):
+        """Start following the log in a background thread."""
+        self._thread = threading.Thread(target=self._run, name='stream-extract', daemon=True)
+        self._thread.start()
+
+    def finish(self) -> Dict[str, float]:
+        """
+        Process the rest of the log, stop the worker and return the counters.
+
+        Call it after the crawl has ended. Output writers are not closed,
+        see ExtractionService.close().
+
+        Raises:
+            Whatever stopped the worker early (e.g. a model error)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.stats()
+
+    def stats(self) -> Dict[str, float]:
+        """Photos processed, succeeded, failed and skipped, with the mean store-to-crop lag."""
+        return {
+            'processed': self.processed,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'saved_files': self.saved_files,
+            'mean_lag_s': round(self.total_lag / self.processed, 2) if self.processed else 0.0,
+        }
+
+    def _run(self):
+        try:
+            for entry in follow_stored_log(self.stored_log, self._stop, self.poll_interval):
+                self._process(entry)
+        except BaseException as e:
+            self.error = e
+
+    def _process(self, entry: Dict):
+        img_info = roi_image_info(self.roi_base, entry.get('path', ''))
+        if img_info is None:
+            return
+
+        # The TPS already has its digits from an earlier photo
+        tps_key = (img_info[5], img_info[6])
+        if tps_key in self._done_tps:
+            self.skipped += 1
+            return
+
+        saved_count = self.extraction_service.process_tps_image(img_info, self.output_base)
+        inference_time = self.extraction_service.last_inference_time
+
+        self.processed += 1
+        if 'stored_at' in entry:
+            self.total_lag += max(0.0, time.time() - entry['stored_at'])
+        if saved_count > 0:
+            self._done_tps.add(tps_key)
+            self.succeeded += 1
+            self.saved_files += saved_count
+        else:
+            self.failed += 1
+
+        if self.tracker is not None:
+            self.tracker.record_image(saved_count > 0, inference_time, saved_count)
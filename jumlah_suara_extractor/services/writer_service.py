@@ -0,0 +1,135 @@
+"""Write-behind image writer for crop outputs."""
+
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import List, Optional, Set, Union
+
+import numpy as np
+
+from ..utils import ImageEncoder, PerformanceTracker
+
+# mkstemp creates 0600 files; give renamed outputs the usual umask mode
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_FILE_MODE = 0o666 & ~_UMASK
+
+
+class ImageWriterService:
+    """
+    Encodes and writes crops on a bounded thread pool.
+
+    ``write()`` returns immediately, so the inference loop never waits for
+    the disk. It only blocks when ``max_pending`` images are queued, which
+    keeps memory bounded when the disk can't keep up. OpenCV releases the
+    GIL while encoding, so the worker threads run in parallel.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 256, atomic: bool = True,
+                 encoder: Optional[ImageEncoder] = None,
+                 tracker: Optional[PerformanceTracker] = None):
+        """
+        Initialize writer service.
+
+        Args:
+            max_workers: Encoder/writer threads
+            max_pending: Images queued before write() blocks
+            atomic: Write to a temp file and rename, so readers never see partial files
+            encoder: Output format encoder (JPEG with default quality if None)
+            tracker: Receives encode/write stage timings (optional)
+        """
+        self.atomic = atomic
+        self.encoder = encoder or ImageEncoder()
+        self.tracker = tracker
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='crop-writer')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._created_dirs: Set[str] = set()
+
+        self.queued = 0   # write() calls; written + failed once closed
+        self.written = 0
+        self.failed = 0
+        self.errors: List[str] = []  # first few failures, for the summary
+
+    def write(self, path: str, image: Union[np.ndarray, Future]):
+        """
+        Queue an image for encoding and writing.
+
+        Args:
+            path: Output file path, should end in ``encoder.extension``
+            image: Image to write (must not be modified afterwards), or a
+                Future of it, e.g. a digit still in border processing
+        """
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._write, path, image)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.queued += 1
+
+    def _stage(self, name: str):
+        return self.tracker.stage(name) if self.tracker else nullcontext()
+
+    def _ensure_dir(self, directory: str):
+        if directory in self._created_dirs:
+            return
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._created_dirs.add(directory)
+
+    def _write(self, path: str, image: Union[np.ndarray, Future]):
+        try:
+            if isinstance(image, Future):
+                image = image.result()
+
+            with self._stage('encode'):
+                data = self.encoder.encode(image)
+
+            with self._stage('write'):
+                directory = os.path.dirname(path) or '.'
+                self._ensure_dir(directory)
+                if self.atomic:
+                    self._write_atomic(directory, path, data)
+                else:
+                    with open(path, 'wb') as f:
+                        f.write(data)
+
+            with self._lock:
+                self.written += 1
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+                if len(self.errors) < 10:
+                    self.errors.append(f"{path}: {e}")
+        finally:
+            self._slots.release()
+
+    def _write_atomic(self, directory: str, path: str, data: bytes):
+        # Unique temp name, two workers may write the same target
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            # mkstemp creates 0600; os.chmod works on Windows, os.fchmod not before 3.13
+            os.chmod(tmp_path, _FILE_MODE)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def close(self) -> int:
+        """
+        Wait for all queued writes and stop the worker threads.
+
+        Returns:
+            Number of images that failed to write
+        """
+        self._executor.shutdown(wait=True)
+        return self.failed
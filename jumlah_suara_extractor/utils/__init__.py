@@ -1,15 +1,55 @@
 """Utilities package."""
 
-from .naming import DigitNamingTracker, parse_roi_filename, format_tps_number
-from .file_ops import create_output_structure, scan_roi_images, get_total_roi_images
-from .metrics import PerformanceTracker
+from .lazy import lazy_module
+
+# Submodules are imported on first attribute access (PEP 562), so importing
+# the package does not load OpenCV, NumPy or other heavy dependencies.
+_LAZY_IMPORTS = {
+    'ImageEncoder': '.encoding',
+    'decode_image': '.encoding',
+    'OUTPUT_FORMATS': '.encoding',
+    'DigitNamingTracker': '.naming',
+    'parse_roi_filename': '.naming',
+    'format_tps_number': '.naming',
+    'create_output_structure': '.file_ops',
+    'scan_roi_images': '.file_ops',
+    'get_total_roi_images': '.file_ops',
+    'roi_image_info': '.file_ops',
+    'PerformanceTracker': '.metrics',
+    'load_bgr': '.image_io',
+    'load_bgr_reduced': '.image_io',
+    'encoded_image_size': '.image_io',
+    'group_by_tps': '.preselect',
+    'rank_tps_photos': '.preselect',
+    'ShardMember': '.archive',
+    'iter_shard_members': '.archive',
+    'DigitDatasetWriter': '.dataset',
+    'iter_digit_dataset': '.dataset',
+    'DigitTensorWriter': '.tensor_export',
+}
 
 __all__ = [
+    'ImageEncoder',
+    'decode_image',
+    'OUTPUT_FORMATS',
     'DigitNamingTracker',
     'parse_roi_filename',
     'format_tps_number',
     'create_output_structure',
     'scan_roi_images',
     'get_total_roi_images',
+    'roi_image_info',
     'PerformanceTracker',
+    'load_bgr',
+    'load_bgr_reduced',
+    'encoded_image_size',
+    'group_by_tps',
+    'rank_tps_photos',
+    'ShardMember',
+    'iter_shard_members',
+    'DigitDatasetWriter',
+    'iter_digit_dataset',
+    'DigitTensorWriter',
 ]
+
+__getattr__, __dir__ = lazy_module(__name__, _LAZY_IMPORTS)
@@ -0,0 +1,104 @@
+"""
+Reader for tar shards written by the scraper's archive storage.
+
+Layout (see ``kawal_pemilu_scraper/storage.py``)::
+
+    output_roi/PROVINCE/REGENCY/DISTRICT/shard-00000.tar
+    output_roi/PROVINCE/REGENCY/DISTRICT/shard-00000.idx.jsonl
+
+Images are read straight from the shard by offset, nothing is extracted
+to disk.
+"""
+
+import json
+import os
+import tarfile
+from typing import Iterator, List, NamedTuple, Tuple
+
+INDEX_SUFFIX = '.idx.jsonl'
+
+
+class ShardMember(NamedTuple):
+    """Reference to one image inside a tar shard."""
+
+    shard_path: str
+    name: str
+    offset: int
+    size: int
+
+    def read_bytes(self) -> bytes:
+        """Read the encoded image bytes from the shard."""
+        with open(self.shard_path, 'rb') as f:
+            f.seek(self.offset)
+            return f.read(self.size)
+
+    def __str__(self) -> str:
+        return f"{self.shard_path}::{self.name}"
+
+
+def read_shard_index(shard_path: str) -> List[ShardMember]:
+    """
+    List members of a shard.
+
+    Uses the ``.idx.jsonl`` sidecar, or scans the tar headers when the
+    sidecar is missing (e.g. shards built by hand with ``tar``).
+
+    Args:
+        shard_path: Path to shard-NNNNN.tar
+
+    Returns:
+        List of ShardMember in write order
+    """
+    index_path = shard_path[:-len('.tar')] + INDEX_SUFFIX
+    members = []
+
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                members.append(ShardMember(shard_path, entry['name'], entry['offset'], entry['size']))
+        return members
+
+    with tarfile.open(shard_path, 'r') as tar:
+        for info in tar:
+            if info.isfile():
+                members.append(ShardMember(shard_path, info.name, info.offset_data, info.size))
+    return members
+
+
+def iter_shards(root: str) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Find tar shards below a folder.
+
+    Args:
+        root: Folder to search (e.g. a province folder)
+
+    Yields:
+        Tuples of (shard_path, path parts of the shard folder relative to root)
+    """
+    for dirpath, dirs, files in os.walk(root):
+        dirs.sort()
+        rel_path = os.path.relpath(dirpath, root)
+        parts = [] if rel_path == '.' else rel_path.split(os.sep)
+        for file in sorted(files):
+            if file.startswith('shard-') and file.endswith('.tar'):
+                yield os.path.join(dirpath, file), parts
+
+
+def iter_shard_members(root: str) -> Iterator[Tuple[List[str], ShardMember]]:
+    """
+    Iterate all images in all shards below a folder, shard by shard.
+
+    Args:
+        root: Folder to search
+
+    Yields:
+        Tuples of (path parts down to the member's folder, ShardMember)
+    """
+    for shard_path, parts in iter_shards(root):
+        for member in read_shard_index(shard_path):
+            member_parts = member.name.split('/')
+            yield parts + member_parts[:-1], member
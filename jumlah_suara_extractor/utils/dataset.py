@@ -0,0 +1,186 @@
+"""
+Compact digit-crop dataset in tar shards (WebDataset layout).
+
+Instead of 12 small files per TPS, each TPS becomes one sample made of
+consecutive members sharing a key::
+
+    digits-00000.tar
+        6104122016_012_a8e35.json           # metadata
+        6104122016_012_a8e35.p1d1.jpg       # paslon 1, position 1
+        ...
+        6104122016_012_a8e35.p3d3.jpg
+        6104122016_012_a8e35.p1.jpg         # paslon 1 row
+        ...
+
+The key ends with the URL hash of the source photo (raw_<kode>_<tps>_<hash>.jpg),
+so several photos of one TPS stay separate samples.
+
+``iter_digit_dataset`` streams the shards front to back, so training jobs
+read at disk bandwidth. The shards also work with the ``webdataset``
+library as they are.
+"""
+
+import io
+import json
+import os
+import tarfile
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .encoding import ImageEncoder, decode_image
+
+
+class DigitDatasetWriter:
+    """Writes TPS digit crops and paslon rows into rolling tar shards."""
+
+    def __init__(self, output_dir: str, max_shard_mb: int = 512, prefix: str = "digits",
+                 encoder: Optional[ImageEncoder] = None):
+        """
+        Initialize dataset writer.
+
+        Args:
+            output_dir: Folder for the shards
+            max_shard_mb: Start a new shard once the current one reaches this size
+            prefix: Shard file name prefix
+            encoder: Image encoder (JPEG with default quality if None)
+        """
+        self.output_dir = output_dir
+        self.encoder = encoder or ImageEncoder()
+        self.max_bytes = max_shard_mb * 1024 * 1024
+        self.prefix = prefix
+        self.tar: Optional[tarfile.TarFile] = None
+        self.shard_number = self._first_free_shard()
+        self.samples_written = 0
+        self._key_counts: Dict[str, int] = {}
+
+    def _first_free_shard(self) -> int:
+        # Never append to shards of an earlier run
+        if not os.path.isdir(self.output_dir):
+            return 0
+        numbers = []
+        for name in os.listdir(self.output_dir):
+            stem = name[len(self.prefix) + 1:-len('.tar')]
+            if name.startswith(f"{self.prefix}-") and name.endswith('.tar') and stem.isdigit():
+                numbers.append(int(stem))
+        return max(numbers) + 1 if numbers else 0
+
+    def _open_shard(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{self.prefix}-{self.shard_number:05d}.tar")
+        self.tar = tarfile.open(path, 'w')
+        self.shard_number += 1
+
+    def _sample_key(self, metadata: Dict) -> str:
+        key = f"{metadata['kode_kelurahan']}_{metadata['nomor_tps']}"
+        # URL hash suffix of the source name, shard members included ("x.tar::raw_..._a8e35.jpg")
+        stem = os.path.splitext(os.path.basename(str(metadata.get('source', ''))))[0]
+        parts = stem.split('_')
+        if len(parts) == 4 and parts[0] == 'raw' and parts[3].isalnum():
+            key = f"{key}_{parts[3]}"
+
+        # Running index for anything still repeated (same photo twice, other names)
+        count = self._key_counts.get(key, 0)
+        self._key_counts[key] = count + 1
+        return key if count == 0 else f"{key}_{count}"
+
+    def _add(self, name: str, data: bytes):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = time.time()
+        self.tar.addfile(info, io.BytesIO(data))
+
+    def write_tps(self, metadata: Dict, digits: List[np.ndarray],
+                  paslon_rows: Optional[List[np.ndarray]] = None) -> int:
+        """
+        Write one TPS sample.
+
+        Args:
+            metadata: kode_kelurahan, nomor_tps, location names and source path
+            digits: 9 digit crops in paslon-major order
+            paslon_rows: Optional 3 paslon row crops
+
+        Returns:
+            Number of images written
+        """
+        if self.tar is None or self.tar.offset >= self.max_bytes:
+            self.close()
+            self._open_shard()
+
+        key = self._sample_key(metadata)
+        ext = self.encoder.extension
+        members = []
+        encoded = []
+
+        for idx, digit_img in enumerate(digits):
+            try:
+                data = self.encoder.encode(digit_img)
+            except Exception:
+                continue
+            paslon, position = idx // 3 + 1, idx % 3 + 1
+            name = f"{key}.p{paslon}d{position}{ext}"
+            members.append({'member': name, 'kind': 'digit', 'paslon': paslon, 'position': position})
+            encoded.append((name, data))
+
+        for idx, row_img in enumerate(paslon_rows or []):
+            try:
+                data = self.encoder.encode(row_img)
+            except Exception:
+                continue
+            name = f"{key}.p{idx + 1}{ext}"
+            members.append({'member': name, 'kind': 'paslon_row', 'paslon': idx + 1})
+            encoded.append((name, data))
+
+        # Metadata first, so a streaming reader knows what follows
+        sample_meta = {**metadata, 'images': members}
+        self._add(f"{key}.json", json.dumps(sample_meta).encode('utf-8'))
+        for name, data in encoded:
+            self._add(name, data)
+
+        self.samples_written += 1
+        return len(encoded)
+
+    def close(self):
+        """Finish the current shard."""
+        if self.tar is not None:
+            self.tar.close()
+            self.tar = None
+
+
+def iter_digit_dataset(dataset_dir: str, decode: bool = False) -> Iterator[Dict]:
+    """
+    Stream TPS samples from all shards in a dataset folder.
+
+    Args:
+        dataset_dir: Folder containing digits-NNNNN.tar shards
+        decode: Decode images to arrays instead of returning encoded bytes
+
+    Yields:
+        Dict with 'key', 'meta' and 'images' ({member suffix: bytes or array},
+        e.g. 'p1d1.jpg', 'p2.jpg'; the extension follows the output format)
+    """
+    shards = sorted(f for f in os.listdir(dataset_dir) if f.endswith('.tar'))
+    for shard in shards:
+        sample = None
+        # Stream mode ('r|') reads the shard strictly sequentially
+        with tarfile.open(os.path.join(dataset_dir, shard), 'r|') as tar:
+            for info in tar:
+                if not info.isfile():
+                    continue
+                key, suffix = info.name.split('.', 1)
+                data = tar.extractfile(info).read()
+
+                if sample is None or sample['key'] != key:
+                    if sample is not None:
+                        yield sample
+                    sample = {'key': key, 'meta': None, 'images': {}}
+
+                if suffix == 'json':
+                    sample['meta'] = json.loads(data)
+                elif decode:
+                    sample['images'][suffix] = decode_image(data, suffix)
+                else:
+                    sample['images'][suffix] = data
+        if sample is not None:
+            yield sample
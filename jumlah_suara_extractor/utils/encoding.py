@@ -0,0 +1,91 @@
+"""Crop encoders for the supported output formats."""
+
+import io
+
+import cv2
+import numpy as np
+
+OUTPUT_FORMATS = ('jpg', 'png', 'webp', 'npy')
+
+
+class ImageEncoder:
+    """
+    Encodes crops as JPEG, PNG, WebP or raw ``.npy``.
+
+    JPEG is lossy and loses a little more each time a crop is re-saved.
+    PNG at a low compression level is lossless and cheap to encode, but
+    produces bigger files. ``.npy`` skips encoding entirely. Run
+    ``python -m jumlah_suara_extractor.benchmarks.encode_benchmark`` to
+    compare the formats on real crops.
+    """
+
+    def __init__(self, output_format: str = "jpg", jpeg_quality: int = 95,
+                 png_compression: int = 1, webp_quality: int = 90):
+        """
+        Initialize encoder.
+
+        Args:
+            output_format: "jpg", "png", "webp" or "npy"
+            jpeg_quality: JPEG quality 0-100
+            png_compression: PNG zlib level 0-9 (lower is faster)
+            webp_quality: WebP quality 1-100 (above 100 is lossless)
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+        self.output_format = output_format
+        self.params = {
+            'jpg': [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality],
+            'png': [cv2.IMWRITE_PNG_COMPRESSION, png_compression],
+            'webp': [cv2.IMWRITE_WEBP_QUALITY, webp_quality],
+            'npy': [],
+        }[output_format]
+
+    @property
+    def extension(self) -> str:
+        return f".{self.output_format}"
+
+    def encode(self, image: np.ndarray) -> bytes:
+        """
+        Encode one crop.
+
+        Args:
+            image: BGR or grayscale image
+
+        Returns:
+            Encoded file contents
+        """
+        if self.output_format == 'npy':
+            buf = io.BytesIO()
+            np.save(buf, image, allow_pickle=False)
+            return buf.getvalue()
+
+        ok, buf = cv2.imencode(self.extension, image, self.params)
+        if not ok:
+            raise ValueError(f"encoding to {self.output_format} failed")
+        return buf.tobytes()
+
+    @classmethod
+    def from_settings(cls, settings, output_format: str = None) -> 'ImageEncoder':
+        """Create encoder from Settings, optionally overriding the format."""
+        return cls(
+            output_format=output_format or settings.output_format,
+            jpeg_quality=settings.jpeg_quality,
+            png_compression=settings.png_compression,
+            webp_quality=settings.webp_quality
+        )
+
+
+def decode_image(data: bytes, extension: str) -> np.ndarray:
+    """
+    Decode crop bytes written by ImageEncoder.
+
+    Args:
+        data: Encoded file contents
+        extension: File extension, e.g. ".png" or ".npy"
+
+    Returns:
+        Image array
+    """
+    if extension.lower().endswith('npy'):
+        return np.load(io.BytesIO(data), allow_pickle=False)
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
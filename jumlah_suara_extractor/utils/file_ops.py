@@ -2,11 +2,13 @@ import os
 from pathlib import Path
 from typing import List, Tuple, Optional
 from .naming import parse_roi_filename
+from .archive import iter_shard_members
 
 
 def create_output_structure(base_output: str, structure_type: str,
                            province: str = "", regency: str = "",
-                           district: str = "", village: str = "") -> str:
+                           district: str = "", village: str = "",
+                           create: bool = True) -> str:
     """
     Create appropriate output directory based on structure type.
     
@@ -17,6 +19,7 @@ def create_output_structure(base_output: str, structure_type: str,
         regency: Regency name
         district: District name
         village: Village name
+        create: Create the directory (False when the writer creates it lazily)
         
     Returns:
         Full path to output directory
@@ -39,7 +42,8 @@ def create_output_structure(base_output: str, structure_type: str,
         output_path = base_output
     
     # Create directory if it doesn't exist
-    os.makedirs(output_path, exist_ok=True)
+    if create:
+        os.makedirs(output_path, exist_ok=True)
     
     return output_path
 
@@ -48,6 +52,10 @@ def scan_roi_images(province_path: str) -> List[Tuple[str, str, str, str, str, s
     """
     Recursively scan all ROI images in province folder.
     
+    Images stored in tar shards (IMAGES_ARCHIVE_ENABLED in the scraper) are
+    included too. Their first tuple element is a ShardMember instead of a
+    path; the cropper reads it straight from the shard.
+    
     Args:
         province_path: Full path to province folder in output_roi
         
@@ -59,35 +67,43 @@ def scan_roi_images(province_path: str) -> List[Tuple[str, str, str, str, str, s
     # Get province name from path
     province_name = os.path.basename(province_path)
     
+    def add_image(image_ref, filename, path_parts):
+        # Parse filename to get kode_kelurahan and nomor_tps
+        parsed = parse_roi_filename(filename)
+        if not parsed:
+            return
+        kode_kelurahan, nomor_tps = parsed
+        
+        regency = path_parts[0] if len(path_parts) > 0 else ""
+        district = path_parts[1] if len(path_parts) > 1 else ""
+        village = path_parts[2] if len(path_parts) > 2 else ""
+        
+        images.append((
+            image_ref,
+            province_name,
+            regency,
+            district,
+            village,
+            kode_kelurahan,
+            nomor_tps
+        ))
+    
     # Walk through directory structure
     for root, dirs, files in os.walk(province_path):
+        # Extract hierarchy from path
+        # Structure: output_roi/PROVINCE/REGENCY/DISTRICT/VILLAGE/file.jpg
+        rel_path = os.path.relpath(root, province_path)
+        path_parts = [] if rel_path == '.' else rel_path.split(os.sep)
+        
         for file in files:
             if file.lower().endswith('.jpg'):
-                image_path = os.path.join(root, file)
-                
-                # Parse filename to get kode_kelurahan and nomor_tps
-                parsed = parse_roi_filename(file)
-                if parsed:
-                    kode_kelurahan, nomor_tps = parsed
-                    
-                    # Extract hierarchy from path
-                    # Structure: output_roi/PROVINCE/REGENCY/DISTRICT/VILLAGE/file.jpg
-                    rel_path = os.path.relpath(root, province_path)
-                    path_parts = rel_path.split(os.sep)
-                    
-                    regency = path_parts[0] if len(path_parts) > 0 and path_parts[0] != '.' else ""
-                    district = path_parts[1] if len(path_parts) > 1 else ""
-                    village = path_parts[2] if len(path_parts) > 2 else ""
-                    
-                    images.append((
-                        image_path,
-                        province_name,
-                        regency,
-                        district,
-                        village,
-                        kode_kelurahan,
-                        nomor_tps
-                    ))
+                add_image(os.path.join(root, file), file, path_parts)
+    
+    # Structure: output_roi/PROVINCE/REGENCY/DISTRICT/shard-NNNNN.tar -> VILLAGE/file.jpg
+    for path_parts, member in iter_shard_members(province_path):
+        filename = member.name.rsplit('/', 1)[-1]
+        if filename.lower().endswith('.jpg'):
+            add_image(member, filename, path_parts)
     
     return images
 
@@ -100,11 +116,45 @@ def get_total_roi_images(province_path: str) -> int:
         province_path: Full path to province folder
         
     Returns:
-        Total number of JPG images
+        Total number of JPG images (loose files and shard members)
     """
     count = 0
     for root, dirs, files in os.walk(province_path):
         for file in files:
             if file.lower().endswith('.jpg'):
                 count += 1
+    for _, member in iter_shard_members(province_path):
+        if member.name.lower().endswith('.jpg'):
+            count += 1
     return count
+
+
+def roi_image_info(roi_base: str, rel_path: str) -> Optional[Tuple[str, str, str, str, str, str, str]]:
+    """
+    Build the scan_roi_images tuple for one image path relative to output_roi.
+    
+    Args:
+        roi_base: output_roi folder (the scraper's IMAGES_STORE)
+        rel_path: PROVINCE/REGENCY/DISTRICT/VILLAGE/file.jpg, as stored by the scraper
+        
+    Returns:
+        (image_path, province, regency, district, village, kode_kelurahan, nomor_tps),
+        or None if the file name is not an ROI image name
+    """
+    parts = rel_path.replace('\\', '/').split('/')
+    parsed = parse_roi_filename(parts[-1])
+    if not parsed:
+        return None
+    kode_kelurahan, nomor_tps = parsed
+    
+    folders = parts[:-1] + [""] * (4 - len(parts[:-1]))
+    province, regency, district, village = folders[:4]
+    return (
+        os.path.join(roi_base, *parts),
+        province,
+        regency,
+        district,
+        village,
+        kode_kelurahan,
+        nomor_tps
+    )
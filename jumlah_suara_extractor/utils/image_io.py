@@ -0,0 +1,120 @@
+"""
+Decoding of cropper input: paths, shard members, encoded bytes or arrays.
+
+Large photos can be decoded at 1/2, 1/4 or 1/8 size. For JPEG, OpenCV's
+``IMREAD_REDUCED_*`` flags scale in the DCT domain (libjpeg-turbo), which
+is much faster than decoding at full size and resizing afterwards.
+"""
+
+import struct
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .archive import ShardMember
+
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# JPEG start-of-frame markers (baseline, progressive, lossless, ...), they carry the size
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def encoded_image_size(data) -> Optional[Tuple[int, int]]:
+    """
+    Read (width, height) from a JPEG or PNG header without decoding.
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        (width, height), or None for other formats or a broken header
+    """
+    # APP segments (EXIF, thumbnails) before the frame header stay well below this
+    data = bytes(memoryview(data)[:256 * 1024])
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    if data[:2] != b'\xff\xd8':
+        return None
+
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    return None
+
+
+def pick_reduction(size: Optional[Tuple[int, int]], target: int) -> int:
+    """
+    Largest reduction that keeps the longer side at or above ``target``.
+
+    Args:
+        size: (width, height) of the encoded image (None = unknown)
+        target: Smallest acceptable longer side, e.g. the YOLO imgsz
+
+    Returns:
+        1, 2, 4 or 8
+    """
+    if not size:
+        return 1
+    longest = max(size)
+    for factor in (8, 4, 2):
+        if longest // factor >= target:
+            return factor
+    return 1
+
+
+def load_bgr(source, reduction: int = 1, target: int = 0) -> Optional[np.ndarray]:
+    """
+    Decode cropper input to a BGR array.
+
+    Args:
+        source: File path, ShardMember, encoded bytes (bytes, bytearray,
+            memoryview or 1-D uint8 array) or an already decoded BGR array
+        reduction: 1 (full size), 2, 4 or 8; 0 picks it from the header so
+            the longer side stays >= target
+        target: Longer side to keep with reduction=0
+
+    Returns:
+        BGR image, or None if it could not be decoded
+    """
+    return load_bgr_reduced(source, reduction, target)[0]
+
+
+def load_bgr_reduced(source, reduction: int = 1, target: int = 0) -> Tuple[Optional[np.ndarray], int]:
+    """
+    Like load_bgr, and also return the reduction that was applied.
+
+    Returns:
+        Tuple of (BGR image or None, reduction factor); the factor is 1 for
+        arrays passed in, which are not decoded
+    """
+    if isinstance(source, np.ndarray) and source.ndim >= 2:
+        return source, 1
+
+    if isinstance(source, ShardMember):
+        data = source.read_bytes()
+    elif isinstance(source, (bytes, bytearray, memoryview, np.ndarray)):
+        data = source
+    elif reduction == 1:
+        return cv2.imread(source), 1
+    else:
+        data = np.fromfile(source, dtype=np.uint8)
+
+    if reduction == 0:
+        reduction = pick_reduction(encoded_image_size(data), target)
+    buffer = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.uint8)
+    return cv2.imdecode(buffer, REDUCED_FLAGS[reduction]), reduction
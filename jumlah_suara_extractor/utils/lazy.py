@@ -0,0 +1,31 @@
+"""Lazy package attributes (PEP 562)."""
+
+import importlib
+from typing import Callable, Dict, Tuple
+
+
+def lazy_module(package: str, imports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    Build ``__getattr__`` and ``__dir__`` that import attributes on first access.
+
+    Args:
+        package: ``__name__`` of the package
+        imports: Attribute name -> relative module it is defined in
+
+    Returns:
+        (__getattr__, __dir__) to assign at module level in the package
+    """
+    namespace = vars(importlib.import_module(package))
+
+    def __getattr__(name):
+        module = imports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(imports))
+
+    return __getattr__, __dir__
@@ -1,10 +1,63 @@
+import csv
+import json
+import threading
 import time
+from contextlib import contextmanager
 from typing import Dict, Optional
 
+from kawal_common.metrics import Histogram
+
+# Pipeline stages in processing order, used for report ordering
+STAGES = ('decode', 'inference', 'mask_to_polygon', 'warp', 'border', 'encode', 'write')
+
+
+class StageHistogram(Histogram):
+    """
+    Latency histogram with log-spaced buckets.
+    
+    The shared Histogram (kawal_common/metrics.py) with buckets
+    growing by 10% from 10µs to ~100s instead of its page-load buckets, so
+    quantiles stay within ~5% for stages from microseconds to seconds.
+    Also tracks the maximum.
+    """
+    
+    BUCKETS = tuple(1e-5 * 1.1 ** i for i in range(170))
+    
+    def __init__(self):
+        super().__init__(self.BUCKETS)
+        self.max = 0.0
+    
+    def observe(self, seconds: float):
+        """Record one duration in seconds."""
+        super().observe(seconds)
+        self.max = max(self.max, seconds)
+    
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile (0-1) in seconds, 0.0 before any observation."""
+        value = super().quantile(q)
+        return 0.0 if value is None else min(value, self.max)
+    
+    def summary(self) -> Dict[str, float]:
+        """Count, total, mean and p50/p95/p99/max in milliseconds."""
+        return {
+            'count': self.count,
+            'total_s': round(self.sum, 4),
+            'mean_ms': round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50) * 1000, 3),
+            'p95_ms': round(self.quantile(0.95) * 1000, 3),
+            'p99_ms': round(self.quantile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
 
 class PerformanceTracker:
     """
     Tracks processing performance metrics.
+    
+    Besides per-image counters it keeps one StageHistogram per pipeline
+    stage (see STAGES). The cropper and the image writer report into it
+    with ``with tracker.stage('inference'): ...``. Recording is
+    thread-safe, since encode/write stages run on writer threads.
     """
     
     def __init__(self):
@@ -14,7 +67,9 @@ class PerformanceTracker:
         self.failed_images = 0
         self.total_inference_time = 0.0
         self.total_digits_extracted = 0
-        self.image_times = []
+        self.image_times = StageHistogram()
+        self.stages: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
     
     def start(self):
         """Start timing."""
@@ -38,7 +93,47 @@ class PerformanceTracker:
         
         self.total_inference_time += inference_time
         self.total_digits_extracted += digits_extracted
-        self.image_times.append(inference_time)
+        self.image_times.observe(inference_time)
+    
+    def record_stage(self, name: str, seconds: float):
+        """
+        Record time spent in one pipeline stage.
+        
+        Args:
+            name: Stage name (see STAGES)
+            seconds: Duration in seconds
+        """
+        with self._lock:
+            hist = self.stages.get(name)
+            if hist is None:
+                hist = self.stages[name] = StageHistogram()
+            hist.observe(seconds)
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Context manager timing the enclosed block as stage ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start)
+    
+    def get_stage_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get per-stage latency summaries.
+        
+        Returns:
+            {stage: summary} in pipeline order, each with the stage's share
+            of total stage time
+        """
+        with self._lock:
+            names = sorted(self.stages, key=lambda n: (STAGES.index(n) if n in STAGES else len(STAGES), n))
+            summaries = {name: self.stages[name].summary() for name in names}
+        
+        grand_total = sum(s['total_s'] for s in summaries.values()) or 1.0
+        for summary in summaries.values():
+            summary['share_pct'] = round(summary['total_s'] / grand_total * 100, 1)
+        return summaries
     
     def get_metrics(self) -> Dict[str, any]:
         """
@@ -54,6 +149,7 @@ class PerformanceTracker:
                        if self.total_images > 0 else 0)
         avg_digits_per_image = (self.total_digits_extracted / self.successful_images 
                                if self.successful_images > 0 else 0)
+        images_per_second = self.total_images / elapsed_time if elapsed_time > 0 else 0
         
         return {
             'total_images': self.total_images,
@@ -64,7 +160,11 @@ class PerformanceTracker:
             'avg_time_per_image': avg_time_per_image,
             'total_inference_time': self.total_inference_time,
             'total_digits_extracted': self.total_digits_extracted,
-            'avg_digits_per_image': avg_digits_per_image
+            'avg_digits_per_image': avg_digits_per_image,
+            'images_per_second': images_per_second,
+            'p50_inference_time': self.image_times.quantile(0.50),
+            'p95_inference_time': self.image_times.quantile(0.95),
+            'p99_inference_time': self.image_times.quantile(0.99)
         }
     
     def display_metrics(self):
@@ -83,8 +183,47 @@ class PerformanceTracker:
         print(f"⏱️  Total Time              : {metrics['elapsed_time']:.2f}s")
         print(f"⚡ Avg Time per Image      : {metrics['avg_time_per_image']:.3f}s")
         print(f"🚀 Avg Inference Time      : {metrics['total_inference_time']/max(1, metrics['total_images']):.3f}s")
+        print(f"📉 Inference p50/p95/p99   : {metrics['p50_inference_time']:.3f}s / "
+              f"{metrics['p95_inference_time']:.3f}s / {metrics['p99_inference_time']:.3f}s")
+        print(f"🏎️  Throughput              : {metrics['images_per_second']:.2f} images/s")
+        
+        stages = self.get_stage_metrics()
+        if stages:
+            print("-" * 60)
+            print(f"{'Stage':<16}{'Count':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Share':>8}")
+            for name, summary in stages.items():
+                print(f"{name:<16}{summary['count']:>8}{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}"
+                      f"{summary['p99_ms']:>9.1f}{summary['share_pct']:>7.1f}%")
         print("="*60 + "\n")
     
+    def export_json(self, path: str):
+        """
+        Export run metrics and stage summaries to JSON.
+        
+        Args:
+            path: Output file path
+        """
+        data = {
+            'metrics': self.get_metrics(),
+            'stages': self.get_stage_metrics()
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+    
+    def export_csv(self, path: str):
+        """
+        Export stage summaries to CSV, one row per stage.
+        
+        Args:
+            path: Output file path
+        """
+        fields = ['stage', 'count', 'total_s', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'share_pct']
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for name, summary in self.get_stage_metrics().items():
+                writer.writerow({'stage': name, **summary})
+    
     def display_preview_metrics(self, sample_size: int, total_images: int):
         """
         Display preview metrics after benchmark.
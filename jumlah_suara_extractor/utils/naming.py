@@ -7,14 +7,16 @@ class DigitNamingTracker:
     Tracks used digit filenames to handle duplicates.
     """
     
-    def __init__(self, duplicate_mode: str = "double"):
+    def __init__(self, duplicate_mode: str = "double", extension: str = ".jpg"):
         """
         Initialize the tracker.
         
         Args:
             duplicate_mode: "double" (9, 99, 999) or "sequential" (9_1, 9_2, 9_3)
+            extension: File extension of the output format
         """
         self.duplicate_mode = duplicate_mode
+        self.extension = extension
         self.used_names: Dict[str, int] = defaultdict(int)
     
     def generate_filename(self, kode_kelurahan: str, nomor_tps: str, 
@@ -29,7 +31,7 @@ class DigitNamingTracker:
             digit_value: The digit value ('0'-'9' or 'X')
             
         Returns:
-            Complete filename: raw_<kode_kelurahan>_<nomor TPS>_<paslon>_<digit>.jpg
+            Complete filename: raw_<kode_kelurahan>_<nomor TPS>_<paslon>_<digit><extension>
         """
         # Normalize X to 0 as per requirement
         if digit_value.upper() == 'X':
@@ -45,15 +47,15 @@ class DigitNamingTracker:
         # Generate filename based on duplicate mode
         if occurrence == 0:
             # First occurrence - just use the digit
-            filename = f"raw_{kode_kelurahan}_{nomor_tps.zfill(3)}_{nomor_paslon}_{digit_value}.jpg"
+            filename = f"raw_{kode_kelurahan}_{nomor_tps.zfill(3)}_{nomor_paslon}_{digit_value}{self.extension}"
         else:
             if self.duplicate_mode == "double":
                 # Double notation: 9, 99, 999, etc.
                 digit_suffix = digit_value * (occurrence + 1)
-                filename = f"raw_{kode_kelurahan}_{nomor_tps.zfill(3)}_{nomor_paslon}_{digit_suffix}.jpg"
+                filename = f"raw_{kode_kelurahan}_{nomor_tps.zfill(3)}_{nomor_paslon}_{digit_suffix}{self.extension}"
             else:  # sequential
                 # Sequential: 9_1, 9_2, 9_3, etc.
-                filename = f"raw_{kode_kelurahan}_{nomor_tps.zfill(3)}_{nomor_paslon}_{digit_value}_{occurrence + 1}.jpg"
+                filename = f"raw_{kode_kelurahan}_{nomor_tps.zfill(3)}_{nomor_paslon}_{digit_value}_{occurrence + 1}{self.extension}"
         
         return filename
     
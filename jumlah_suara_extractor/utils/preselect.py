@@ -0,0 +1,124 @@
+"""
+Best-photo preselection per TPS.
+
+The spider stores every photo of a TPS row, so one ``(kode_kelurahan, tps)``
+often has several files, and all of them would write the same
+``raw_<kode>_<tps>_...`` outputs. Instead of running YOLO on each, the
+photos of a TPS are ranked with a cheap pass on a reduced grayscale decode:
+
+- sharpness: variance of the Laplacian at a fixed width
+- size: photos smaller than the model input are scored down
+- dHash: near-duplicates of a better photo are dropped
+
+Extraction then tries the candidates best first and stops at the first one
+that yields the 9 digits.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from kawal_common.hashing import difference_hash, hamming
+
+from .archive import ShardMember
+from .image_io import encoded_image_size
+
+SHARPNESS_WIDTH = 256
+
+
+class PhotoScore(NamedTuple):
+    """Preselection score of one photo."""
+
+    sharpness: float
+    longer_side: int
+    dhash: int
+    score: float
+
+
+def group_by_tps(images: List[Tuple]) -> List[List[Tuple]]:
+    """
+    Group scanned images by (kode_kelurahan, nomor_tps), in scan order.
+
+    Args:
+        images: Tuples from scan_roi_images
+
+    Returns:
+        One list of image tuples per TPS
+    """
+    groups: Dict[Tuple[str, str], List[Tuple]] = OrderedDict()
+    for info in images:
+        groups.setdefault((info[5], info[6]), []).append(info)
+    return list(groups.values())
+
+
+def dhash(gray: np.ndarray) -> int:
+    """64-bit difference hash of a grayscale image."""
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    return difference_hash(small)
+
+
+def score_photo(source, target_side: int) -> Optional[PhotoScore]:
+    """
+    Score one photo from a reduced-size grayscale decode.
+
+    Args:
+        source: File path or ShardMember
+        target_side: Model input size; smaller photos are scored down
+
+    Returns:
+        PhotoScore, or None if the photo can't be decoded
+    """
+    if isinstance(source, ShardMember):
+        data = np.frombuffer(source.read_bytes(), dtype=np.uint8)
+    else:
+        data = np.fromfile(source, dtype=np.uint8)
+    gray = cv2.imdecode(data, cv2.IMREAD_REDUCED_GRAYSCALE_2)
+    if gray is None or gray.size == 0:
+        return None
+
+    size = encoded_image_size(data)
+    longer_side = max(size) if size else max(gray.shape) * 2
+
+    scaled = cv2.resize(gray, (SHARPNESS_WIDTH, max(1, gray.shape[0] * SHARPNESS_WIDTH // gray.shape[1])),
+                        interpolation=cv2.INTER_AREA)
+    sharpness = float(cv2.Laplacian(scaled, cv2.CV_64F).var())
+    score = sharpness * min(1.0, longer_side / target_side)
+    return PhotoScore(sharpness, longer_side, dhash(gray), score)
+
+
+def rank_tps_photos(candidates: List[Tuple], target_side: int = 1280,
+                    max_distance: int = 6) -> List[Tuple]:
+    """
+    Order the photos of one TPS best first, without near-duplicates.
+
+    Args:
+        candidates: Image tuples of one TPS (see group_by_tps)
+        target_side: Model input size (Settings.yolo_imgsz)
+        max_distance: dHash Hamming distance up to which photos count as
+            the same picture
+
+    Returns:
+        Candidates to try in order; unreadable photos are dropped
+    """
+    if len(candidates) <= 1:
+        return list(candidates)
+
+    scored = []
+    for info in candidates:
+        try:
+            score = score_photo(info[0], target_side)
+        except (OSError, cv2.error):
+            score = None
+        if score is not None:
+            scored.append((score, info))
+    scored.sort(key=lambda item: item[0].score, reverse=True)
+
+    ranked, hashes = [], []
+    for score, info in scored:
+        if any(hamming(score.dhash, kept) <= max_distance for kept in hashes):
+            continue
+        hashes.append(score.dhash)
+        ranked.append(info)
+    return ranked
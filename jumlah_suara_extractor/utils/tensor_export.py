@@ -0,0 +1,193 @@
+"""
+Fixed-shape tensor export of digit crops as appendable ``.npy`` files.
+
+Every digit is converted to grayscale, resized to ``height x width`` and
+appended to ``digits.npy`` (N x H x W, uint8). One record per digit goes to
+``digits_meta.npy`` at the same row index. Both are plain ``.npy`` files:
+
+    digits = np.load("output_digits/digits.npy", mmap_mode="r")
+    meta = np.load("output_digits/digits_meta.npy", mmap_mode="r")
+
+The ``.npy`` header is written with fixed padding, so the row count can be
+rewritten in place after every batch. The files stay loadable while an
+export is still running or after it was interrupted. Each batch reaches
+disk in ``digits.npy`` before its metadata is written. If a run stopped
+between the two, the writer cuts both files back to the shorter row count
+when it opens them again.
+"""
+
+import ast
+import os
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+MAGIC = b'\x93NUMPY\x01\x00'
+
+META_DTYPE = np.dtype([
+    ('kode_kelurahan', 'S10'),
+    ('nomor_tps', 'S3'),
+    ('paslon', 'u1'),
+    ('position', 'u1'),
+    ('valid', '?'),  # False for empty fallback crops
+])
+
+
+class _AppendableNpy:
+    """``.npy`` file that grows along axis 0."""
+
+    def __init__(self, path: str, dtype: np.dtype, row_shape: tuple):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.rows = 0
+        self.header_size = self._header_size()
+
+        if os.path.exists(path):
+            self.file = open(path, 'r+b')
+            self.rows = self._read_rows()
+            self.file.seek(self.header_size + self.rows * self.row_bytes)
+            self.file.truncate()  # drop a partially written batch
+        else:
+            self.file = open(path, 'w+b')
+            self._write_header()
+
+    def _header_size(self) -> int:
+        # Room for a 20-digit row count, rounded up to a multiple of 64
+        widest = len(self._header_text(10 ** 20)) + len(MAGIC) + 2 + 1
+        return (widest + 63) // 64 * 64
+
+    def _header_text(self, rows: int) -> bytes:
+        header = {
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (rows,) + self.row_shape,
+        }
+        return repr(header).encode('latin1')
+
+    @property
+    def row_bytes(self) -> int:
+        return self.dtype.itemsize * int(np.prod(self.row_shape, dtype=np.int64))
+
+    def _read_rows(self) -> int:
+        self.file.seek(0)
+        head = self.file.read(self.header_size)
+        header = ast.literal_eval(head[10:].decode('latin1').strip())
+        if header['descr'] != np.lib.format.dtype_to_descr(self.dtype) \
+                or tuple(header['shape'][1:]) != self.row_shape:
+            raise ValueError(f"{self.path} has shape {header['shape']}, cannot append {self.row_shape} rows")
+        return header['shape'][0]
+
+    def _write_header(self):
+        text = self._header_text(self.rows)
+        pad = self.header_size - len(MAGIC) - 2 - len(text) - 1
+        header_bytes = text + b' ' * pad + b'\n'
+        self.file.seek(0)
+        self.file.write(MAGIC + len(header_bytes).to_bytes(2, 'little') + header_bytes)
+
+    def append(self, array: np.ndarray):
+        self.file.seek(self.header_size + self.rows * self.row_bytes)
+        self.file.write(np.ascontiguousarray(array, dtype=self.dtype).tobytes())
+        self.rows += len(array)
+        # Header last: readers never see rows that aren't written yet
+        self._write_header()
+        self.file.flush()
+
+    def sync(self):
+        """Force written rows to disk."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def truncate(self, rows: int):
+        """Drop all rows after the first ``rows``."""
+        if rows >= self.rows:
+            return
+        self.rows = rows
+        self.file.truncate(self.header_size + rows * self.row_bytes)
+        self._write_header()
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class DigitTensorWriter:
+    """Resizes digit crops to a fixed shape and appends them in batches."""
+
+    def __init__(self, output_dir: str, height: int = 64, width: int = 64, batch_size: int = 256):
+        """
+        Initialize tensor writer.
+
+        Args:
+            output_dir: Folder for digits.npy and digits_meta.npy
+            height: Digit height in pixels
+            width: Digit width in pixels
+            batch_size: Digits buffered before each write
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.height = height
+        self.width = width
+        self.batch_size = batch_size
+        self.digits = _AppendableNpy(os.path.join(output_dir, 'digits.npy'), np.uint8, (height, width))
+        self.meta = _AppendableNpy(os.path.join(output_dir, 'digits_meta.npy'), META_DTYPE, ())
+        # A run interrupted between the two appends in flush() leaves
+        # digits without metadata; keep only rows present in both files
+        rows = min(self.digits.rows, self.meta.rows)
+        self.digits.truncate(rows)
+        self.meta.truncate(rows)
+        self._pending: List[np.ndarray] = []
+        self._pending_meta: List[tuple] = []
+
+    def write_tps(self, metadata: Dict, digits: List[np.ndarray],
+                  paslon_rows: Optional[List[np.ndarray]] = None) -> int:
+        """
+        Queue the 9 digits of one TPS. Paslon rows are not exported.
+
+        Args:
+            metadata: Must contain kode_kelurahan and nomor_tps
+            digits: 9 digit crops in paslon-major order
+            paslon_rows: Ignored, rows have no fixed shape
+
+        Returns:
+            Number of digits queued
+        """
+        for idx, digit_img in enumerate(digits):
+            # Empty fallback crops from the cropper are all zeros
+            valid = digit_img.size > 0 and bool(digit_img.any())
+            self._pending.append(digit_img)
+            self._pending_meta.append((
+                metadata['kode_kelurahan'], metadata['nomor_tps'],
+                idx // 3 + 1, idx % 3 + 1, valid
+            ))
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return len(digits)
+
+    def flush(self):
+        """Resize and write all queued digits."""
+        if not self._pending:
+            return
+
+        batch = np.empty((len(self._pending), self.height, self.width), dtype=np.uint8)
+        for i, img in enumerate(self._pending):
+            if img.size == 0:
+                batch[i] = 0
+                continue
+            if img.ndim == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            batch[i] = cv2.resize(img, (self.width, self.height), interpolation=cv2.INTER_AREA)
+
+        self.digits.append(batch)
+        # Metadata only once the digits it describes are on disk
+        self.digits.sync()
+        self.meta.append(np.array(self._pending_meta, dtype=META_DTYPE))
+        self._pending.clear()
+        self._pending_meta.clear()
+
+    def close(self):
+        """Write the last batch and close both files."""
+        self.flush()
+        self.digits.close()
+        self.meta.close()
@@ -0,0 +1 @@
+"""Dependency-free helpers shared by kawal_pemilu_scraper and jumlah_suara_extractor."""
@@ -0,0 +1,30 @@
+"""
+Difference hashes (dHash) of grayscale thumbnails.
+
+The crawl dedup (kawal_pemilu_scraper/dedup.py, Pillow thumbnails) and the
+extractor's photo preselection (jumlah_suara_extractor/utils/preselect.py,
+OpenCV thumbnails) only differ in how they make the thumbnail.
+"""
+
+
+def difference_hash(thumbnail) -> int:
+    """
+    Difference hash of a grayscale thumbnail.
+
+    Args:
+        thumbnail: Rows of pixel values (list of lists or 2-D NumPy array),
+            one column wider than it is high
+
+    Returns:
+        Hash as int (bit set where a pixel is brighter than its left neighbour)
+    """
+    value = 0
+    for row in thumbnail:
+        for left, right in zip(row[:-1], row[1:]):
+            value = (value << 1) | int(right > left)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of bits that differ between two hashes."""
+    return bin(a ^ b).count('1')
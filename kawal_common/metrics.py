@@ -0,0 +1,129 @@
+"""
+Metric primitives shared by the crawler and the extractor.
+
+Standard library only, so either package can use them without the other
+(kawal_pemilu_scraper/extensions.py exports crawl metrics with them,
+jumlah_suara_extractor/utils/metrics.py builds its stage histograms on
+Histogram).
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Bucket upper bounds in seconds. Playwright page loads take seconds,
+# image downloads from GCS usually well under one.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with Prometheus semantics.
+
+    Memory use is constant regardless of how many observations are made,
+    so it is safe to keep one per host during multi-hour crawls.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record a single observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return ``(le, cumulative_count)`` pairs including ``+Inf``."""
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((_format_float(bound), running))
+        result.append(("+Inf", self.count))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside the bucket."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        running = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and running + count >= rank:
+                return lower + (bound - lower) * (rank - running) / count
+            running += count
+            lower = bound
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'p50': _round(self.quantile(0.5)),
+            'p95': _round(self.quantile(0.95)),
+            'p99': _round(self.quantile(0.99)),
+            'buckets': dict(self.cumulative()),
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 6)
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    inner = ','.join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+    return '{' + inner + '}'
+
+
+class PrometheusTextWriter:
+    """Builds a Prometheus text exposition (format 0.0.4) document."""
+
+    def __init__(self, prefix: str = 'kawal_scraper'):
+        self.prefix = prefix
+        self.lines: List[str] = []
+
+    def _header(self, name: str, kind: str, help_text: str) -> str:
+        full = f"{self.prefix}_{name}"
+        self.lines.append(f"# HELP {full} {help_text}")
+        self.lines.append(f"# TYPE {full} {kind}")
+        return full
+
+    def gauge(self, name: str, help_text: str, value: float,
+              labels: Optional[Dict[str, str]] = None):
+        full = self._header(name, 'gauge', help_text)
+        self.lines.append(f"{full}{_labels(labels or {})} {_format_float(value)}")
+
+    def counter(self, name: str, help_text: str, value: float,
+                labels: Optional[Dict[str, str]] = None):
+        full = self._header(name, 'counter', help_text)
+        self.lines.append(f"{full}{_labels(labels or {})} {_format_float(value)}")
+
+    def histograms(self, name: str, help_text: str,
+                   series: Dict[str, Histogram], label: str):
+        """Write one histogram family with one series per label value."""
+        full = self._header(name, 'histogram', help_text)
+        for label_value, hist in sorted(series.items()):
+            for le, count in hist.cumulative():
+                labels = _labels({label: label_value, 'le': le})
+                self.lines.append(f"{full}_bucket{labels} {count}")
+            labels = _labels({label: label_value})
+            self.lines.append(f"{full}_sum{labels} {_format_float(hist.sum)}")
+            self.lines.append(f"{full}_count{labels} {hist.count}")
+
+    def render(self) -> str:
+        return '\n'.join(self.lines) + '\n'
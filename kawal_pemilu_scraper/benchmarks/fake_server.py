@@ -0,0 +1,255 @@
+"""
+Local stand-in for kawalpemilu.org and its image hosts.
+
+Serves a minimal SPA with the same DOM structure the spider scrapes:
+one ``tr`` per TPS, C1 photo links under ``.foto-kpu div>a``, and ROI URLs
+(URL-encoded, like the real site) in ``div`` ids. The rows are rendered
+by a script after a delay and a JSON fetch, like the Angular app. Photos
+are served from the same server with configurable latency, error rate
+and size.
+
+Routes:
+    /h/<village_id>              village page (SPA shell)
+    /api/h/<village_id>          TPS rows as JSON, fetched by the page
+    /img/<village_id>/<tps>/<n>  C1 photo (JPEG)
+    /roi/<village_id>/<tps>/<n>  ROI photo (JPEG)
+    /__stats                     request counters as JSON
+
+Point the spider at it with
+``-s KAWAL_BASE_URL=http://127.0.0.1:8765 -s KAWAL_ROI_URL_PREFIX=http://127.0.0.1:8765/roi``.
+
+Usage:
+    python -m kawal_pemilu_scraper.benchmarks.fake_server --port 8765 --image-latency-ms 80
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import quote
+
+
+@dataclass
+class FakeSiteConfig:
+    """Shape and behaviour of the fake site."""
+
+    tps_per_village: int = 10
+    photos_per_tps: int = 2
+    page_latency_ms: float = 150.0
+    image_latency_ms: float = 50.0
+    latency_jitter: float = 0.5      # +/- fraction of the latency
+    render_delay_ms: float = 300.0   # SPA delay before the rows appear
+    page_error_rate: float = 0.0     # fraction of page loads answered with 503
+    image_error_rate: float = 0.0    # fraction of image requests answered with 503
+    image_width: int = 1280
+    image_height: int = 960
+    jpeg_quality: int = 85
+    image_variants: int = 8
+    seed: int = 0
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Kawal Pemilu - {village_id}</title></head>
+<body>
+<app-root></app-root>
+<script>
+setTimeout(async () => {{
+    const rows = await (await fetch('/api/h/{village_id}')).json();
+    const table = document.createElement('table');
+    for (const row of rows) {{
+        const tr = document.createElement('tr');
+        const photos = row.photos.map(url => `<div><a href="${{url}}">foto</a></div>`).join('');
+        const rois = row.rois.map(url => `<div id="${{url}}"></div>`).join('');
+        tr.innerHTML = `<td>TPS ${{row.tps}}</td><td class="foto-kpu">${{photos}}</td><td>${{rois}}</td>`;
+        table.appendChild(tr);
+    }}
+    document.querySelector('app-root').appendChild(table);
+}}, {render_delay_ms});
+</script>
+</body>
+</html>
+"""
+
+
+def _render_jpegs(config: FakeSiteConfig) -> List[bytes]:
+    """Pre-render noisy JPEGs, so serving an image costs no CPU."""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Pillow is required for the fake server (it is also required by ImagesPipeline)")
+
+    variants = []
+    for i in range(config.image_variants):
+        sigma = 20 + i * 5
+        img = Image.effect_noise((config.image_width, config.image_height), sigma).convert('RGB')
+        buf = io.BytesIO()
+        img.save(buf, format='JPEG', quality=config.jpeg_quality)
+        variants.append(buf.getvalue())
+    return variants
+
+
+class FakeKawalServer:
+    """Threaded HTTP server serving the fake site, usable in-process or standalone."""
+
+    def __init__(self, config: FakeSiteConfig = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize server (not started yet).
+
+        Args:
+            config: Site shape, latency and error settings
+            host: Interface to bind
+            port: Port to bind (0 = pick a free port)
+        """
+        self.config = config or FakeSiteConfig()
+        self.images = _render_jpegs(self.config)
+        self._lock = threading.Lock()
+        self._attempts: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'FakeKawalServer':
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-kawal', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {}
+            self._attempts = {}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def _sleep(self, latency_ms: float):
+        jitter = self.config.latency_jitter
+        time.sleep(max(0.0, latency_ms * random.uniform(1 - jitter, 1 + jitter)) / 1000)
+
+    def _should_fail(self, path: str, rate: float) -> bool:
+        """Reproducible failure decision per (seed, path, attempt)."""
+        if rate <= 0:
+            return False
+        with self._lock:
+            attempt = self._attempts.get(path, 0)
+            self._attempts[path] = attempt + 1
+        digest = hashlib.sha1(f"{self.config.seed}:{path}:{attempt}".encode()).digest()
+        return int.from_bytes(digest[:4], 'big') / 2 ** 32 < rate
+
+    def rows(self, village_id: str) -> List[dict]:
+        """TPS rows of a village, as served by /api/h/<village_id>."""
+        base = self.base_url
+        rows = []
+        for tps in range(1, self.config.tps_per_village + 1):
+            photos = [f"{base}/img/{village_id}/{tps}/{n}" for n in range(self.config.photos_per_tps)]
+            # The real site puts URL-encoded ROI URLs (with =s<size> suffix) in div ids
+            rois = [f"{base}/roi/{village_id}/{tps}/{n}" + quote("=s1280") for n in range(self.config.photos_per_tps)]
+            rows.append({'tps': tps, 'photos': photos, 'rois': rois})
+        return rows
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        parts = request.path.split('?', 1)[0].strip('/').split('/')
+        kind = parts[0]
+
+        if kind == 'h' and len(parts) == 2:
+            self._count('pages')
+            self._sleep(self.config.page_latency_ms)
+            if self._should_fail(request.path, self.config.page_error_rate):
+                return self._send(request, 503, b'busy', 'text/plain', 'page_errors')
+            body = PAGE_TEMPLATE.format(village_id=parts[1], render_delay_ms=int(self.config.render_delay_ms))
+            return self._send(request, 200, body.encode('utf-8'), 'text/html; charset=utf-8')
+
+        if kind == 'api' and len(parts) == 3:
+            self._count('api')
+            self._sleep(self.config.page_latency_ms / 2)
+            return self._send(request, 200, json.dumps(self.rows(parts[2])).encode('utf-8'), 'application/json')
+
+        if kind in ('img', 'roi') and len(parts) == 4:
+            self._count('images')
+            self._sleep(self.config.image_latency_ms)
+            if self._should_fail(request.path, self.config.image_error_rate):
+                return self._send(request, 503, b'busy', 'text/plain', 'image_errors')
+            variant = int(hashlib.md5(request.path.encode()).hexdigest(), 16) % len(self.images)
+            return self._send(request, 200, self.images[variant], 'image/jpeg', 'image_bytes')
+
+        if kind == '__stats':
+            with self._lock:
+                body = json.dumps({'config': asdict(self.config), 'stats': self.stats}).encode('utf-8')
+            return self._send(request, 200, body, 'application/json')
+
+        return self._send(request, 404, b'not found', 'text/plain')
+
+    def _send(self, request, status: int, body: bytes, content_type: str, counter: str = None):
+        if counter:
+            self._count(counter, len(body) if counter.endswith('bytes') else 1)
+        request.send_response(status)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+
+def add_site_arguments(parser: argparse.ArgumentParser):
+    """Add FakeSiteConfig options to an argument parser."""
+    defaults = FakeSiteConfig()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+
+
+def config_from_args(args) -> FakeSiteConfig:
+    return FakeSiteConfig(**{name: getattr(args, name) for name in asdict(FakeSiteConfig())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local kawalpemilu.org stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_site_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeKawalServer(config_from_args(args), args.host, args.port)
+    print(f"🌐 Fake kawalpemilu di {server.base_url} (Ctrl+C untuk berhenti)")
+    print(f"   scrapy crawl kawal_spider -s KAWAL_BASE_URL={server.base_url} "
+          f"-s KAWAL_ROI_URL_PREFIX={server.base_url}/roi ...")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""
+Spider throughput benchmark against the local fake site.
+
+Starts ``FakeKawalServer`` in-process, then runs ``scrapy crawl
+kawal_spider`` once per concurrency setting against it. Each run gets a
+temporary IMAGES_STORE. Reports villages/min, images/sec and the peak
+RSS of the crawl's process tree (Scrapy, Playwright driver and
+Chromium). Runs are offline and reproducible, so crawler settings can be
+tuned without touching kawalpemilu.org.
+
+Every combination of ``--concurrency`` (CONCURRENT_REQUESTS and
+CONCURRENT_REQUESTS_PER_DOMAIN) and ``--max-villages``
+(BACKPRESSURE_MAX_VILLAGES) is run. Must be started from the project root
+(next to scrapy.cfg).
+
+Usage:
+    python -m kawal_pemilu_scraper.benchmarks.spider_benchmark
+    python -m kawal_pemilu_scraper.benchmarks.spider_benchmark --villages 40 --concurrency 4,8,16 --max-villages 2,4
+    python -m kawal_pemilu_scraper.benchmarks.spider_benchmark --image-latency-ms 200 --image-error-rate 0.05 --json spider.json
+    python -m kawal_pemilu_scraper.benchmarks.spider_benchmark --set PLAYWRIGHT_RECYCLE_PAGES=10
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from ..browser import MB, process_tree_rss
+from .fake_server import FakeKawalServer, add_site_arguments, config_from_args
+
+
+class RssSampler:
+    """Samples the RSS of a process tree on a background thread."""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.samples.append(process_tree_rss(self.pid)[0])
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+    def start(self) -> 'RssSampler':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mb(self) -> float:
+        return max(self.samples, default=0) / MB
+
+    @property
+    def mean_mb(self) -> float:
+        return sum(self.samples) / len(self.samples) / MB if self.samples else 0.0
+
+
+def count_images(store: str) -> int:
+    """Count stored photos (loose files or tar shard members)."""
+    count = 0
+    for root, dirs, files in os.walk(store):
+        for name in files:
+            if name.startswith('raw_') and name.endswith('.jpg'):
+                count += 1
+            elif name.endswith('.idx.jsonl'):
+                with open(os.path.join(root, name)) as f:
+                    count += sum(1 for line in f if line.strip())
+    return count
+
+
+def count_lines(path: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return sum(1 for line in f if line.strip())
+
+
+def run_crawl(server: FakeKawalServer, village_ids: List[str], settings: Dict[str, str],
+              download_type: str, workdir: str, verbose: bool = False) -> Dict:
+    """
+    Run one crawl against the fake server.
+
+    Args:
+        server: Running fake server
+        village_ids: Villages to crawl
+        settings: Scrapy settings overrides for this run
+        download_type: 'regular' or 'roi'
+        workdir: Scratch directory (IMAGES_STORE and the village list go here)
+        verbose: Show Scrapy log output
+
+    Returns:
+        Dict with throughput, memory and failure numbers
+    """
+    store = os.path.join(workdir, 'output')
+    ids_file = os.path.join(workdir, 'village_ids.txt')
+    with open(ids_file, 'w') as f:
+        f.write(','.join(village_ids))
+
+    base = server.base_url
+    overrides = {
+        'IMAGES_STORE': store,
+        'KAWAL_BASE_URL': base,
+        'KAWAL_ROI_URL_PREFIX': f"{base}/roi",
+        'DOWNLOAD_DELAY': '0',
+        'METRICS_DIR': workdir,  # metrics and memory trajectory stay out of the repo
+        **settings,
+    }
+    cmd = [
+        sys.executable, '-m', 'scrapy', 'crawl', 'kawal_spider',
+        '-a', f"village_ids_file={ids_file}",
+        '-a', "province_name=BENCHMARK",
+        '-a', "regency_name=FAKE REGENCY",
+        '-a', "district_name=FAKE DISTRICT",
+        '-a', f"download_type={download_type}",
+    ]
+    for key, value in overrides.items():
+        cmd.extend(['-s', f"{key}={value}"])
+    if not verbose:
+        cmd.append('--nolog')
+
+    env = os.environ.copy()
+    env['PYTHONUNBUFFERED'] = '1'
+
+    server.reset_stats()
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               env=env, universal_newlines=True, bufsize=1)
+    sampler = RssSampler(process.pid).start()
+
+    villages = 0
+    for line in iter(process.stdout.readline, ''):
+        if line.startswith('[PROGRESS]'):
+            villages += 1
+        elif verbose:
+            print(line.rstrip())
+    process.wait()
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+
+    images = count_images(store)
+    return {
+        'returncode': process.returncode,
+        'elapsed_s': round(elapsed, 2),
+        'villages': villages,
+        'villages_per_min': round(villages / elapsed * 60, 2) if elapsed else 0.0,
+        'images': images,
+        'images_per_second': round(images / elapsed, 2) if elapsed else 0.0,
+        'peak_rss_mb': round(sampler.peak_mb, 1),
+        'mean_rss_mb': round(sampler.mean_mb, 1),
+        'dead_letters': count_lines(os.path.join(store, 'dead_letter.jsonl')),
+        'server': dict(server.stats),
+    }
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def print_report(results: List[Dict], expected_images: int):
+    print("\n" + "=" * 92)
+    print(f"🕷️  SPIDER BENCHMARK ({expected_images} images expected per run)")
+    print("=" * 92)
+    print(f"{'Concurrency':>12}{'Villages':>10}{'Vill/min':>10}{'Images':>9}{'Img/s':>9}"
+          f"{'Peak RSS':>11}{'Mean RSS':>11}{'Errors':>8}{'Dead':>6}{'Time s':>8}")
+    for r in results:
+        server_errors = r['server'].get('page_errors', 0) + r['server'].get('image_errors', 0)
+        label = f"{r['concurrency']}/{r['max_villages']}"
+        print(f"{label:>12}{r['villages']:>10}{r['villages_per_min']:>10.1f}{r['images']:>9}"
+              f"{r['images_per_second']:>9.1f}{r['peak_rss_mb']:>9.0f}MB{r['mean_rss_mb']:>9.0f}MB"
+              f"{server_errors:>8}{r['dead_letters']:>6}{r['elapsed_s']:>8.1f}")
+    print("=" * 92)
+    print("Concurrency: CONCURRENT_REQUESTS / BACKPRESSURE_MAX_VILLAGES. "
+          "Errors: 503s served by the fake site.\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KawalSpider against a local fake kawalpemilu site")
+    parser.add_argument('--villages', type=int, default=20, help="Villages per run")
+    parser.add_argument('--concurrency', type=parse_int_list, default=[4, 8, 16],
+                        help="Comma-separated CONCURRENT_REQUESTS values")
+    parser.add_argument('--max-villages', type=parse_int_list, default=[4],
+                        help="Comma-separated BACKPRESSURE_MAX_VILLAGES values")
+    parser.add_argument('--download-type', choices=['regular', 'roi'], default='roi')
+    parser.add_argument('--render-wait-ms', type=int, default=1000, help="KAWAL_RENDER_WAIT_MS")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="Extra Scrapy setting for every run (repeatable)")
+    parser.add_argument('--json', help="Write results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Show Scrapy log output")
+    add_site_arguments(parser)
+    args = parser.parse_args()
+
+    if not os.path.exists('scrapy.cfg'):
+        print("❌ Jalankan dari root project (folder yang berisi scrapy.cfg)")
+        sys.exit(1)
+
+    extra = dict(item.split('=', 1) for item in args.set)
+    config = config_from_args(args)
+    server = FakeKawalServer(config).start()
+    village_ids = [f"99{i:08d}" for i in range(args.villages)]
+    expected_images = args.villages * config.tps_per_village * config.photos_per_tps
+    print(f"🌐 Fake kawalpemilu di {server.base_url}")
+
+    results = []
+    try:
+        for concurrency, max_villages in itertools.product(args.concurrency, args.max_villages):
+            print(f"🚀 CONCURRENT_REQUESTS={concurrency}, BACKPRESSURE_MAX_VILLAGES={max_villages} ...")
+            settings = {
+                'CONCURRENT_REQUESTS': str(concurrency),
+                'CONCURRENT_REQUESTS_PER_DOMAIN': str(concurrency),
+                'BACKPRESSURE_MAX_VILLAGES': str(max_villages),
+                'KAWAL_RENDER_WAIT_MS': str(args.render_wait_ms),
+                **extra,
+            }
+            with tempfile.TemporaryDirectory(prefix='spider-bench-') as workdir:
+                result = run_crawl(server, village_ids, settings, args.download_type, workdir, args.verbose)
+            result.update({'concurrency': concurrency, 'max_villages': max_villages, 'settings': settings})
+            if result['returncode'] != 0:
+                print(f"⚠️  Crawl keluar dengan kode {result['returncode']}")
+            results.append(result)
+    finally:
+        server.stop()
+
+    print_report(results, expected_images)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'villages': args.villages,
+                'download_type': args.download_type,
+                'site': vars(config),
+                'results': results,
+            }, f, indent=2)
+        print(f"📄 Hasil disimpan ke {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+"""
+Browser lifecycle management for long Playwright crawls.
+
+Chromium keeps growing when one context renders thousands of SPA pages.
+``ContextRecycler`` spreads pages over short-lived browser contexts and
+closes each one once its pages are done. ``BrowserWatchdog`` samples the
+RSS of the whole process tree (Scrapy, the Playwright driver and Chromium)
+and logs it over time. Above a limit it drains in-flight villages and
+restarts the browser.
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import deferred_from_coro
+from twisted.internet import task
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def _proc_rss_bytes(pid: int) -> int:
+    """Read resident set size of a process from /proc (Linux only)."""
+    with open(f"/proc/{pid}/statm", 'r') as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def _proc_children_map():
+    """Build {ppid: [pid, ...]} from /proc (Linux only)."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", 'r') as f:
+                # comm may contain spaces, ppid is the 2nd field after ')'
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def process_tree_rss(pid: int = None):
+    """
+    Measure RSS of a process and all of its descendants.
+
+    Uses psutil when installed, falls back to /proc on Linux, and to the
+    peak RSS of the current process elsewhere.
+
+    Returns:
+        Tuple of (total_bytes, own_bytes, child_process_count)
+    """
+    pid = pid or os.getpid()
+
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        proc = psutil.Process(pid)
+        own = proc.memory_info().rss
+        total = own
+        children = proc.children(recursive=True)
+        for child in children:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total, own, len(children)
+
+    if os.path.isdir('/proc'):
+        own = _proc_rss_bytes(pid)
+        total = own
+        count = 0
+        tree = _proc_children_map()
+        stack = list(tree.get(pid, []))
+        while stack:
+            child = stack.pop()
+            try:
+                total += _proc_rss_bytes(child)
+                count += 1
+            except (OSError, IndexError, ValueError):
+                continue
+            stack.extend(tree.get(child, []))
+        return total, own, count
+
+    import resource
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return own, own, 0
+
+
+def playwright_handler(crawler):
+    """
+    scrapy-playwright's download handler of a running crawler.
+
+    Returns:
+        The https handler if it keeps its contexts by name
+        (``context_wrappers``), else None
+    """
+    handlers = getattr(getattr(crawler.engine, 'downloader', None), 'handlers', None)
+    get_handler = getattr(handlers, '_get_handler', None)
+    handler = get_handler('https') if get_handler else None
+    return handler if hasattr(handler, 'context_wrappers') else None
+
+
+class ContextRecycler:
+    """
+    Assigns village pages to browser contexts and retires each context
+    after ``max_pages`` pages.
+
+    Retired contexts are closed as soon as their last open page finishes.
+    This frees the renderer memory Chromium has built up in them. Contexts
+    are looked up by name in scrapy-playwright's download handler, so a
+    context is closed even when its last request failed without a page.
+
+    With a ``profile_dir``, every context is a persistent context backed by
+    a profile directory, so cookies, storage and service worker caches
+    survive across contexts and crawl runs. Chromium locks a profile while
+    it is in use, so overlapping contexts get separate ``slot-N``
+    directories.
+    """
+
+    def __init__(self, max_pages: int = 0, stats=None,
+                 profile_dir: str = None, launch_options: dict = None, crawler=None):
+        """
+        Initialize recycler.
+
+        Args:
+            max_pages: Pages per context before it is retired (0 disables recycling)
+            stats: Scrapy stats collector
+            profile_dir: Base directory for persistent browser profiles (optional)
+            launch_options: Browser launch options, applied to persistent contexts
+            crawler: Running crawler, to reach the contexts of its Playwright handler
+        """
+        self.max_pages = max_pages
+        self.stats = stats
+        self.crawler = crawler
+        self.profile_dir = profile_dir
+        self.launch_options = launch_options or {}
+        self.generation = 0
+        self.pages_in_generation = 0
+        self.open_pages = {}  # context name -> requests issued but not finished
+        self.slots = {}       # context name -> profile slot (persistent mode)
+
+    @property
+    def current_name(self) -> str:
+        return f"village-{self.generation}"
+
+    async def rotate(self):
+        """Send subsequent pages to a fresh context."""
+        retired = self.current_name
+        self.generation += 1
+        self.pages_in_generation = 0
+        if self.stats:
+            self.stats.inc_value('browser/context_recycled')
+
+        # Nothing left to wait for, close it right away
+        if self.open_pages.get(retired, 0) == 0:
+            await self._close_context(retired)
+
+    async def assign(self) -> str:
+        """Return the context name for a new page request."""
+        if self.max_pages and self.pages_in_generation >= self.max_pages:
+            await self.rotate()
+        self.pages_in_generation += 1
+        name = self.current_name
+        self.open_pages[name] = self.open_pages.get(name, 0) + 1
+        if self.profile_dir and name not in self.slots:
+            self.slots[name] = self._free_slot()
+        return name
+
+    def _free_slot(self) -> int:
+        used = set(self.slots.values())
+        slot = 0
+        while slot in used:
+            slot += 1
+        return slot
+
+    def context_kwargs(self, name: str):
+        """Return ``playwright_context_kwargs`` for a context, if any."""
+        if not self.profile_dir:
+            return None
+        user_data_dir = os.path.join(self.profile_dir, f"slot-{self.slots[name]}")
+        return {**self.launch_options, 'user_data_dir': user_data_dir}
+
+    def open_page_count(self) -> int:
+        return sum(self.open_pages.values())
+
+    async def release(self, request):
+        """
+        Mark a page request as finished and close its context if retired.
+
+        Args:
+            request: Page request (carries ``playwright_context`` in meta),
+                whether or not it got a page
+        """
+        name = request.meta.get('playwright_context')
+        if name not in self.open_pages:
+            return
+
+        self.open_pages[name] -= 1
+        if self.open_pages[name] > 0 or name == self.current_name:
+            return
+
+        await self._close_context(name)
+
+    async def _close_context(self, name: str):
+        self.open_pages.pop(name, None)
+        handler = self._handler()
+        context = self._context(name)
+        if context is not None:
+            try:
+                await context.close()
+            except Exception as e:
+                # Chromium may still hold the profile lock, keep its slot
+                logger.debug(f"Closing context {name} failed: {e}")
+                return
+        elif handler is None:
+            # Can't tell whether the context is still open, keep its slot
+            return
+        # Closed now, or never opened; its profile directory is free again
+        self.slots.pop(name, None)
+
+    def _handler(self):
+        return playwright_handler(self.crawler) if self.crawler is not None else None
+
+    def _context(self, name: str):
+        """The BrowserContext scrapy-playwright opened under this name, if any."""
+        handler = self._handler()
+        wrapper = handler.context_wrappers.get(name) if handler is not None else None
+        return getattr(wrapper, 'context', None)
+
+    async def restart_browser(self):
+        """
+        Close every context and the browser itself.
+
+        scrapy-playwright relaunches the browser on the next page request
+        (PLAYWRIGHT_RESTART_DISCONNECTED_BROWSER, enabled by default). Call
+        this only when no pages are open.
+        """
+        await self.rotate()
+        handler = self._handler()
+        opened = set(handler.context_wrappers) if handler is not None else set()
+        for name in opened | set(self.open_pages):
+            if self.open_pages.get(name, 0) == 0:
+                await self._close_context(name)
+
+        browser = getattr(handler, 'browser', None)
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning(f"Closing browser failed: {e}")
+
+        if self.stats:
+            self.stats.inc_value('browser/restarts')
+
+
+class BrowserWatchdog:
+    """
+    Samples process-tree RSS and restarts the browser above a limit.
+
+    Each sample is logged and appended to a CSV trajectory file. When the
+    limit is exceeded, new page requests are paused through CrawlBackpressure.
+    Once the in-flight villages have finished, the browser is restarted.
+    """
+
+    def __init__(self, crawler, interval, rss_limit_mb, trajectory_path):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.interval = interval
+        self.rss_limit = rss_limit_mb * MB if rss_limit_mb else 0
+        self.trajectory_path = trajectory_path
+        self.start_time = None
+        self.restarting = False
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('WATCHDOG_ENABLED'):
+            raise NotConfigured
+
+        trajectory_file = settings.get('WATCHDOG_TRAJECTORY_FILE')
+        trajectory_path = None
+        if trajectory_file:
+            output_dir = settings.get('METRICS_DIR') or settings.get('IMAGES_STORE') or '.'
+            trajectory_path = os.path.join(output_dir, trajectory_file)
+
+        ext = cls(
+            crawler,
+            interval=settings.getfloat('WATCHDOG_INTERVAL', 60.0),
+            rss_limit_mb=settings.getint('WATCHDOG_RSS_LIMIT_MB', 0),
+            trajectory_path=trajectory_path,
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.start_time = time.monotonic()
+        if self.trajectory_path and not os.path.exists(self.trajectory_path):
+            os.makedirs(os.path.dirname(self.trajectory_path) or '.', exist_ok=True)
+            with open(self.trajectory_path, 'w') as f:
+                f.write("elapsed_s,total_rss_mb,own_rss_mb,child_processes,open_pages,restarting\n")
+        self.task = task.LoopingCall(self.sample, spider)
+        self.task.start(self.interval, now=True)
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        max_rss = self.stats.get_value('watchdog/max_rss_bytes', 0)
+        logger.info(f"Peak process tree RSS: {max_rss / MB:.0f} MB")
+
+    def sample(self, spider):
+        try:
+            total, own, children = process_tree_rss()
+        except Exception as e:
+            logger.debug(f"RSS sampling failed: {e}")
+            return
+
+        recycler = getattr(spider, 'context_recycler', None)
+        open_pages = recycler.open_page_count() if recycler else 0
+        elapsed = time.monotonic() - self.start_time
+
+        self.stats.set_value('watchdog/rss_bytes', total)
+        self.stats.max_value('watchdog/max_rss_bytes', total)
+        logger.info(
+            f"Memory: {total / MB:.0f} MB total, {own / MB:.0f} MB scrapy, "
+            f"{children} child processes, {open_pages} open pages"
+        )
+        if self.trajectory_path:
+            try:
+                with open(self.trajectory_path, 'a') as f:
+                    f.write(f"{elapsed:.1f},{total / MB:.1f},{own / MB:.1f},"
+                            f"{children},{open_pages},{int(self.restarting)}\n")
+            except OSError:
+                pass
+
+        if self.rss_limit and total > self.rss_limit and not self.restarting and recycler:
+            logger.warning(
+                f"RSS {total / MB:.0f} MB above limit {self.rss_limit / MB:.0f} MB - "
+                f"draining and restarting browser"
+            )
+            self.restarting = True
+            # Don't return the deferred, sampling keeps running while we drain
+            d = deferred_from_coro(self._drain_and_restart(spider, recycler))
+            d.addErrback(lambda f: logger.error(f"Browser restart failed: {f.value}"))
+
+    async def _drain_and_restart(self, spider, recycler):
+        backpressure = getattr(spider, 'backpressure', None)
+        try:
+            if backpressure is None:
+                # Cannot pause new pages, fall back to moving them to a fresh context
+                await recycler.rotate()
+                return
+
+            backpressure.paused = True
+            while backpressure.inflight_villages > 0:
+                await asyncio.sleep(1)
+            await recycler.restart_browser()
+
+            total, _, _ = process_tree_rss()
+            logger.warning(f"Browser restarted, RSS now {total / MB:.0f} MB")
+        finally:
+            if backpressure is not None:
+                backpressure.paused = False
+            self.restarting = False
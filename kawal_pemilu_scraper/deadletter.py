@@ -0,0 +1,117 @@
+"""
+Dead-letter file for villages and images that failed after all retries.
+
+Entries are appended as JSON lines to ``DEAD_LETTER_FILE`` inside the output
+directory, so they accumulate across runs. Re-run mode
+(``-a dead_letter_file=output/dead_letter.jsonl``) consumes that file:
+it renames it to ``*.consumed``, renders only the failed villages again,
+and downloads only the failed images. Anything that still fails goes into
+a fresh dead-letter file.
+"""
+
+import json
+import logging
+import os
+import time
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+logger = logging.getLogger(__name__)
+
+LOCATION_FIELDS = ('village_id', 'village_name', 'district_name', 'regency_name', 'province_name')
+
+
+class DeadLetterLog:
+    """
+    Records permanently failed villages and images.
+
+    Installed as an extension. On ``spider_opened`` it attaches itself to
+    the spider as ``spider.dead_letter``.
+    """
+
+    def __init__(self, path, stats):
+        self.path = path
+        self.stats = stats
+        self.count = 0
+        self._file = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        filename = settings.get('DEAD_LETTER_FILE')
+        if not filename:
+            raise NotConfigured
+
+        output_dir = settings.get('IMAGES_STORE') or '.'
+        ext = cls(os.path.join(output_dir, filename), crawler.stats)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        spider.dead_letter = self
+
+    def spider_closed(self, spider, reason):
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self.count:
+            logger.warning(f"{self.count} failed villages/images written to {self.path}")
+            print(f"[DEAD LETTER] {self.count} entries -> {self.path}", flush=True)
+
+    def _write(self, entry: dict):
+        # Opened lazily: a re-run has already consumed the previous file by now
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        entry['timestamp'] = time.time()
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        self.count += 1
+        self.stats.inc_value(f"dead_letter/{entry['type']}")
+
+    def village_failed(self, meta: dict, reason: str):
+        """Record a village page that could not be rendered or parsed."""
+        entry = {'type': 'village', 'reason': reason, 'download_type': meta.get('download_type')}
+        entry.update({field: meta.get(field) for field in LOCATION_FIELDS})
+        self._write(entry)
+
+    def image_failed(self, url: str, item: dict, reason: str):
+        """Record an image that could not be downloaded."""
+        entry = {'type': 'image', 'url': url, 'reason': reason, 'tps_number': item.get('tps_number')}
+        entry.update({field: item.get(field) for field in LOCATION_FIELDS})
+        self._write(entry)
+
+
+def consume_dead_letters(path: str):
+    """
+    Load a dead-letter file for re-run mode and mark it consumed.
+
+    Args:
+        path: Path to dead_letter.jsonl
+
+    Returns:
+        Tuple of (village entries, image entries)
+    """
+    consumed_path = f"{path}.consumed"
+    os.replace(path, consumed_path)
+
+    villages = {}
+    images = {}
+    with open(consumed_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('type') == 'village':
+                # Same village may have failed in several runs, render it once
+                villages[entry['village_id']] = entry
+            elif entry.get('type') == 'image':
+                images[entry['url']] = entry
+
+    return list(villages.values()), list(images.values())
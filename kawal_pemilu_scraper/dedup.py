@@ -0,0 +1,159 @@
+"""
+Perceptual-hash deduplication of downloaded photos.
+
+The same C1 photo is often served under several URLs (re-uploads, KPU and
+user photos of the same sheet). File names hash the URL, so every copy is
+stored and later extracted again. ``PerceptualHashIndex`` keeps the 64-bit
+dHash of every stored photo, per TPS by default, and finds near-identical
+ones (Hamming distance <= ``max_distance``).
+
+A 64-bit hash of a 9x8 thumbnail cannot tell apart two C1 sheets that only
+differ in their handwritten numbers, so a match is only a candidate. It
+counts as the same photo when the pixel dimensions are equal and a 256-bit
+dHash (17x16 thumbnail) is within ``confirm_distance`` as well.
+
+Lookups use multi-index hashing: the hash is split into ``max_distance + 1``
+bands, and two hashes within the distance share at least one band exactly,
+so only photos with a matching band are compared. This keeps a global index
+over hundreds of thousands of photos cheap.
+
+Hashes are appended to ``IMAGES_DEDUP_INDEX_FILE`` in the output folder and
+loaded again on the next run, so resumed crawls dedup against earlier ones.
+"""
+
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from kawal_common.hashing import difference_hash, hamming
+
+logger = logging.getLogger(__name__)
+
+DEDUP_MODES = ('off', 'skip', 'link')
+DEDUP_SCOPES = ('tps', 'village', 'global')
+
+
+def dhash(image, hash_size: int = 8) -> int:
+    """
+    Difference hash of a Pillow image.
+
+    Args:
+        image: PIL.Image
+        hash_size: Rows of the thumbnail, the hash has hash_size**2 bits
+
+    Returns:
+        Hash as int, see difference_hash
+    """
+    from PIL import Image
+
+    width = hash_size + 1
+    small = image.convert('L').resize((width, hash_size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    return difference_hash(pixels[row * width:(row + 1) * width] for row in range(hash_size))
+
+
+class PerceptualHashIndex:
+    """Near-duplicate lookup over dHashes, partitioned by scope key."""
+
+    def __init__(self, max_distance: int = 4, scope: str = 'tps', path: Optional[str] = None,
+                 confirm_distance: int = 10):
+        """
+        Args:
+            max_distance: Largest 64-bit dHash distance for a candidate (0-15)
+            scope: "tps" compares photos of the same TPS only, "village" of
+                the same village, "global" across the whole crawl
+            path: JSON lines file to load from and append to (optional)
+            confirm_distance: Largest 256-bit dHash distance that counts as the same photo
+        """
+        if scope not in DEDUP_SCOPES:
+            raise ValueError(f"Unknown dedup scope '{scope}', expected one of {DEDUP_SCOPES}")
+        self.max_distance = max_distance
+        self.confirm_distance = confirm_distance
+        self.scope = scope
+        self.path = path
+        bands = max_distance + 1
+        self._band_bits = 64 // bands
+        self._bands = bands
+        # (scope key, band number, band value) -> [(hash, fine hash, size, path)]
+        self._buckets: Dict[Tuple, List[Tuple[int, int, Tuple[int, int], str]]] = defaultdict(list)
+        self.size = 0
+        self.paths = set()  # stored originals (copies are never added)
+        self._file = None
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _load(self, path: str):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    key = self.scope_key(entry['village_id'], entry['tps_number'])
+                    self._insert(key, int(entry['dhash'], 16), int(entry['dhash256'], 16),
+                                 tuple(entry['size']), entry['path'])
+                except (ValueError, KeyError, TypeError):
+                    # Partial line from an interrupted run, or an entry
+                    # without the confirmation hash that can never match
+                    continue
+        logger.info(f"Loaded {self.size} photo hashes from {path}")
+
+    def scope_key(self, village_id, tps_number) -> str:
+        if self.scope == 'tps':
+            return f"{village_id}/{tps_number}"
+        return str(village_id) if self.scope == 'village' else '*'
+
+    def _band_values(self, value: int):
+        mask = (1 << self._band_bits) - 1
+        for band in range(self._bands):
+            # The last band takes the leftover high bits
+            if band == self._bands - 1:
+                yield band, value >> (band * self._band_bits)
+            else:
+                yield band, (value >> (band * self._band_bits)) & mask
+
+    def _insert(self, key: str, value: int, fine: int, size: Tuple[int, int], path: str):
+        for band, band_value in self._band_values(value):
+            self._buckets[(key, band, band_value)].append((value, fine, size, path))
+        self.paths.add(path)
+        self.size += 1
+
+    def find(self, village_id, tps_number, value: int, fine: int, size: Tuple[int, int]) -> Optional[str]:
+        """
+        Path of a stored copy of the same photo, if any.
+
+        Args:
+            village_id: Village of the photo (ignored for the global scope)
+            tps_number: TPS of the photo (only used for the tps scope)
+            value: 64-bit dHash of the photo
+            fine: 256-bit dHash of the photo (``dhash(image, 16)``)
+            size: (width, height) in pixels
+        """
+        key = self.scope_key(village_id, tps_number)
+        size = tuple(size)
+        for band, band_value in self._band_values(value):
+            for other, other_fine, other_size, path in self._buckets.get((key, band, band_value), ()):
+                if (hamming(value, other) <= self.max_distance and other_size == size
+                        and hamming(fine, other_fine) <= self.confirm_distance):
+                    return path
+        return None
+
+    def add(self, village_id, tps_number, value: int, fine: int, size: Tuple[int, int], path: str):
+        """Record a stored photo (and append it to the index file)."""
+        self._insert(self.scope_key(village_id, tps_number), value, fine, tuple(size), path)
+        if self.path:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            entry = {
+                'village_id': str(village_id), 'tps_number': str(tps_number),
+                'dhash': f'{value:016x}', 'dhash256': f'{fine:064x}',
+                'size': list(size), 'path': path,
+            }
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,6 +1,20 @@
 import logging
+import os
+import time
+
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.httpobj import urlparse_cached
 from tqdm import tqdm
+from twisted.internet import task
+
+from kawal_common.metrics import Histogram, PrometheusTextWriter
+
+from .metrics import write_atomic, write_json_atomic
+from .signals import page_rendered
+
+logger = logging.getLogger(__name__)
+
 
 class ProgressBarExtension:
     def __init__(self):
@@ -34,3 +48,176 @@ class ProgressBarExtension:
     def spider_closed(self, spider):
         if self.pbar:
             self.pbar.close()
+
+
+class MetricsExtension:
+    """
+    Collects crawl metrics and periodically exports them as a Prometheus
+    textfile plus a JSON snapshot, so node-exporter can scrape long crawls.
+    """
+
+    def __init__(self, crawler, interval, output_dir, prom_file, json_file):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.interval = interval
+        self.prom_path = os.path.join(output_dir, prom_file)
+        self.json_path = os.path.join(output_dir, json_file)
+
+        self.latency = {}  # host -> Histogram
+        self.render_time = Histogram()
+        self.responses = 0
+        self.pages = 0
+        self.images = 0
+        self.bytes = 0
+        self.start_time = None
+        self.task = None
+
+        # Previous sample for rate computation
+        self._last_sample = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('METRICS_ENABLED'):
+            raise NotConfigured
+
+        output_dir = settings.get('METRICS_DIR') or settings.get('IMAGES_STORE') or '.'
+        ext = cls(
+            crawler,
+            interval=settings.getfloat('METRICS_INTERVAL', 30.0),
+            output_dir=output_dir,
+            prom_file=settings.get('METRICS_PROM_FILE', 'kawal_scraper.prom'),
+            json_file=settings.get('METRICS_JSON_FILE', 'kawal_scraper_metrics.json'),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(ext.request_left_downloader, signal=signals.request_left_downloader)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.page_rendered, signal=page_rendered)
+        return ext
+
+    def spider_opened(self, spider):
+        self.start_time = time.monotonic()
+        self._last_sample = (self.start_time, 0, 0)
+        self.task = task.LoopingCall(self.export)
+        self.task.start(self.interval, now=False)
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        self.export()
+
+    def request_reached_downloader(self, request, spider):
+        request.meta['metrics_start'] = time.monotonic()
+
+    def request_left_downloader(self, request, spider):
+        started = request.meta.pop('metrics_start', None)
+        if started is None:
+            return
+        host = urlparse_cached(request).hostname or 'unknown'
+        hist = self.latency.get(host)
+        if hist is None:
+            hist = self.latency[host] = Histogram()
+        hist.observe(time.monotonic() - started)
+
+    def response_received(self, response, request, spider):
+        self.responses += 1
+        self.bytes += len(response.body)
+        if 'village_id' in request.meta:
+            self.pages += 1
+        elif response.status == 200:
+            self.images += 1
+
+    def page_rendered(self, response, render_time, spider):
+        self.render_time.observe(render_time)
+
+    def _queue_depth(self):
+        enqueued = self.stats.get_value('scheduler/enqueued', 0)
+        dequeued = self.stats.get_value('scheduler/dequeued', 0)
+        return max(0, enqueued - dequeued)
+
+    def _open_pages(self):
+        opened = self.stats.get_value('playwright/page_count', 0)
+        closed = self.stats.get_value('playwright/page_count/closed', 0)
+        return max(0, opened - closed)
+
+    def snapshot(self):
+        """Build a dict with all current metric values."""
+        now = time.monotonic()
+        elapsed = now - self.start_time if self.start_time else 0.0
+
+        # Rates over the last export interval, not the whole crawl
+        last_time, last_images, last_bytes = self._last_sample or (now, 0, 0)
+        window = max(now - last_time, 1e-9)
+        images_per_second = (self.images - last_images) / window
+        bytes_per_second = (self.bytes - last_bytes) / window
+        self._last_sample = (now, self.images, self.bytes)
+
+        backpressure = getattr(self.crawler.spider, 'backpressure', None)
+
+        return {
+            'timestamp': time.time(),
+            'elapsed_seconds': round(elapsed, 3),
+            'responses_total': self.responses,
+            'pages_total': self.pages,
+            'images_total': self.images,
+            'bytes_total': self.bytes,
+            'images_per_second': round(images_per_second, 3),
+            'bytes_per_second': round(bytes_per_second, 3),
+            'retries_total': self.stats.get_value('retry/count', 0),
+            'backoff_circuit_opened_total': self.stats.get_value('backoff/circuit_opened', 0),
+            'dead_letters_total': (self.stats.get_value('dead_letter/village', 0)
+                                   + self.stats.get_value('dead_letter/image', 0)),
+            'queue_depth': self._queue_depth(),
+            'browser_pages_open': self._open_pages(),
+            'browser_pages_total': self.stats.get_value('playwright/page_count', 0),
+            'process_rss_bytes': self.stats.get_value('watchdog/rss_bytes', 0),
+            'browser_restarts_total': self.stats.get_value('browser/restarts', 0),
+            'asset_cache_hits_total': self.stats.get_value('asset_cache/hit', 0),
+            'asset_cache_misses_total': self.stats.get_value('asset_cache/miss', 0),
+            'dedup_duplicates_total': self.stats.get_value('dedup/duplicates', 0),
+            'dedup_bytes_saved_total': self.stats.get_value('dedup/bytes_saved', 0),
+            'inflight_villages': backpressure.inflight_villages if backpressure else 0,
+            'pending_media': backpressure.pending_media if backpressure else 0,
+            'page_render_seconds': self.render_time.to_dict(),
+            'request_latency_seconds': {
+                host: hist.to_dict() for host, hist in sorted(self.latency.items())
+            },
+        }
+
+    def render_prometheus(self, snap):
+        writer = PrometheusTextWriter()
+        writer.gauge('elapsed_seconds', 'Seconds since the spider was opened.', snap['elapsed_seconds'])
+        writer.counter('responses_total', 'Responses received.', snap['responses_total'])
+        writer.counter('pages_total', 'Village pages rendered by Playwright.', snap['pages_total'])
+        writer.counter('images_total', 'Images downloaded.', snap['images_total'])
+        writer.counter('bytes_total', 'Response body bytes received.', snap['bytes_total'])
+        writer.gauge('images_per_second', 'Image download rate over the last interval.', snap['images_per_second'])
+        writer.gauge('bytes_per_second', 'Download throughput over the last interval.', snap['bytes_per_second'])
+        writer.counter('retries_total', 'Requests retried by RetryMiddleware.', snap['retries_total'])
+        writer.counter('backoff_circuit_opened_total', 'Times a host circuit breaker opened.', snap['backoff_circuit_opened_total'])
+        writer.counter('dead_letters_total', 'Villages and images written to the dead-letter file.', snap['dead_letters_total'])
+        writer.gauge('queue_depth', 'Requests waiting in the scheduler.', snap['queue_depth'])
+        writer.gauge('browser_pages_open', 'Playwright pages currently open.', snap['browser_pages_open'])
+        writer.gauge('process_rss_bytes', 'RSS of scrapy, playwright and chromium combined.', snap['process_rss_bytes'])
+        writer.counter('browser_restarts_total', 'Browser restarts triggered by the RSS watchdog.', snap['browser_restarts_total'])
+        writer.counter('asset_cache_hits_total', 'SPA assets served from the profile asset cache.', snap['asset_cache_hits_total'])
+        writer.counter('asset_cache_misses_total', 'SPA assets fetched from the network.', snap['asset_cache_misses_total'])
+        writer.counter('dedup_duplicates_total', 'Near-identical photos not stored again.', snap['dedup_duplicates_total'])
+        writer.counter('dedup_bytes_saved_total', 'Bytes of near-identical photos not stored.', snap['dedup_bytes_saved_total'])
+        writer.gauge('inflight_villages', 'Village pages being rendered or parsed.', snap['inflight_villages'])
+        writer.gauge('pending_media', 'Images queued for download but not yet stored.', snap['pending_media'])
+        writer.histograms('page_render_seconds', 'Time spent rendering a village page.',
+                          {self.crawler.spidercls.name: self.render_time}, label='spider')
+        writer.histograms('request_latency_seconds', 'Download latency per host.',
+                          self.latency, label='host')
+        return writer.render()
+
+    def export(self):
+        try:
+            snap = self.snapshot()
+            write_atomic(self.prom_path, self.render_prometheus(snap))
+            write_json_atomic(self.json_path, snap)
+        except OSError as e:
+            logger.warning(f"Failed to write crawl metrics: {e}")
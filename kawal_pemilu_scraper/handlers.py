@@ -0,0 +1,181 @@
+"""
+Playwright download handler with a persistent cache for SPA assets.
+
+scrapy-playwright routes every browser request through ``page.route`` to
+apply Scrapy headers. Playwright disables Chromium's HTTP cache while
+routing is active. So a persistent profile alone still re-downloads the
+kawalpemilu.org Angular bundles for every page. This handler serves
+scripts, stylesheets, fonts and static data bundles from an on-disk cache
+inside the profile directory instead. The cache is shared by all pages and
+kept across crawl runs.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+from scrapy import signals
+from scrapy_playwright.handler import ScrapyPlaywrightDownloadHandler
+
+logger = logging.getLogger(__name__)
+
+# Angular build output carries a content hash in the file name
+# (e.g. main.3f2a9c1b7e.js), such files never change.
+HASHED_ASSET_RE = re.compile(r'[.-][0-9a-f]{8,}\.(?:js|css|woff2?|ttf)(?:$|\?)')
+
+# Bodies are stored decoded, these headers would no longer be true
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+
+def _clean_headers(headers: dict) -> dict:
+    return {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS}
+
+
+class AssetCache:
+    """On-disk cache of static browser assets keyed by URL."""
+
+    def __init__(self, cache_dir: str, resource_types, url_patterns=(), ttl: int = 86400,
+                 stats=None):
+        """
+        Initialize asset cache.
+
+        Args:
+            cache_dir: Directory to keep cached bodies and headers in
+            resource_types: Playwright resource types to cache (e.g. 'script')
+            url_patterns: Extra URL regexes to cache regardless of resource type
+            ttl: Seconds before an entry without a content hash is refetched
+            stats: Scrapy stats collector
+        """
+        self.cache_dir = cache_dir
+        self.resource_types = set(resource_types)
+        self.url_patterns = [re.compile(p) for p in url_patterns]
+        self.ttl = ttl
+        self.stats = stats
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def is_cacheable(self, playwright_request) -> bool:
+        if playwright_request.method != 'GET' or playwright_request.is_navigation_request():
+            return False
+        if playwright_request.resource_type in self.resource_types:
+            return True
+        return any(p.search(playwright_request.url) for p in self.url_patterns)
+
+    def _paths(self, url: str):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return f"{base}.json", f"{base}.body"
+
+    def get(self, url: str):
+        """Return ``(meta, body)`` for a fresh entry, or None."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if not HASHED_ASSET_RE.search(url) and time.time() - meta['stored_at'] > self.ttl:
+                return None
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        return meta, body
+
+    def put(self, url: str, status: int, headers: dict, body: bytes):
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {'url': url, 'status': status, 'headers': headers, 'stored_at': time.time()}
+
+        # Body first, so a crash never leaves metadata pointing at nothing
+        for path, mode, data in ((body_path, 'wb', body),
+                                 (meta_path, 'w', json.dumps(meta))):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def record(self, outcome: str, resource_type: str, size: int = 0):
+        if not self.stats:
+            return
+        self.stats.inc_value(f'asset_cache/{outcome}')
+        self.stats.inc_value(f'asset_cache/{outcome}/{resource_type}')
+        if outcome == 'hit':
+            self.stats.inc_value('asset_cache/bytes_served', size)
+
+
+class CachingPlaywrightDownloadHandler(ScrapyPlaywrightDownloadHandler):
+    """
+    ScrapyPlaywrightDownloadHandler that fulfills static assets from AssetCache.
+
+    Enabled when PLAYWRIGHT_PROFILE_DIR is set. Otherwise it behaves exactly
+    like the stock handler.
+    """
+
+    def __init__(self, crawler):
+        super().__init__(crawler)
+        settings = crawler.settings
+        self.asset_cache = None
+
+        profile_dir = settings.get('PLAYWRIGHT_PROFILE_DIR')
+        enabled = profile_dir and settings.getbool('PLAYWRIGHT_ASSET_CACHE_ENABLED', True)
+        # _make_request_handler is scrapy-playwright internals (pinned in setup.py)
+        if enabled and not hasattr(ScrapyPlaywrightDownloadHandler, '_make_request_handler'):
+            logger.warning("Asset cache disabled: this scrapy-playwright version has no _make_request_handler")
+            enabled = False
+        if enabled:
+            self.asset_cache = AssetCache(
+                os.path.join(profile_dir, 'asset-cache'),
+                resource_types=settings.getlist('PLAYWRIGHT_ASSET_CACHE_TYPES'),
+                url_patterns=settings.getlist('PLAYWRIGHT_ASSET_CACHE_PATTERNS'),
+                ttl=settings.getint('PLAYWRIGHT_ASSET_CACHE_TTL', 86400),
+                stats=crawler.stats,
+            )
+            crawler.signals.connect(self._report_cache_stats, signal=signals.spider_closed)
+
+    def _make_request_handler(self, *args, **kwargs):
+        handler = super()._make_request_handler(*args, **kwargs)
+        cache = self.asset_cache
+        if cache is None:
+            return handler
+
+        async def _caching_request_handler(route, playwright_request):
+            if not cache.is_cacheable(playwright_request):
+                return await handler(route, playwright_request)
+
+            url = playwright_request.url
+            resource_type = playwright_request.resource_type
+            cached = cache.get(url)
+            if cached is not None:
+                meta, body = cached
+                cache.record('hit', resource_type, len(body))
+                await route.fulfill(status=meta['status'], headers=meta['headers'], body=body)
+                return
+
+            try:
+                response = await route.fetch()
+                body = await response.body()
+            except Exception as e:
+                logger.debug(f"Asset fetch failed for {url}: {e}")
+                return await handler(route, playwright_request)
+
+            cache.record('miss', resource_type)
+            headers = _clean_headers(response.headers)
+            if response.status == 200:
+                cache.put(url, response.status, headers, body)
+            await route.fulfill(status=response.status, headers=headers, body=body)
+
+        return _caching_request_handler
+
+    def _report_cache_stats(self, spider, reason):
+        stats = self.stats
+        hits = stats.get_value('asset_cache/hit', 0)
+        misses = stats.get_value('asset_cache/miss', 0)
+        total = hits + misses
+        if total == 0:
+            return
+        served = stats.get_value('asset_cache/bytes_served', 0)
+        logger.info(
+            f"Asset cache: {hits}/{total} hits ({hits / total * 100:.1f}%), "
+            f"{served / 1024 / 1024:.1f} MB served from disk"
+        )
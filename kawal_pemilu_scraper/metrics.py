@@ -0,0 +1,25 @@
+"""Atomic metric file writers used by the crawl extensions."""
+
+import json
+import os
+
+
+def write_atomic(path: str, content: str):
+    """
+    Write file atomically so readers never see a partial document.
+
+    The node-exporter textfile collector may read the file at any moment,
+    hence the write-to-temp-then-rename dance.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(path: str, data: dict):
+    """Write JSON snapshot atomically."""
+    write_atomic(path, json.dumps(data, indent=2, sort_keys=True))
@@ -3,7 +3,13 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import time
+
 from scrapy import signals
+from scrapy.exceptions import DontCloseSpider, IgnoreRequest, NotConfigured
+from scrapy.http.request import NO_CALLBACK
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet import reactor
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
@@ -98,3 +104,152 @@ class KawalPemiluScraperDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class HostBackedOff(IgnoreRequest):
+    """
+    Request not sent because its host is backing off.
+
+    ``delay`` is the number of seconds until the host is due again.
+    Spider requests have already been rescheduled by HostBackoffMiddleware.
+    Media pipeline downloads are retried by the pipeline.
+    """
+
+    def __init__(self, delay: float):
+        super().__init__(f"Host backing off, retry in {delay:.1f}s")
+        self.delay = delay
+
+
+class HostBackoffMiddleware:
+    """
+    Per-host exponential backoff with a circuit breaker.
+
+    Each 429/5xx response (or download error) from a host raises that
+    host's delay: BACKOFF_BASE_DELAY * 2^(failures - 1), capped at
+    BACKOFF_MAX_DELAY, or the Retry-After header if larger. After
+    CIRCUIT_BREAKER_THRESHOLD consecutive failures the circuit opens for
+    CIRCUIT_BREAKER_COOLDOWN seconds. After the cooldown it is half-open:
+    a single probe request goes out, and its outcome closes the circuit or
+    opens it for another cooldown. A successful response resets the host.
+
+    Requests are never held while a host is backing off, that would take
+    up the downloader's concurrency. Instead the middleware raises
+    HostBackedOff. A spider request is put back into the scheduler once
+    the host is due. A media pipeline download fails with it, and
+    CustomImagesPipeline downloads it again after the delay. Retries are
+    still done by RetryMiddleware; this middleware only decides when they
+    go out.
+    """
+
+    def __init__(self, settings, stats, crawler=None):
+        self.codes = {int(code) for code in settings.getlist('BACKOFF_HTTP_CODES', [429, 500, 502, 503, 504])}
+        self.base_delay = settings.getfloat('BACKOFF_BASE_DELAY', 2.0)
+        self.max_delay = settings.getfloat('BACKOFF_MAX_DELAY', 120.0)
+        self.threshold = settings.getint('CIRCUIT_BREAKER_THRESHOLD', 5)
+        self.cooldown = settings.getfloat('CIRCUIT_BREAKER_COOLDOWN', 300.0)
+        self.stats = stats
+        self.crawler = crawler
+        # host -> {'failures': int, 'not_before': monotonic time,
+        #          'circuit': 'closed' | 'open' | 'half_open', 'probe': request, 'probe_sent': time}
+        self.hosts = {}
+        self.waiting = 0  # spider requests waiting to be rescheduled
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('BACKOFF_ENABLED'):
+            raise NotConfigured
+        mw = cls(crawler.settings, crawler.stats, crawler)
+        crawler.signals.connect(mw.spider_idle, signal=signals.spider_idle)
+        return mw
+
+    def spider_idle(self, spider):
+        # Rescheduled requests are not in the scheduler until they are due
+        if self.waiting:
+            raise DontCloseSpider
+
+    def _state(self, request):
+        host = urlparse_cached(request).hostname or ''
+        state = self.hosts.setdefault(host, {'failures': 0, 'not_before': 0.0, 'circuit': 'closed',
+                                             'probe': None, 'probe_sent': 0.0})
+        return host, state
+
+    def process_request(self, request, spider):
+        host, state = self._state(request)
+        now = time.monotonic()
+
+        if state['circuit'] != 'closed' and now >= state['not_before']:
+            # Half-open: let one probe through, unless one is still out
+            # (a probe that never got an answer is replaced after a cooldown)
+            if state['probe'] is None or now - state['probe_sent'] > self.cooldown:
+                state.update(circuit='half_open', probe=request, probe_sent=now)
+                self.stats.inc_value('backoff/probes')
+                spider.logger.info(f"Circuit half-open for {host}, sending probe {request.url}")
+                return None
+            if state['probe'] is not request:
+                self._reschedule(request, spider, self.base_delay)
+            return None
+
+        wait = state['not_before'] - now
+        if wait > 0:
+            self._reschedule(request, spider, wait)
+        return None
+
+    def _reschedule(self, request, spider, delay):
+        self.stats.inc_value('backoff/rescheduled_requests')
+        if request.callback is not NO_CALLBACK and self.crawler is not None:
+            self.waiting += 1
+            reactor.callLater(delay, self._crawl, request.replace(dont_filter=True), spider)
+        raise HostBackedOff(delay)
+
+    def _crawl(self, request, spider):
+        self.waiting -= 1
+        try:
+            self.crawler.engine.crawl(request)
+        except Exception as e:
+            # Engine already stopped (spider closed while waiting)
+            spider.logger.debug(f"Dropped rescheduled {request.url}: {e}")
+
+    def process_response(self, request, response, spider):
+        host, state = self._state(request)
+        if response.status in self.codes:
+            self._record_failure(host, state, spider, response.headers.get(b'Retry-After'))
+        elif response.status < 400 or state['probe'] is request:
+            # Any answer other than a backoff code means the host is back
+            if state['circuit'] != 'closed':
+                spider.logger.info(f"Circuit closed for {host}")
+            state.update(failures=0, circuit='closed', probe=None)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        if isinstance(exception, HostBackedOff):
+            return None
+        host, state = self._state(request)
+        self._record_failure(host, state, spider)
+        return None
+
+    def _record_failure(self, host, state, spider, retry_after=None):
+        state['failures'] += 1
+        failures = state['failures']
+        self.stats.inc_value('backoff/failures')
+
+        if failures >= self.threshold:
+            delay = self.cooldown
+            if state['circuit'] == 'half_open':
+                spider.logger.warning(f"Probe to {host} failed, pausing another {self.cooldown:.0f}s")
+            elif state['circuit'] == 'closed':
+                self.stats.inc_value('backoff/circuit_opened')
+                spider.logger.warning(
+                    f"Circuit open for {host} after {failures} failures, "
+                    f"pausing {self.cooldown:.0f}s"
+                )
+            state.update(circuit='open', probe=None)
+        else:
+            delay = min(self.base_delay * 2 ** (failures - 1), self.max_delay)
+
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+
+        state['not_before'] = max(state['not_before'], time.monotonic() + delay)
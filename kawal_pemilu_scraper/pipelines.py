@@ -1,15 +1,218 @@
+from scrapy.pipelines.files import FSFilesStore
 from scrapy.pipelines.images import ImagesPipeline
 import scrapy
 import hashlib
+import json
+import logging
+import os
+import time
+import weakref
+
+from twisted.internet import reactor
+from twisted.internet.task import deferLater
+
+from .dedup import DEDUP_MODES, PerceptualHashIndex, dhash
+from .middlewares import HostBackedOff
+from .storage import ShardedTarFilesStore
+
+logger = logging.getLogger(__name__)
 
 class CustomImagesPipeline(ImagesPipeline):
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipe = super().from_crawler(crawler)
+        settings = crawler.settings
+        
+        # Append photos to per-district tar shards instead of one file each
+        # (see storage.py). IMAGES_STORE stays a plain directory.
+        if settings.getbool('IMAGES_ARCHIVE_ENABLED'):
+            pipe.store = ShardedTarFilesStore(
+                settings.get('IMAGES_STORE'),
+                max_shard_mb=settings.getint('IMAGES_ARCHIVE_MAX_SHARD_MB', 1024)
+            )
+        
+        # Near-identical photos under different URLs are stored once (see dedup.py)
+        pipe.stats = crawler.stats
+        pipe.dedup_mode = settings.get('IMAGES_DEDUP_MODE', 'off')
+        if pipe.dedup_mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown IMAGES_DEDUP_MODE '{pipe.dedup_mode}', expected one of {DEDUP_MODES}")
+        pipe.dedup = None
+        pipe._duplicates = {}  # stored path -> (original path, hard linked)
+        if pipe.dedup_mode != 'off':
+            index_file = settings.get('IMAGES_DEDUP_INDEX_FILE')
+            pipe.dedup = PerceptualHashIndex(
+                max_distance=settings.getint('IMAGES_DEDUP_MAX_DISTANCE', 4),
+                scope=settings.get('IMAGES_DEDUP_SCOPE', 'tps'),
+                path=os.path.join(settings.get('IMAGES_STORE'), index_file) if index_file else None,
+                confirm_distance=settings.getint('IMAGES_DEDUP_CONFIRM_DISTANCE', 10)
+            )
+        
+        # Items of pending downloads, for downloading again after a host backoff
+        pipe._media_items = weakref.WeakKeyDictionary()
+        
+        # One JSON line per photo of the crawl, followed by the streaming
+        # extractor (jumlah_suara_extractor/services/stream_service.py)
+        pipe.stored_log_path = None
+        pipe._stored_log = None
+        stored_log = settings.get('IMAGES_STORED_LOG')
+        if stored_log:
+            if isinstance(pipe.store, FSFilesStore):
+                pipe.stored_log_path = os.path.join(settings.get('IMAGES_STORE'), stored_log)
+            else:
+                logger.warning("IMAGES_STORED_LOG needs loose files, ignored with IMAGES_ARCHIVE_ENABLED")
+        return pipe
+    
+    def close_spider(self, spider):
+        close = getattr(self.store, 'close', None)
+        if close:
+            close()
+        if self._stored_log is not None:
+            self._stored_log.close()
+        if self.dedup is not None:
+            self.dedup.close()
+            duplicates = self.stats.get_value('dedup/duplicates', 0)
+            if duplicates:
+                saved_mb = self.stats.get_value('dedup/bytes_saved', 0) / (1024 * 1024)
+                logger.warning(f"Dedup: {duplicates} near-identical photos not stored again, {saved_mb:.1f} MB saved")
+    
+    def get_images(self, response, request, info, *, item=None):
+        images = super().get_images(response, request, info, item=item)
+        if self.dedup is None or item is None:
+            yield from images
+            return
+        
+        # The first image is the full photo, the rest are thumbnails of it
+        for i, (path, image, buf) in enumerate(images):
+            if i == 0:
+                village_id, tps_number = item['village_id'], item['tps_number']
+                value, fine = dhash(image), dhash(image, 16)
+                original = self.dedup.find(village_id, tps_number, value, fine, image.size)
+                if original is not None:
+                    self._store_duplicate(original, path, buf)
+                    return
+                self.dedup.add(village_id, tps_number, value, fine, image.size, path)
+            yield path, image, buf
+    
+    def _store_duplicate(self, original: str, path: str, buf):
+        self.stats.inc_value('dedup/duplicates')
+        self.stats.inc_value('dedup/bytes_saved', buf.getbuffer().nbytes)
+        logger.debug(f"{path} is a near-duplicate of {original}")
+        
+        # Hard link so the file exists at its own name without using space;
+        # only possible for plain files (tar shards have no links)
+        linked = False
+        if self.dedup_mode == 'link' and isinstance(self.store, FSFilesStore):
+            source = os.path.join(self.store.basedir, original)
+            target = os.path.join(self.store.basedir, path)
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.link(source, target)
+                self.stats.inc_value('dedup/linked')
+                linked = True
+            except OSError as e:
+                logger.debug(f"Linking {path} to {original} failed: {e}")
+        self._duplicates[path] = (original, linked)
+    
+    def _mark_duplicates(self, results, item):
+        """
+        Keep skipped duplicates out of the item's images, they have no file.
+        
+        Their URLs are listed under ``duplicate_images`` with the stored
+        photo they match. Hard-linked copies stay, with ``duplicate_of`` set.
+        """
+        kept = []
+        for ok, value in results:
+            duplicate = self._duplicates.pop(value['path'], None) if ok else None
+            if duplicate is None:
+                kept.append((ok, value))
+                continue
+            original, linked = duplicate
+            if linked:
+                kept.append((ok, {**value, 'duplicate_of': original}))
+            else:
+                item.setdefault('duplicate_images', []).append({'url': value['url'], 'duplicate_of': original})
+        return kept
+    
     def get_media_requests(self, item, info):
-        for image_url in item.get('image_urls', []):
-            yield scrapy.Request(image_url, meta={'item': item})
+        image_urls = item.get('image_urls', [])
+        
+        # Report pending images so the spider can hold back new page renders
+        backpressure = getattr(info.spider, 'backpressure', None)
+        if backpressure:
+            backpressure.media_enqueued(len(image_urls))
+        
+        # The item is passed to file_path() by Scrapy, no need to keep a
+        # reference to it in every request's meta
+        for image_url in image_urls:
+            yield scrapy.Request(image_url)
 
-    def file_path(self, request, response=None, info=None, *, item=None):
-        item = request.meta['item']
+    def media_to_download(self, request, info, *, item=None):
+        self._media_items[request] = item
+        return super().media_to_download(request, info, item=item)
+    
+    def media_failed(self, failure, request, info):
+        # Not sent, the host is backing off (HostBackoffMiddleware). This
+        # download can't go back to the scheduler, so send it again here.
+        if failure.check(HostBackedOff):
+            return deferLater(reactor, failure.value.delay, self._download_again, request, info)
+        return super().media_failed(failure, request, info)
+    
+    def _download_again(self, request, info):
+        dfd = self.crawler.engine.download(request)
+        dfd.addCallbacks(
+            callback=self.media_downloaded, callbackArgs=(request, info),
+            callbackKeywords={'item': self._media_items.get(request)},
+            errback=self.media_failed, errbackArgs=(request, info)
+        )
+        return dfd
+
+    def item_completed(self, results, item, info):
+        backpressure = getattr(info.spider, 'backpressure', None)
+        if backpressure:
+            backpressure.media_completed(len(results))
+        
+        # Images that still failed after RetryMiddleware go to the dead-letter file
+        dead_letter = getattr(info.spider, 'dead_letter', None)
+        if dead_letter:
+            for url, (ok, value) in zip(item.get('image_urls', []), results):
+                if not ok:
+                    dead_letter.image_failed(url, item, str(value.value))
         
+        if self.dedup is not None:
+            results = self._mark_duplicates(results, item)
+        if self.stored_log_path:
+            self._log_stored(results)
+        return super().item_completed(results, item, info)
+    
+    def _log_stored(self, results):
+        if self._stored_log is None:
+            os.makedirs(os.path.dirname(self.stored_log_path) or '.', exist_ok=True)
+            self._stored_log = open(self.stored_log_path, 'a', encoding='utf-8')
+        for ok, value in results:
+            # Hard-linked dedup copies are the same photo as one already logged
+            if not ok or value.get('duplicate_of') or self._is_dedup_link(value):
+                continue
+            # Photos already on disk from an earlier run ('uptodate') are
+            # logged too: this crawl's extraction has not seen them
+            if not os.path.exists(os.path.join(self.store.basedir, value['path'])):
+                continue
+            entry = {'path': value['path'], 'stored_at': time.time(), 'status': value.get('status')}
+            self._stored_log.write(json.dumps(entry) + '\n')
+        self._stored_log.flush()
+    
+    def _is_dedup_link(self, value) -> bool:
+        # A link made by an earlier run comes back as 'uptodate' without
+        # duplicate_of: a file with other links that the index doesn't
+        # know as an original
+        if self.dedup is None or value.get('status') != 'uptodate':
+            return False
+        try:
+            links = os.stat(os.path.join(self.store.basedir, value['path'])).st_nlink
+        except OSError:
+            return False
+        return links > 1 and value['path'] not in self.dedup.paths
+
+    def file_path(self, request, response=None, info=None, *, item=None):
         province = item['province_name']
         regency = item['regency_name']
         district = item['district_name']
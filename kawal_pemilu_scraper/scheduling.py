@@ -0,0 +1,98 @@
+"""
+Backpressure between village page renders and image downloads.
+
+Village pages fan out into many image requests. Image requests are sent
+straight to the downloader by the media pipeline, so they skip the scheduler
+and cannot be prioritised there. We give them priority a different way: the
+spider does not issue a new page request while too many villages are in
+flight, or while too many images are still pending. Memory stays bounded by
+these two caps instead of growing with the size of the regency.
+"""
+
+import asyncio
+import logging
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlBackpressure:
+    """
+    Tracks in-flight villages and pending media, and gates page requests.
+
+    Installed as an extension. On ``spider_opened`` it attaches itself to the
+    spider as ``spider.backpressure`` so the spider and the images pipeline
+    can report progress without importing each other.
+    """
+
+    def __init__(self, stats, max_villages, max_pending_media, poll_interval):
+        self.stats = stats
+        self.max_villages = max_villages
+        self.max_pending_media = max_pending_media
+        self.poll_interval = poll_interval
+
+        self.inflight_villages = 0
+        self.pending_media = 0
+        self.paused = False  # external hold, e.g. while the browser restarts
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('BACKPRESSURE_ENABLED'):
+            raise NotConfigured
+
+        ext = cls(
+            crawler.stats,
+            max_villages=settings.getint('BACKPRESSURE_MAX_VILLAGES', 4),
+            max_pending_media=settings.getint('BACKPRESSURE_MAX_PENDING_MEDIA', 200),
+            poll_interval=settings.getfloat('BACKPRESSURE_POLL_INTERVAL', 0.5),
+        )
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.request_dropped, signal=signals.request_dropped)
+        return ext
+
+    def spider_opened(self, spider):
+        spider.backpressure = self
+
+    def request_dropped(self, request, spider):
+        # Filtered page requests (e.g. duplicate village IDs) never reach the
+        # callback, release their slot here.
+        if 'village_id' in request.meta:
+            self.village_finished()
+
+    def has_capacity(self) -> bool:
+        """Whether a new page request may be issued now."""
+        if self.paused:
+            return False
+        if self.inflight_villages >= self.max_villages:
+            return False
+        return self.pending_media < self.max_pending_media
+
+    async def wait_for_capacity(self):
+        """Sleep until a new page request may be issued."""
+        waited = False
+        while not self.has_capacity():
+            if not waited:
+                self.stats.inc_value('backpressure/waits')
+                logger.debug(
+                    f"Backpressure: {self.inflight_villages} villages in flight, "
+                    f"{self.pending_media} images pending - holding page requests"
+                )
+                waited = True
+            await asyncio.sleep(self.poll_interval)
+
+    def village_started(self):
+        self.inflight_villages += 1
+        self.stats.max_value('backpressure/max_inflight_villages', self.inflight_villages)
+
+    def village_finished(self):
+        self.inflight_villages = max(0, self.inflight_villages - 1)
+
+    def media_enqueued(self, count: int):
+        self.pending_media += count
+        self.stats.max_value('backpressure/max_pending_media', self.pending_media)
+
+    def media_completed(self, count: int):
+        self.pending_media = max(0, self.pending_media - count)
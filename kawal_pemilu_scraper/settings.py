@@ -91,6 +91,25 @@ ITEM_PIPELINES = {
 }
 IMAGES_STORE = 'output'
 
+# Store photos in per-district tar shards with an index sidecar instead of
+# one file per photo (see storage.py). Readable by the extractor directly.
+IMAGES_ARCHIVE_ENABLED = False
+IMAGES_ARCHIVE_MAX_SHARD_MB = 1024
+
+# Store near-identical photos (same picture under another URL) only once,
+# by perceptual hash (see dedup.py). 'skip' drops the copy, 'link' hard
+# links it to the stored photo (loose files only), 'off' stores everything.
+IMAGES_DEDUP_MODE = 'off'
+IMAGES_DEDUP_SCOPE = 'tps'               # or 'village' / 'global': compare across TPS
+IMAGES_DEDUP_MAX_DISTANCE = 4            # 64-bit dHash bits that may differ (candidate)
+IMAGES_DEDUP_CONFIRM_DISTANCE = 10       # 256-bit dHash bits that may differ (same size required)
+IMAGES_DEDUP_INDEX_FILE = 'dedup_index.jsonl'  # inside IMAGES_STORE, kept across runs
+
+# Append {"path": ..., "stored_at": ..., "status": ...} for every photo of the crawl
+# (newly stored or already on disk) to this file inside IMAGES_STORE, so extraction
+# can start while the crawl is running (CLI streaming mode). Loose files only. None = off.
+IMAGES_STORED_LOG = None
+
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -117,10 +136,17 @@ IMAGES_STORE = 'output'
 FEED_EXPORT_ENCODING = "utf-8"
 
 DOWNLOAD_HANDLERS = {
-    "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
-    "https": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
+    "http": "kawal_pemilu_scraper.handlers.CachingPlaywrightDownloadHandler",
+    "https": "kawal_pemilu_scraper.handlers.CachingPlaywrightDownloadHandler",
 }
 
+# Site endpoints. Point these at a local stand-in to benchmark offline
+# (see kawal_pemilu_scraper/benchmarks/fake_server.py).
+KAWAL_BASE_URL = 'https://kawalpemilu.org'
+KAWAL_ROI_URL_PREFIX = 'https://storage.googleapis.com'
+# Time given to the SPA to render TPS rows after app-root appears
+KAWAL_RENDER_WAIT_MS = 3000
+
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 
 PLAYWRIGHT_LAUNCH_OPTIONS = {
@@ -130,12 +156,72 @@ PLAYWRIGHT_LAUNCH_OPTIONS = {
 
 PLAYWRIGHT_DEFAULT_NAVIGATION_TIMEOUT = 30000
 
+# Retire each browser context after this many village pages (0 = never).
+# Retired contexts are closed once their last page finishes (see browser.py).
+PLAYWRIGHT_RECYCLE_PAGES = 50
+# Relaunch the browser after BrowserWatchdog closes it
+PLAYWRIGHT_RESTART_DISCONNECTED_BROWSER = True
+
+# Persistent browser profile (e.g. '.browser_profile'). When set, pages run in
+# persistent contexts under this directory and SPA assets are served from an
+# on-disk cache kept across pages and crawl runs (see handlers.py).
+PLAYWRIGHT_PROFILE_DIR = None
+PLAYWRIGHT_ASSET_CACHE_ENABLED = True
+PLAYWRIGHT_ASSET_CACHE_TYPES = ['script', 'stylesheet', 'font']
+PLAYWRIGHT_ASSET_CACHE_PATTERNS = [r'^https://kawalpemilu\.org/.*\.json(\?|$)']
+PLAYWRIGHT_ASSET_CACHE_TTL = 86400  # seconds, for assets without a content hash
+
 ROBOTSTXT_OBEY = False
 # LOG_LEVEL = 'INFO'
 LOG_LEVEL = 'WARNING' # Reduce log noise for progress bar
 
 EXTENSIONS = {
     'kawal_pemilu_scraper.extensions.ProgressBarExtension': 500,
+    'kawal_pemilu_scraper.extensions.MetricsExtension': 510,
+    'kawal_pemilu_scraper.scheduling.CrawlBackpressure': 520,
+    'kawal_pemilu_scraper.browser.BrowserWatchdog': 530,
+    'kawal_pemilu_scraper.deadletter.DeadLetterLog': 540,
+}
+
+# Backpressure between page renders and image downloads (see scheduling.py).
+# New village pages are held back while either limit is reached, so memory
+# stays flat regardless of regency size.
+BACKPRESSURE_ENABLED = True
+BACKPRESSURE_MAX_VILLAGES = 4          # villages rendered/being parsed at once
+BACKPRESSURE_MAX_PENDING_MEDIA = 200   # images queued but not yet stored
+BACKPRESSURE_POLL_INTERVAL = 0.5       # seconds
+
+# RSS watchdog for the whole process tree (scrapy + playwright + chromium).
+# Above the limit, page requests are paused, in-flight villages drained and
+# the browser restarted. Samples are logged and appended to a CSV file.
+WATCHDOG_ENABLED = True
+WATCHDOG_INTERVAL = 60           # seconds between samples
+WATCHDOG_RSS_LIMIT_MB = 3072     # 0 = only log, never restart
+WATCHDOG_TRAJECTORY_FILE = 'memory_trajectory.csv'
+
+# Failure handling. RetryMiddleware retries failed page loads and images,
+# HostBackoffMiddleware spaces those retries out per host and opens a
+# circuit breaker when a host keeps failing. Whatever still fails is
+# appended to DEAD_LETTER_FILE (in IMAGES_STORE), re-run it with
+# `-a dead_letter_file=output/dead_letter.jsonl`.
+DOWNLOADER_MIDDLEWARES = {
+    'kawal_pemilu_scraper.middlewares.HostBackoffMiddleware': 560,
 }
+RETRY_TIMES = 3
+BACKOFF_ENABLED = True
+BACKOFF_HTTP_CODES = [429, 500, 502, 503, 504]
+BACKOFF_BASE_DELAY = 2       # seconds, doubled per consecutive failure
+BACKOFF_MAX_DELAY = 120
+CIRCUIT_BREAKER_THRESHOLD = 5  # consecutive failures before a host is paused
+CIRCUIT_BREAKER_COOLDOWN = 300
+DEAD_LETTER_FILE = 'dead_letter.jsonl'
+
+# Crawl metrics exported for node-exporter's textfile collector
+# (written to METRICS_DIR, defaults to IMAGES_STORE)
+METRICS_ENABLED = True
+METRICS_INTERVAL = 30  # seconds between exports
+METRICS_DIR = None
+METRICS_PROM_FILE = 'kawal_scraper.prom'
+METRICS_JSON_FILE = 'kawal_scraper_metrics.json'
 
 
@@ -0,0 +1,10 @@
+# Custom signals sent by the kawal_pemilu_scraper spider.
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/signals.html
+
+# Sent by KawalSpider once a village page has been rendered and its photo
+# list extracted from the DOM.
+# Args: response, render_time (seconds from the downloader receiving the
+# request, navigation and SPA bootstrap included), spider
+page_rendered = object()
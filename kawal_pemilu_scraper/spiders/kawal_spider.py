@@ -1,15 +1,54 @@
 import scrapy
+from scrapy import signals
+from scrapy.downloadermiddlewares.retry import get_retry_request
 import json
 import os
 import sys
-from urllib.parse import unquote
+import time
+from urllib.parse import unquote, urlparse
+
+from ..browser import ContextRecycler
+from ..deadletter import LOCATION_FIELDS, consume_dead_letters
+from ..middlewares import HostBackedOff
+from ..signals import page_rendered
 
 class KawalSpider(scrapy.Spider):
     name = "kawal_spider"
     allowed_domains = ["kawalpemilu.org", "googleusercontent.com", "lh3.googleusercontent.com", "googleapis.com", "storage.googleapis.com"]
     
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        # Allow the configured site and ROI hosts (e.g. a local stand-in server)
+        for setting in ('KAWAL_BASE_URL', 'KAWAL_ROI_URL_PREFIX'):
+            host = urlparse(crawler.settings.get(setting, '')).hostname
+            if host and host not in spider.allowed_domains:
+                spider.allowed_domains = [*spider.allowed_domains, host]
+        crawler.signals.connect(spider._stamp_render_start, signal=signals.request_reached_downloader)
+        return spider
+    
+    def _stamp_render_start(self, request, spider):
+        # Page render time starts when the downloader gets the request, so
+        # it covers Playwright navigation and the SPA bootstrap too
+        if request.meta.get('playwright'):
+            request.meta['render_start'] = time.monotonic()
+    
     async def start(self):
         """Async start method (replaces deprecated start_requests)"""
+        # Spread pages over short-lived browser contexts to bound Chromium memory
+        self.context_recycler = ContextRecycler(
+            max_pages=self.settings.getint('PLAYWRIGHT_RECYCLE_PAGES', 0),
+            stats=self.crawler.stats,
+            profile_dir=self.settings.get('PLAYWRIGHT_PROFILE_DIR'),
+            launch_options=self.settings.getdict('PLAYWRIGHT_LAUNCH_OPTIONS'),
+            crawler=self.crawler
+        )
+        
+        if hasattr(self, 'dead_letter_file'):
+            async for request_or_item in self._start_from_dead_letters():
+                yield request_or_item
+            return
+        
         if hasattr(self, 'village_ids_file'):
             with open(self.village_ids_file, 'r') as f:
                 village_ids = f.read().split(',')
@@ -26,34 +65,78 @@ class KawalSpider(scrapy.Spider):
             id2name = {}
         
         for vid in village_ids:
-            url = f"https://kawalpemilu.org/h/{vid}"
-            village_name = id2name.get(vid, vid)
-            
             # Extract district ID (first 6 digits of village ID) and get district name
             # Village ID format: 10 digits (e.g., 6104212001)
             # District ID format: 6 digits (e.g., 610421)
             district_id = vid[:6] if len(vid) == 10 else ''
-            district_name = id2name.get(district_id, self.district_name)
             
-            yield scrapy.Request(
-                url,
-                meta={
-                    "playwright": True,
-                    "playwright_include_page": True,
-                    "village_id": vid,
-                    "village_name": village_name,
-                    "district_name": district_name,
-                    "regency_name": self.regency_name,
-                    "province_name": self.province_name
-                },
-                callback=self.parse
-            )
+            yield await self._village_request({
+                "village_id": vid,
+                "village_name": id2name.get(vid, vid),
+                "district_name": id2name.get(district_id, self.district_name),
+                "regency_name": self.regency_name,
+                "province_name": self.province_name,
+                "download_type": getattr(self, 'download_type', 'regular')
+            })
+    
+    async def _start_from_dead_letters(self):
+        """Re-run only the villages and images listed in a dead-letter file."""
+        villages, images = consume_dead_letters(self.dead_letter_file)
+        self.logger.info(
+            f"Re-running {len(villages)} villages and {len(images)} images "
+            f"from {self.dead_letter_file}"
+        )
+        
+        # Failed images don't need the browser, hand them to the pipeline directly
+        grouped = {}
+        for entry in images:
+            key = (entry['village_id'], entry['tps_number'])
+            if key not in grouped:
+                grouped[key] = {field: entry.get(field) for field in LOCATION_FIELDS}
+                grouped[key].update({"tps_number": entry['tps_number'], "image_urls": []})
+            grouped[key]["image_urls"].append(entry['url'])
+        for item in grouped.values():
+            yield item
+        
+        for entry in villages:
+            location = {field: entry.get(field) for field in LOCATION_FIELDS}
+            location["download_type"] = entry.get('download_type') or getattr(self, 'download_type', 'regular')
+            yield await self._village_request(location)
+    
+    async def _village_request(self, location: dict):
+        """
+        Build the Playwright request for one village page.
+        
+        Args:
+            location: village_id, names and download_type, copied into meta
+        """
+        # Set by CrawlBackpressure (see scheduling.py) when enabled
+        backpressure = getattr(self, 'backpressure', None)
+        if backpressure:
+            # Don't render new pages while image downloads are backlogged
+            await backpressure.wait_for_capacity()
+            backpressure.village_started()
+        
+        context_name = await self.context_recycler.assign()
+        return scrapy.Request(
+            f"{self.settings.get('KAWAL_BASE_URL', 'https://kawalpemilu.org')}/h/{location['village_id']}",
+            meta={
+                "playwright": True,
+                "playwright_include_page": True,
+                "playwright_context": context_name,
+                "playwright_context_kwargs": self.context_recycler.context_kwargs(context_name),
+                **location
+            },
+            callback=self.parse,
+            errback=self.errback_village
+        )
 
 
     async def parse(self, response):
         page = response.meta["playwright_page"]
         district_name = response.meta['district_name']
         village_name = response.meta['village_name']
+        render_start = response.meta.get('render_start', time.monotonic())
         
         try:
             # Wait for the main app to load
@@ -64,10 +147,10 @@ class KawalSpider(scrapy.Spider):
                 self.logger.debug(f"app-root timeout for {district_name} > {village_name} - continuing anyway")
             
             # Wait a bit for dynamic content
-            await page.wait_for_timeout(3000)
+            await page.wait_for_timeout(self.settings.getint('KAWAL_RENDER_WAIT_MS', 3000))
             
             # Determine download type (default to regular if not specified)
-            download_type = getattr(self, 'download_type', 'regular')
+            download_type = response.meta.get('download_type', getattr(self, 'download_type', 'regular'))
             
             # Extract photos with TPS information
             # Download type decides which URLs to extract:
@@ -77,17 +160,20 @@ class KawalSpider(scrapy.Spider):
             if download_type == 'roi':
                 # Extract ROI image URLs from div id attributes
                 # All images have ROI, not just KPU-labeled ones
+                roi_prefix = self.settings.get('KAWAL_ROI_URL_PREFIX', 'https://storage.googleapis.com')
                 items = await page.evaluate("""
-                    () => {
+                    (roiPrefix) => {
                         const results = [];
                         
                         // Find all rows with photos
                         const rows = document.querySelectorAll('tr');
                         
                         rows.forEach((row, index) => {
-                            // Find all divs with id starting with https://storage.googleapis.com
+                            // Find all divs with id starting with the ROI storage URL
+                            // (https://storage.googleapis.com by default)
                             // These contain ROI URLs for ALL photos (not just KPU)
-                            const roiDivs = Array.from(row.querySelectorAll('div[id^="https://storage.googleapis.com"]'));
+                            const roiDivs = Array.from(row.querySelectorAll('div[id]'))
+                                .filter(div => div.id.startsWith(roiPrefix));
                             
                             if (roiDivs.length > 0) {
                                 // URLs in div id may be URL-encoded (e.g. %3D for =)
@@ -108,7 +194,7 @@ class KawalSpider(scrapy.Spider):
                         
                         return results;
                     }
-                """)
+                """, roi_prefix)
             else:
                 # Extract regular C1 image URLs (current logic)
                 items = await page.evaluate("""
@@ -135,6 +221,13 @@ class KawalSpider(scrapy.Spider):
                     }
                 """)
             
+            self.crawler.signals.send_catch_log(
+                signal=page_rendered,
+                response=response,
+                render_time=time.monotonic() - render_start,
+                spider=self
+            )
+            
             if items:
                 total_photos = sum(len(item['photos']) for item in items)
                 district_name = response.meta['district_name']
@@ -172,6 +265,57 @@ class KawalSpider(scrapy.Spider):
                 
         except Exception as e:
             self.logger.error(f"Error processing {response.url}: {e}")
+            retry_request = await self._retry_village(response.request, f"parse error: {e}")
+            if retry_request is not None:
+                yield retry_request
         finally:
             await page.close()
+            await self.context_recycler.release(response.request)
+            self._village_done()
+    
+    async def _retry_village(self, request, reason: str):
+        """
+        Schedule another render of a village page, counted against RETRY_TIMES.
+        
+        Returns the retry request, or None once retries are exhausted (the
+        village then goes to the dead-letter file).
+        """
+        retry_request = get_retry_request(request, spider=self, reason=reason)
+        if retry_request is None:
+            dead_letter = getattr(self, 'dead_letter', None)
+            if dead_letter:
+                dead_letter.village_failed(request.meta, reason)
+            return None
+        
+        # The old page is closed in parse(), render the retry in a current context
+        retry_request.meta.pop("playwright_page", None)
+        context_name = await self.context_recycler.assign()
+        retry_request.meta["playwright_context"] = context_name
+        retry_request.meta["playwright_context_kwargs"] = self.context_recycler.context_kwargs(context_name)
+        backpressure = getattr(self, 'backpressure', None)
+        if backpressure:
+            backpressure.village_started()
+        return retry_request
+    
+    async def errback_village(self, failure):
+        """Handle village page requests that failed to download."""
+        if failure.check(HostBackedOff):
+            # Not sent; a copy with the same context is back in the scheduler
+            return
+        request = failure.request
+        page = request.meta.get("playwright_page")
+        if page:
+            await page.close()
+        await self.context_recycler.release(request)
+        self.logger.error(f"Failed to load {request.url}: {failure.value}")
+        # Download errors were already retried by RetryMiddleware
+        dead_letter = getattr(self, 'dead_letter', None)
+        if dead_letter:
+            dead_letter.village_failed(request.meta, str(failure.value))
+        self._village_done()
+    
+    def _village_done(self):
+        backpressure = getattr(self, 'backpressure', None)
+        if backpressure:
+            backpressure.village_finished()
 
@@ -0,0 +1,163 @@
+"""
+Sharded archive storage for downloaded images.
+
+One JPEG per photo means millions of small files at national scale. With
+``IMAGES_ARCHIVE_ENABLED`` the images pipeline appends photos to tar shards
+instead, one shard series per district (WebDataset style)::
+
+    output_roi/PROVINCE/REGENCY/DISTRICT/shard-00000.tar
+    output_roi/PROVINCE/REGENCY/DISTRICT/shard-00000.idx.jsonl
+
+Tar members are named ``VILLAGE/raw_<kode>_<tps>_<hash>.jpg``, so the
+shards can still be listed or extracted with plain ``tar``. The ``.idx.jsonl``
+sidecar has one line per member with its data offset, size and checksum.
+Readers (see ``jumlah_suara_extractor.utils.archive``) seek straight to a
+member without scanning the tar.
+
+Every crawl run starts a new shard, existing shards are never modified.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tarfile
+import time
+
+logger = logging.getLogger(__name__)
+
+SHARD_RE = re.compile(r'^shard-(\d{5})\.tar$')
+INDEX_SUFFIX = '.idx.jsonl'
+
+
+def shard_index_path(shard_path: str) -> str:
+    """Return the index sidecar path for a shard."""
+    return shard_path[:-len('.tar')] + INDEX_SUFFIX
+
+
+class _ShardWriter:
+    """Appends members to one district's current shard."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.tar = None
+        self.index = None
+        self.shard_path = None
+
+    def _next_shard_path(self) -> str:
+        numbers = [int(m.group(1)) for m in map(SHARD_RE.match, os.listdir(self.directory)) if m]
+        number = max(numbers) + 1 if numbers else 0
+        return os.path.join(self.directory, f"shard-{number:05d}.tar")
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.shard_path = self._next_shard_path()
+        self.tar = tarfile.open(self.shard_path, 'w', format=tarfile.PAX_FORMAT)
+        self.index = open(shard_index_path(self.shard_path), 'w', encoding='utf-8')
+
+    def write(self, member: str, data: bytes) -> dict:
+        if self.tar is None or (self.max_bytes and self.tar.offset >= self.max_bytes):
+            self.close()
+            self._open()
+
+        info = tarfile.TarInfo(member)
+        info.size = len(data)
+        info.mtime = time.time()
+        # addfile() doesn't record offsets in write mode, data follows the header
+        offset = self.tar.offset + len(info.tobuf(self.tar.format, self.tar.encoding, self.tar.errors))
+        self.tar.addfile(info, io.BytesIO(data))
+        self.tar.fileobj.flush()
+
+        entry = {
+            'name': member,
+            'offset': offset,
+            'size': info.size,
+            'checksum': hashlib.md5(data).hexdigest(),
+            'mtime': info.mtime,
+        }
+        # Written after the member, so every indexed offset is on disk
+        self.index.write(json.dumps(entry) + '\n')
+        self.index.flush()
+        return entry
+
+    def close(self):
+        if self.tar is not None:
+            self.tar.close()
+            self.index.close()
+            self.tar = None
+            self.index = None
+
+
+class ShardedTarFilesStore:
+    """
+    Files store (Scrapy ``FilesStoreProtocol``) writing into per-district tar shards.
+
+    ``path`` is the pipeline's ``file_path()``:
+    ``PROVINCE/REGENCY/DISTRICT/VILLAGE/file.jpg``. The first three parts
+    pick the shard directory, the rest becomes the member name.
+    """
+
+    def __init__(self, basedir: str, max_shard_mb: int = 1024):
+        """
+        Initialize store.
+
+        Args:
+            basedir: IMAGES_STORE directory
+            max_shard_mb: Start a new shard once the current one reaches this size
+        """
+        self.basedir = basedir
+        self.max_bytes = max_shard_mb * 1024 * 1024
+        self.writers = {}  # district dir -> _ShardWriter
+        self.indexes = {}  # district dir -> {member: stat dict}, loaded lazily
+
+    def _split(self, path: str):
+        parts = path.replace('\\', '/').split('/')
+        directory = os.path.join(self.basedir, *parts[:3])
+        return directory, '/'.join(parts[3:])
+
+    def _index(self, directory: str) -> dict:
+        if directory not in self.indexes:
+            self.indexes[directory] = load_district_index(directory)
+        return self.indexes[directory]
+
+    def persist_file(self, path, buf, info, meta=None, headers=None):
+        directory, member = self._split(path)
+        writer = self.writers.get(directory)
+        if writer is None:
+            writer = self.writers[directory] = _ShardWriter(directory, self.max_bytes)
+        entry = writer.write(member, buf.getvalue())
+        self._index(directory)[member] = {'last_modified': entry['mtime'], 'checksum': entry['checksum']}
+
+    def stat_file(self, path, info):
+        # Lets the pipeline skip images already archived by an earlier run
+        directory, member = self._split(path)
+        return self._index(directory).get(member, {})
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        if self.writers:
+            logger.info(f"Closed archive shards for {len(self.writers)} districts")
+        self.writers.clear()
+
+
+def load_district_index(directory: str) -> dict:
+    """Read all shard indexes of one district into ``{member: stat dict}``."""
+    index = {}
+    if not os.path.isdir(directory):
+        return index
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(INDEX_SUFFIX):
+            continue
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line after a crash
+                    continue
+                index[entry['name']] = {'last_modified': entry['mtime'], 'checksum': entry['checksum']}
+    return index
@@ -23,6 +23,9 @@ setup(
         "questionary>=1.10.0",
         "tqdm>=4.65.0",
         "playwright>=1.40.0",
+        # handlers.py and browser.py build on handler internals
+        # (_make_request_handler, context_wrappers), keep to tested releases
+        "scrapy-playwright>=0.0.34,<0.1",
     ],
     
     # Optional dependencies groups